@@ -0,0 +1,61 @@
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import generate_sigs
+from parsigs.async_parser import AsyncSigParser
+from parsigs.parse_sig_api import SigParser, default_model_name
+
+"""
+Latency and throughput of n_requests concurrent parse calls: SigParser.parse wrapped in run_in_executor one sig at a
+time, against AsyncSigParser's micro-batches. Reports the p50 and p99 latency of a call and the overall sigs/s.
+
+    python -m benchmarks.async_latency [n_requests] [model_name]
+"""
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+async def _timed(parse, sig, latencies):
+    start = time.perf_counter()
+    await parse(sig)
+    latencies.append(time.perf_counter() - start)
+
+
+async def _measure(parse, sigs):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_timed(parse, sig, latencies) for sig in sigs))
+    seconds = time.perf_counter() - start
+    return {'p50_ms': _percentile(latencies, 50) * 1000, 'p99_ms': _percentile(latencies, 99) * 1000,
+            'sigs_per_second': len(sigs) / seconds}
+
+
+async def _run(n_requests, model_name):
+    sigs = generate_sigs(n_requests)
+    sig_parser = SigParser(model_name)
+    sig_parser.parse_many(sigs[:100])
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+    results = {'run_in_executor': await _measure(lambda sig: loop.run_in_executor(executor, sig_parser.parse, sig),
+                                                 sigs)}
+    executor.shutdown()
+    async with AsyncSigParser(model_name) as async_parser:
+        await async_parser.parse_many(sigs[:100])
+        results['async_sig_parser'] = await _measure(async_parser.parse, sigs)
+    return results
+
+
+def main(n_requests=2000, model_name=default_model_name):
+    results = asyncio.run(_run(n_requests, model_name))
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
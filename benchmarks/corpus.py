@@ -0,0 +1,84 @@
+import random
+import sys
+
+"""
+A synthetic sig corpus, generated from the same building blocks as the property based tests in
+tests/test_properties_parsig_api.py: a dose instruction, a dosage (count and form), an optional drug and strength,
+a frequency (English or Latin), optional "as needed" and duration, and sometimes a second instruction.
+A typo_rate share of the sigs get two adjacent letters of a word swapped, so the autocorrect has work to do.
+
+The corpus is fully determined by its seed, so results of different versions are measured on the same sigs.
+
+    python -m benchmarks.corpus [n_sigs] [seed]
+"""
+
+_instructions = ['take', 'Take', 'TAKE', 'inhale', 'apply']
+_counts = ['1', '2', '3', 'one', 'two', '1/2']
+_forms = ['tablet', 'tablets', 'tab', 'tabs', 'capsule', 'capsules', 'pill', 'puffs', 'drops']
+_drugs = ['ibuprofen', 'amoxicillin', 'atorvastatin', 'benadryl', 'codeine', 'albuterol']
+_strengths = ['200mg', '500mg', '10 mg', '5ml', '250 mcg']
+_routes = ['by mouth', 'po', 'orally']
+_latin_frequencies = ['bid', 'tid', 'qid', 'qd', 'qod', 'q6h', 'q8h', 'q12h', 'qhs', 't.i.d', 'b.i.d']
+_units = ['hours', 'days', 'weeks']
+_duration_units = ['days', 'weeks', 'months']
+
+
+def _frequency(rng: random.Random):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return rng.choice(_latin_frequencies)
+    if kind == 1:
+        return f'every {rng.randint(2, 12)} {rng.choice(_units)}'
+    if kind == 2:
+        return f'{rng.randint(1, 4)} times a {rng.choice(["day", "week"])}'
+    if kind == 3:
+        return rng.choice(['twice daily', 'once nightly', 'once daily', 'daily'])
+    if kind == 4:
+        return f'every other {rng.choice(["day", "week"])}'
+    return f'every {rng.choice(["day", "morning", "night"])}'
+
+
+def _instruction(rng: random.Random):
+    words = [rng.choice(_instructions), rng.choice(_counts), rng.choice(_forms)]
+    if rng.random() < 0.5:
+        words += ['of', rng.choice(_drugs)]
+        if rng.random() < 0.6:
+            words.append(rng.choice(_strengths))
+    if rng.random() < 0.3:
+        words.append(rng.choice(_routes))
+    words.append(_frequency(rng))
+    if rng.random() < 0.2:
+        words.append('as needed')
+    if rng.random() < 0.4:
+        words.append(f'for {rng.randint(2, 14)} {rng.choice(_duration_units)}')
+    return ' '.join(words)
+
+
+def _add_typo(rng: random.Random, sig: str):
+    words = sig.split()
+    candidates = [i for i, word in enumerate(words) if len(word) > 4 and word.isalpha()]
+    if not candidates:
+        return sig
+    i = rng.choice(candidates)
+    j = rng.randrange(len(words[i]) - 1)
+    word = words[i]
+    words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return ' '.join(words)
+
+
+def generate_sigs(n_sigs: int, seed: int = 0, typo_rate: float = 0.1, multiple_instructions_rate: float = 0.1):
+    rng = random.Random(seed)
+    sigs = []
+    for _ in range(n_sigs):
+        sig = _instruction(rng)
+        if rng.random() < multiple_instructions_rate:
+            sig += ' and then ' + _instruction(rng)
+        if rng.random() < typo_rate:
+            sig = _add_typo(rng, sig)
+        sigs.append(sig)
+    return sigs
+
+
+if __name__ == '__main__':
+    for generated_sig in generate_sigs(*map(int, sys.argv[1:])):
+        print(generated_sig)
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+"""
+Resident memory of n_workers processes that each load the spell checker and the correction index, with the in memory
+dictionaries against the memory mapped parsigs.frequency_store. All the workers are alive when they are measured, so
+the pages of the store they share are split between them in the PSS.
+
+    python -m benchmarks.frequency_store [n_workers]
+
+rss_mb counts the shared pages in full in every worker, uss_mb is the memory private to a worker and pss_mb its
+private memory plus its share of the shared pages (Linux only, from /proc/self/smaps_rollup).
+"""
+
+_root = Path(__file__).parent.parent
+_sigs = ["tkae 1 talbet by mouth evrey 6 hours", "take 2 tablets of amoxicilin 500mg daily for 10 dyas"]
+
+
+def _memory():
+    memory = {}
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            fields = line.split()
+            if fields[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                memory[fields[0][:-1]] = int(fields[1]) / 1024
+    return {'rss_mb': memory['Rss'], 'pss_mb': memory['Pss'],
+            'uss_mb': memory['Private_Clean'] + memory['Private_Dirty']}
+
+
+def _measure():
+    from parsigs.parse_sig_api import _autocorrect, _get_correction_index, _get_frequency_store
+
+    start = time.perf_counter()
+    _get_correction_index().build_index()
+    corrected = [_autocorrect(sig) for sig in _sigs]
+    load_seconds = time.perf_counter() - start
+    print('ready', flush=True)
+    sys.stdin.readline()
+    print(json.dumps(dict(_memory(), load_seconds=load_seconds, store=_get_frequency_store() is not None,
+                          corrected=corrected)), flush=True)
+
+
+def _run_workers(n_workers, store_path):
+    env = dict(os.environ, PARSIGS_FREQUENCY_STORE=str(store_path))
+    workers = [subprocess.Popen([sys.executable, '-m', 'benchmarks.frequency_store', '--measure'], cwd=_root, env=env,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(n_workers)]
+    for worker in workers:
+        assert worker.stdout.readline().strip() == 'ready'
+    for worker in workers:
+        worker.stdin.write('\n')
+        worker.stdin.flush()
+    results = [json.loads(worker.communicate()[0]) for worker in workers]
+    averages = {key: sum(result[key] for result in results) / n_workers
+                for key in ('rss_mb', 'pss_mb', 'uss_mb', 'load_seconds')}
+    return dict(averages, store=results[0]['store'])
+
+
+def main(n_workers=4):
+    from parsigs import frequency_store
+    from parsigs.parse_sig_api import _build_spell_checker, drug_names_path
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_path = Path(tmp_dir) / 'word_frequency.store'
+        frequency_store.write_store(_build_spell_checker(), store_path,
+                                    frequency_store.store_source_key(drug_names_path))
+        results = {
+            'n_workers': n_workers,
+            'dict_per_worker': _run_workers(n_workers, Path(tmp_dir) / 'missing.store'),
+            'store_per_worker': _run_workers(n_workers, store_path),
+        }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        _measure()
+    else:
+        main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+"""
+Measures the cost of importing parsigs.parse_sig_api and of the first autocorrect call, which is the first use of the
+spell checker, in fresh interpreters. Compares the eager loading parsigs used to do at import time against the lazy
+loading, with and without the precompiled spell checker snapshot.
+
+    python -m benchmarks.import_time [repeats]
+"""
+
+_root = Path(__file__).parent.parent
+
+_lazy_code = '''
+import time
+start = time.perf_counter()
+from parsigs import parse_sig_api
+imported = time.perf_counter()
+parse_sig_api._autocorrect("tkae 1 talbet")
+print(imported - start, time.perf_counter() - start)
+'''
+
+# builds every resource during the import, as parse_sig_api did before lazy loading
+_eager_code = '''
+import time
+start = time.perf_counter()
+from parsigs import parse_sig_api
+parse_sig_api._get_inflect_engine(), parse_sig_api._get_latin_type_dict(), parse_sig_api._get_spell_checker()
+imported = time.perf_counter()
+parse_sig_api._autocorrect("tkae 1 talbet")
+print(imported - start, time.perf_counter() - start)
+'''
+
+
+def _run(code, env_overrides, repeats):
+    env = dict(os.environ, **env_overrides)
+    timings = [tuple(map(float, subprocess.check_output([sys.executable, '-c', code], cwd=_root, env=env,
+                                                        text=True).split()))
+               for _ in range(repeats)]
+    return {'import_seconds': min(t[0] for t in timings), 'first_autocorrect_seconds': min(t[1] for t in timings)}
+
+
+def main(repeats=5):
+    from parsigs import spell_checker_snapshot
+    from parsigs.parse_sig_api import _build_spell_checker, drug_names_path
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot = Path(tmp_dir) / 'spell_checker.snapshot'
+        spell_checker_snapshot.write_snapshot(_build_spell_checker(), snapshot,
+                                              spell_checker_snapshot.snapshot_source_key(drug_names_path))
+        no_snapshot = {spell_checker_snapshot.snapshot_env_var: str(Path(tmp_dir) / 'missing.snapshot')}
+        with_snapshot = {spell_checker_snapshot.snapshot_env_var: str(snapshot)}
+        results = {
+            'eager': _run(_eager_code, no_snapshot, repeats),
+            'lazy': _run(_lazy_code, no_snapshot, repeats),
+            'lazy_with_snapshot': _run(_lazy_code, with_snapshot, repeats),
+        }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
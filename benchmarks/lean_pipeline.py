@@ -0,0 +1,53 @@
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from parsigs.parse_sig_api import default_model_name
+
+"""
+Load time, peak RSS and per-doc latency of the model loaded with every pipeline component (spacy.load) against the
+lean load of parsigs.lean_pipeline. Every mode is measured in a fresh interpreter, so the RSS of one load does not
+count in the other.
+
+    python -m benchmarks.lean_pipeline [model_name] [n_docs]
+"""
+
+_sigs = ["take 1 tablet by mouth every 6 hours as needed for pain",
+         "take 2 tablet of amoxicillin 500mg every 12 hours for 10 days",
+         "1 tablet po bid"]
+
+
+def _measure(mode, model_name, n_docs):
+    import spacy
+    from parsigs.lean_pipeline import load_lean
+
+    start = time.perf_counter()
+    nlp = load_lean(model_name) if mode == 'lean' else spacy.load(model_name)
+    load_seconds = time.perf_counter() - start
+    docs = [_sigs[i % len(_sigs)] for i in range(n_docs)]
+    list(nlp.pipe(docs[:len(_sigs)]))
+    start = time.perf_counter()
+    list(nlp.pipe(docs))
+    doc_seconds = (time.perf_counter() - start) / n_docs
+    return {'pipeline': nlp.pipe_names, 'load_seconds': load_seconds, 'per_doc_ms': doc_seconds * 1000,
+            # ru_maxrss is in kilobytes on Linux
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def main(model_name=default_model_name, n_docs=2000):
+    results = {}
+    for mode in ('full', 'lean'):
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.lean_pipeline', '--measure', mode, model_name,
+                                 str(n_docs)], check=True, capture_output=True, text=True).stdout
+        results[mode] = json.loads(output)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--measure']:
+        print(json.dumps(_measure(sys.argv[2], sys.argv[3], int(sys.argv[4]))))
+    else:
+        main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
@@ -0,0 +1,69 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from benchmarks.corpus import generate_sigs
+from parsigs.parallel import ParallelSigParser
+from parsigs.parse_sig_api import SigParser, default_model_name
+
+"""
+Throughput of ParallelSigParser for 1, 2, 4, ... worker processes, up to the number of CPUs, against a single
+SigParser, on n_sigs synthetic sigs (benchmarks.corpus). The parsers are created (and the model loaded)
+before the clock starts, so the numbers measure parsing only.
+
+The start up of a pool of n_process workers (until every worker has parsed a sig) and the private (not shared) memory
+of its workers, from /proc on Linux, are measured for every available start method, to compare the forked workers
+sharing the parent's model with workers loading their own.
+
+    python -m benchmarks.parallel_scaling [n_sigs] [model_name]
+"""
+
+
+def _sigs_per_second(parse_many, sigs):
+    start = time.perf_counter()
+    parse_many(sigs)
+    return len(sigs) / (time.perf_counter() - start)
+
+
+def _private_mb(pid):
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as smaps:
+            return sum(int(line.split()[1]) for line in smaps if line.startswith(('Private_Clean', 'Private_Dirty')))\
+                / 1024
+    except OSError:
+        return None
+
+
+def _start_up(start_method, n_process, model_name, sigs):
+    start = time.perf_counter()
+    with ParallelSigParser(n_process, model_name, chunk_size=1, start_method=start_method) as parallel_parser:
+        parallel_parser.parse_many(sigs[:n_process])
+        seconds = time.perf_counter() - start
+        private_mb = [_private_mb(process.pid) for process in parallel_parser._pool._pool]
+    return {'start_up_seconds': seconds,
+            'worker_private_mb': None if None in private_mb else sum(private_mb) / len(private_mb)}
+
+
+def main(n_sigs=5000, model_name=default_model_name):
+    sigs = generate_sigs(n_sigs)
+    sig_parser = SigParser(model_name)
+    # loads the spell checker and the correction index, which ParallelSigParser does before starting the workers
+    sig_parser.parse_many(sigs[:100])
+    results = {'cpu_count': os.cpu_count(), 'platform': sys.platform,
+               'single_process_sigs_per_second': _sigs_per_second(sig_parser.parse_many, sigs)}
+    n_process = 1
+    while n_process <= (os.cpu_count() or 1):
+        with ParallelSigParser(n_process, model_name) as parallel_parser:
+            results[f'{n_process}_processes_sigs_per_second'] = _sigs_per_second(parallel_parser.parse_many, sigs)
+        n_process *= 2
+    n_process = max(2, min(os.cpu_count() or 1, 4))
+    for start_method in multiprocessing.get_all_start_methods():
+        results[f'{start_method}_{n_process}_processes'] = _start_up(start_method, n_process, model_name, sigs)
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
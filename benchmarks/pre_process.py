@@ -0,0 +1,46 @@
+import json
+import sys
+import timeit
+
+from parsigs.parse_sig_api import _pre_process, _pre_process_reference
+
+"""
+Micro-benchmark of the per-sig pre processing cost: the single pass _pre_process against the original multi pass
+implementation (_pre_process_reference). The spell checker and the correction memo are warmed up first, so the
+numbers measure the pre processing itself rather than loading resources or correcting new typos.
+
+    python -m benchmarks.pre_process [repeats]
+"""
+
+sigs = [
+    "Take 1 tablet 3 times a day for 2 weeks",
+    "TAKE 1 TABLET BY MOUTH EVERY 6 HOURS AS NEEDED FOR PAIN",
+    "Take 2 tabs of amoxicillin 500mg every 12 days for 10 days",
+    "Take 1 capsule by mouth twice daily (every 12 hours)",
+    "take two tablets of benadryl every two days and then 1 tablet as needed",
+    "take 1/2 tab by mouth once nightly",
+    "1 TAB of BENADRYL BID",
+    "Tkae 1 talbet of ibuprofen 200mg 3 tiems every day for 10 wekes",
+]
+
+
+def _per_sig_microseconds(pre_process, repeats):
+    number = 200
+    seconds = min(timeit.repeat(lambda: [pre_process(sig) for sig in sigs], number=number, repeat=repeats))
+    return seconds / (number * len(sigs)) * 1e6
+
+
+def main(repeats=5):
+    for sig in sigs:
+        assert _pre_process(sig) == _pre_process_reference(sig)
+    results = {
+        'multi_pass_us_per_sig': _per_sig_microseconds(_pre_process_reference, repeats),
+        'single_pass_us_per_sig': _per_sig_microseconds(_pre_process, repeats),
+    }
+    results['speedup'] = results['multi_pass_us_per_sig'] / results['single_pass_us_per_sig']
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+import json
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from parsigs.columnar import StructuredSigColumns
+from parsigs.parse_sig_api import StructuredSig
+
+"""
+Memory per parsed sig of a list of StructuredSig objects (slotted), of the same objects as a plain dataclass with a
+per instance __dict__ (the former StructuredSig), and of StructuredSigColumns. Measured with tracemalloc over
+n_sigs generated structured sigs, the model is not needed.
+
+    python -m benchmarks.structured_sig_memory [n_sigs]
+"""
+
+_DictStructuredSig = make_dataclass('_DictStructuredSig', [(field.name, field.type, field) for field in
+                                                           fields(StructuredSig)])
+_drugs = ['ibuprofen', 'amoxicillin', 'atorvastatin', 'benadryl', None]
+_forms = ['tablet', 'capsule', 'ml', None]
+_strengths = ['200mg', '500mg', '10mg', None]
+_types = ['Hour', 'Day', 'Week', 'Month', None]
+
+
+def _structured_sig_values(i):
+    return dict(drug=_drugs[i % 5], form=_forms[i % 4], strength=_strengths[i % 4], frequencyType=_types[i % 5],
+                singleDosageAmount=float(i % 3 + 1), periodType=_types[(i + 2) % 5],
+                periodAmount=i % 14 if i % 2 else None, times=i % 4 + 1, interval=i % 3 + 1, takeAsNeeded=i % 7 == 0)
+
+
+def _bytes_per_sig(build, n_sigs):
+    tracemalloc.start()
+    built = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return size / n_sigs
+
+
+def main(n_sigs=200000):
+    values = [_structured_sig_values(i) for i in range(n_sigs)]
+    results = {
+        'dict_dataclass_bytes_per_sig': _bytes_per_sig(lambda: [_DictStructuredSig(**v) for v in values], n_sigs),
+        'slotted_bytes_per_sig': _bytes_per_sig(lambda: [StructuredSig(**v) for v in values], n_sigs),
+        'columnar_bytes_per_sig': _bytes_per_sig(
+            lambda: StructuredSigColumns.from_structured_sigs([StructuredSig(**v)] for v in values), n_sigs),
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
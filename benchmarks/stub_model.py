@@ -0,0 +1,72 @@
+import sys
+
+import spacy
+
+from parsigs.parse_sig_api import _get_latin_type_dict
+
+"""
+A tiny, offline stand-in for the en_parsigs model: a blank English pipeline with an entity_ruler emitting the six
+labels en_parsigs was trained on (Dosage, Drug, Form, Frequency, Strength, Duration) from token patterns over the
+pre processed sig.
+
+It is not meant to be accurate, only to exercise the model stage and everything around it with a realistic amount of
+entities, so the benchmarks run without downloading the model. It is a fraction of the cost of the real NER.
+
+    python -m benchmarks.stub_model <path>  # then SigParser(<path>)
+"""
+
+_number = {'LIKE_NUM': True}
+_time_unit = {'LOWER': {'REGEX': r'^(hours?|days?|weeks?|months?|years?)$'}}
+_times_of_day = {'LOWER': {'IN': ['day', 'morning', 'evening', 'night', 'noon', 'bedtime']}}
+_forms = ['tablet', 'tablets', 'capsule', 'capsules', 'pill', 'pills', 'puff', 'puffs', 'drop', 'drops',
+          'spray', 'sprays', 'patch', 'patches']
+_strength_units = ['mg', 'mcg', 'ml', 'g', 'meq', 'unit', 'units']
+_drugs = ['ibuprofen', 'amoxicillin', 'atorvastatin', 'benadryl', 'codeine', 'albuterol', 'metformin', 'lisinopril',
+          'acetaminophen', 'prednisone', 'omeprazole', 'gabapentin']
+
+
+def _latin_frequency_pattern():
+    # the keys have no dots, allow "t.i.d" and "q.a.m." alike
+    alternatives = '|'.join(r'\.?'.join(key) for key in _get_latin_type_dict())
+    return {'LOWER': {'REGEX': rf'^({alternatives})\.?$'}}
+
+
+def _patterns():
+    as_needed = [{'LOWER': 'as'}, {'LOWER': 'needed'}]
+    frequencies = [
+        [_latin_frequency_pattern()],
+        [{'LOWER': 'daily'}],
+        [{'LOWER': 'every'}, _time_unit],
+        [{'LOWER': 'every'}, _times_of_day],
+        [{'LOWER': 'every'}, _number, _time_unit],
+        [{'LOWER': 'every'}, {'LOWER': 'other'}, _time_unit],
+        [{'LOWER': 'at'}, {'LOWER': 'bedtime'}],
+        [_number, {'LOWER': {'IN': ['time', 'times']}}, {'LOWER': 'daily'}],
+        [_number, {'LOWER': {'IN': ['time', 'times']}}, {'LOWER': {'IN': ['a', 'per', 'every']}}, _time_unit],
+    ]
+    patterns = [{'label': 'Frequency', 'pattern': frequency} for frequency in frequencies]
+    patterns += [{'label': 'Frequency', 'pattern': frequency + as_needed} for frequency in frequencies]
+    patterns += [
+        {'label': 'Frequency', 'pattern': as_needed},
+        {'label': 'Dosage', 'pattern': [_number, {'LOWER': {'IN': _forms}}]},
+        {'label': 'Form', 'pattern': [{'LOWER': {'IN': _forms}}]},
+        {'label': 'Drug', 'pattern': [{'LOWER': {'IN': _drugs}}]},
+        {'label': 'Strength', 'pattern': [_number, {'LOWER': {'IN': _strength_units}}]},
+        {'label': 'Strength', 'pattern': [{'LOWER': {'REGEX': r'^\d+(\.\d+)?(mg|mcg|ml|g|meq)$'}}]},
+        {'label': 'Duration', 'pattern': [{'LOWER': 'for'}, _number, _time_unit]},
+    ]
+    return patterns
+
+
+def build_stub_model():
+    nlp = spacy.blank('en')
+    nlp.add_pipe('entity_ruler').add_patterns(_patterns())
+    return nlp
+
+
+def save_stub_model(path):
+    build_stub_model().to_disk(path)
+
+
+if __name__ == '__main__':
+    save_stub_model(sys.argv[1])
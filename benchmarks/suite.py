@@ -0,0 +1,157 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import spacy
+
+from benchmarks.corpus import generate_sigs
+from benchmarks.stub_model import save_stub_model
+from parsigs.parse_sig_api import SigParser, _autocorrect, _create_structured_sigs, _load_resources, _pre_process
+
+try:
+    from importlib import metadata
+except ImportError:
+    # Python 3.7
+    metadata = None
+
+"""
+Throughput and latency of every stage of the sig parsing, on a synthetic corpus (benchmarks.corpus), written as JSON so
+the results of different versions can be compared:
+
+    python -m benchmarks.suite -o before.json              # with the bundled stub model (benchmarks.stub_model)
+    python -m benchmarks.suite -o after.json --model en_parsigs
+    python -m benchmarks.suite --compare before.json after.json
+
+The stages are autocorrect (_autocorrect), pre_process (_pre_process, autocorrect included), ner (the model on a
+pre processed sig, one call per sig and Language.pipe over the corpus), rule_mapping (_create_structured_sigs of the
+model output) and the end to end SigParser.parse and SigParser.parse_many.
+Resources are loaded and every stage is run once before it is measured, so the numbers are the steady state of a
+long running process (corrections of repeated typos are memoized).
+"""
+
+_format_version = 1
+
+
+def _per_sig_stage(function, inputs):
+    for value in inputs:
+        function(value)
+    latencies = []
+    for value in inputs:
+        start = time.perf_counter()
+        function(value)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {'sigs_per_second': len(inputs) / total if total > 0 else float('inf'),
+            'mean_us': statistics.mean(latencies) * 1e6,
+            'p50_us': latencies[len(latencies) // 2] * 1e6,
+            'p99_us': latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1e6}
+
+
+def _batch_stage(function, inputs):
+    function(inputs)
+    start = time.perf_counter()
+    function(inputs)
+    seconds = time.perf_counter() - start
+    return {'sigs_per_second': len(inputs) / seconds if seconds > 0 else float('inf'),
+            'mean_us': seconds / len(inputs) * 1e6}
+
+
+def run_suite(model_name: str, n_sigs: int, seed: int, batch_size: int):
+    sigs = generate_sigs(n_sigs, seed)
+    sig_parser = SigParser(model_name)
+    language = spacy.load(model_name)
+    _load_resources()
+    sigs_preprocessed = [_pre_process(sig) for sig in sigs]
+    docs = list(language.pipe(sigs_preprocessed))
+
+    stages = {
+        'autocorrect': _per_sig_stage(_autocorrect, sigs),
+        'pre_process': _per_sig_stage(_pre_process, sigs),
+        'ner': _per_sig_stage(language, sigs_preprocessed),
+        'ner_pipe': _batch_stage(lambda batch: list(language.pipe(batch, batch_size=batch_size)), sigs_preprocessed),
+        'rule_mapping': _per_sig_stage(_create_structured_sigs, docs),
+        'parse': _per_sig_stage(sig_parser.parse, sigs),
+        'parse_many': _batch_stage(lambda batch: sig_parser.parse_many(batch, batch_size), sigs),
+    }
+    return {
+        'format_version': _format_version,
+        'parsigs_version': _version('parsigs'),
+        'git_revision': _git_revision(),
+        'spacy_version': spacy.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'model': model_name,
+        'n_sigs': n_sigs,
+        'seed': seed,
+        'batch_size': batch_size,
+        'stages': stages,
+    }
+
+
+def compare(baseline: dict, current: dict):
+    """
+    The throughput ratio (current / baseline) of every stage measured in both, below 1 is a regression.
+    """
+    return {stage: current['stages'][stage]['sigs_per_second'] / baseline['stages'][stage]['sigs_per_second']
+            for stage in baseline['stages'] if stage in current['stages']}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _version(package):
+    if metadata is None:
+        import pkg_resources
+        try:
+            return pkg_resources.get_distribution(package).version
+        except pkg_resources.DistributionNotFound:
+            return None
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    arg_parser.add_argument('--model', help='A model name or path, defaults to the bundled stub model')
+    arg_parser.add_argument('-n', '--n-sigs', type=int, default=2000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--batch-size', type=int, default=256)
+    arg_parser.add_argument('-o', '--output', help='Write the results JSON to this file')
+    arg_parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                            help='Compare two results files instead of running the suite')
+    args = arg_parser.parse_args(argv)
+
+    if args.compare:
+        results = [json.load(open(path)) for path in args.compare]
+        print(json.dumps(compare(*results), indent=2))
+        return
+    if args.model is None:
+        with tempfile.TemporaryDirectory() as stub_model_path:
+            save_stub_model(stub_model_path)
+            results = run_suite(stub_model_path, args.n_sigs, args.seed, args.batch_size)
+        results['model'] = 'stub'
+    else:
+        results = run_suite(args.model, args.n_sigs, args.seed, args.batch_size)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
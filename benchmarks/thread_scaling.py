@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import generate_sigs
+from parsigs.parse_sig_api import SigParser, default_model_name
+
+"""
+Throughput of a single thread safe SigParser (one loaded model) shared by 1, 2, 4, ... threads, up to max_threads, on
+n_sigs synthetic sigs (benchmarks.corpus). Every thread parses its share of the sigs with parse, one sig at a time, as
+the workers of a thread pool serving requests would. The parser is created (and its resources loaded) and the sigs are
+parsed once before the clock starts, so the numbers are the steady state of a long running process.
+
+    python -m benchmarks.thread_scaling [n_sigs] [max_threads] [model_name]
+
+On GIL builds the pure Python stages of the parsing do not run in parallel, so the throughput stays about flat. Run
+it on a free-threaded CPython build (python3.13t and later, gil_enabled false in the results) to measure the scaling
+without the GIL, with a spaCy build for it.
+"""
+
+
+def _sigs_per_second(sig_parser: SigParser, sigs, n_threads):
+    shares = [sigs[i::n_threads] for i in range(n_threads)]
+    with ThreadPoolExecutor(n_threads) as executor:
+        start = time.perf_counter()
+        for _ in executor.map(lambda share: [sig_parser.parse(sig) for sig in share], shares):
+            pass
+        return len(sigs) / (time.perf_counter() - start)
+
+
+def main(n_sigs=5000, max_threads=8, model_name=default_model_name):
+    sigs = generate_sigs(n_sigs)
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    results = {'cpu_count': os.cpu_count(), 'python': sys.version.split()[0],
+               'free_threaded_build': bool(sysconfig.get_config_var('Py_GIL_DISABLED')), 'gil_enabled': gil_enabled}
+    sig_parser = SigParser(model_name, thread_safe=True)
+    sig_parser.parse_many(sigs)
+    n_threads = 1
+    while n_threads <= max_threads:
+        results[f'{n_threads}_threads_sigs_per_second'] = _sigs_per_second(sig_parser, sigs, n_threads)
+        n_threads *= 2
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+from parsigs.parse_sig_api import SigParser, default_model_name
+
+"""
+An asyncio front end to SigParser that merges concurrent parse calls into micro-batches.
+
+Every awaited parse(sig) is queued; a single batching task takes the first queued sig, then keeps collecting sigs
+until max_batch_size sigs are queued or max_wait_seconds have passed, and parses them with one SigParser.parse_stream
+call (one Language.pipe call) on a dedicated single thread executor, so the event loop is never blocked by the model.
+While a batch is parsed the next one accumulates in the queue, so under load the batches fill up without waiting.
+"""
+
+
+class AsyncSigParser:
+    def __init__(self, model_name=default_model_name, max_batch_size: int = 64, max_wait_seconds: float = 0.005,
+                 on_batch=None, **parser_kwargs):
+        """
+        on_batch, if given, is called on the executor thread with the BatchStats of every parsed micro-batch.
+        parser_kwargs are passed to the SigParser.
+        """
+        if max_batch_size < 1 or max_wait_seconds < 0:
+            raise ValueError('max_batch_size must be positive and max_wait_seconds must not be negative')
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._on_batch = on_batch
+        self._sig_parser = SigParser(model_name, **parser_kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='parsigs')
+        self._queue = None
+        self._batcher = None
+
+    async def parse(self, sig: str):
+        """
+        Returns the list of StructuredSig objects of the sig, parsed in a micro-batch with the concurrently awaited sigs.
+        """
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((sig, future))
+        return await future
+
+    async def parse_many(self, sigs: list):
+        """
+        Same as SigParser.parse_many, the StructuredSig objects of all the sigs in a single list.
+        """
+        return list(chain.from_iterable(await asyncio.gather(*(self.parse(sig) for sig in sigs))))
+
+    @property
+    def queue_depth(self):
+        """
+        The number of sigs waiting for a micro-batch.
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            # callers that gave up (e.g. timed out) while queued are not parsed
+            batch = [(sig, future) for sig, future in batch if not future.done()]
+            if batch:
+                await self._parse_batch(loop, batch)
+
+    def _parse_sigs(self, sigs):
+        # parse_stream, unlike parse_many, keeps the StructuredSig list of every sig apart
+        return [result.structured_sigs
+                for result in self._sig_parser.parse_stream(sigs, self.max_batch_size, self._on_batch)]
+
+    async def _parse_batch(self, loop, batch):
+        sigs = [sig for sig, _ in batch]
+        try:
+            results = await loop.run_in_executor(self._executor, self._parse_sigs, sigs)
+        except Exception:
+            # a sig that fails to parse only fails its own caller, the rest of the batch is parsed one by one
+            for sig, future in batch:
+                try:
+                    result = await loop.run_in_executor(self._executor, self._sig_parser.parse, sig)
+                except Exception as e:
+                    _set_future(future, exception=e)
+                else:
+                    _set_future(future, result=result)
+            return
+        for (_, future), structured_sigs in zip(batch, results):
+            _set_future(future, result=structured_sigs)
+
+
+def _set_future(future, result=None, exception=None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from parsigs import server
+from parsigs.parallel import ParallelSigParser
+from parsigs.parse_sig_api import SigParser, StructuredSig, default_batch_size, default_model_name, \
+    parse_option_presets
+
+"""
+Command line entry point for bulk sig extraction:
+
+    parsigs parse sigs.csv.gz -o structured.jsonl --column sig --workers 4
+
+Reads sigs from CSV, TSV, JSONL or plain text files (optionally gzip compressed), parses them in batches and writes
+one flattened record per StructuredSig to JSONL or CSV. Progress and a final rows/sec summary are printed to stderr.
+
+    parsigs serve --port 8000
+
+Serves the local HTTP parsing service of parsigs.server.
+"""
+
+_buffer_size = 1 << 20
+_input_formats = ('csv', 'tsv', 'jsonl', 'txt')
+_output_formats = ('jsonl', 'csv')
+_structured_sig_fields = [field.name for field in fields(StructuredSig)]
+
+
+def _detect_format(path: str, formats):
+    suffixes = [suffix.lower().lstrip('.') for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] == 'gz':
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] in formats:
+        return suffixes[-1]
+    raise ValueError(f'Cannot detect the format of {path}, pass one of {", ".join(formats)} explicitly')
+
+
+@contextmanager
+def _open_std_text(mode: str):
+    stream = sys.stdin if mode == 'r' else sys.stdout
+    if mode != 'r':
+        stream.flush()
+    wrapper = io.TextIOWrapper(stream.buffer, encoding='utf-8', newline='')
+    try:
+        yield wrapper
+    finally:
+        # detached rather than closed, closing the wrapper would close the process's stdin or stdout
+        if mode != 'r':
+            wrapper.flush()
+        wrapper.detach()
+
+
+def _open_text(path: str, mode: str):
+    if path == '-':
+        return _open_std_text(mode)
+    if path.lower().endswith('.gz'):
+        compressed = gzip.open(path, mode + 'b')
+        buffered = io.BufferedReader(compressed, _buffer_size) if mode == 'r' \
+            else io.BufferedWriter(compressed, _buffer_size)
+        return io.TextIOWrapper(buffered, encoding='utf-8', newline='')
+    return open(path, mode, buffering=_buffer_size, encoding='utf-8', newline='')
+
+
+"""
+Yields an (id, sig) pair per input record, id is the value of id_column or None.
+"""
+
+
+def _read_sigs(input_file, input_format: str, column: str, id_column: str = None):
+    if input_format == 'txt':
+        for line in input_file:
+            yield None, line.rstrip('\r\n')
+        return
+    if input_format == 'jsonl':
+        records = _read_jsonl_records(input_file)
+    else:
+        reader = csv.DictReader(input_file, delimiter='\t' if input_format == 'tsv' else ',')
+        records = ((reader.line_num, record) for record in reader)
+    for line_number, record in records:
+        if column not in record:
+            raise ValueError(f'Input record on line {line_number} has no "{column}" column: {record}')
+        sig = record[column]
+        # a null sig is parsed as an empty one, as an empty csv cell
+        if sig is not None and not isinstance(sig, str):
+            raise ValueError(f'Input record on line {line_number} has a non string "{column}": {sig!r}')
+        yield (record.get(id_column) if id_column else None), sig or ''
+
+
+def _read_jsonl_records(input_file):
+    for line_number, line in enumerate(input_file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f'Input line {line_number} is not valid JSON: {error}') from error
+        if not isinstance(record, dict):
+            raise ValueError(f'Input record on line {line_number} is not a JSON object: {record!r}')
+        yield line_number, record
+
+
+def _flatten(index: int, row_id, structured_sigs):
+    for instruction, structured_sig in enumerate(structured_sigs):
+        record = {'index': index, 'instruction': instruction}
+        if row_id is not None:
+            record['id'] = row_id
+        record.update(asdict(structured_sig))
+        yield record
+
+
+class _RecordWriter:
+    def __init__(self, output_file, output_format: str, with_id: bool):
+        self._output_file = output_file
+        self._csv_writer = None
+        if output_format == 'csv':
+            header = ['index', 'instruction'] + (['id'] if with_id else []) + _structured_sig_fields
+            self._csv_writer = csv.DictWriter(output_file, header)
+            self._csv_writer.writeheader()
+
+    def write(self, record: dict):
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(record)
+        else:
+            self._output_file.write(json.dumps(record) + '\n')
+
+
+class _Progress:
+    def __init__(self, enabled: bool, interval_seconds: float = 5.0):
+        self.enabled = enabled
+        self.interval_seconds = interval_seconds
+        self.start = self.last_report = time.perf_counter()
+        self.rows = 0
+
+    def update(self, rows: int):
+        self.rows += rows
+        now = time.perf_counter()
+        if self.enabled and now - self.last_report >= self.interval_seconds:
+            self.last_report = now
+            print(f'parsed {self.rows} sigs ({self.rows / (now - self.start):.0f} sigs/s)', file=sys.stderr)
+
+    def summary(self):
+        seconds = time.perf_counter() - self.start
+        rate = self.rows / seconds if seconds > 0 else float('inf')
+        print(f'parsed {self.rows} sigs in {seconds:.1f}s ({rate:.0f} sigs/s)', file=sys.stderr)
+
+
+def _write_results(results, row_ids, writer: _RecordWriter, progress: _Progress):
+    for result in results:
+        for record in _flatten(result.index, row_ids.popleft(), result.structured_sigs):
+            writer.write(record)
+        progress.update(1)
+
+
+def run_parse(args):
+    if args.batch_size < 1 or args.workers < 1:
+        raise ValueError('--batch-size and --workers must be positive integers')
+    input_format = args.input_format or _detect_format(args.input, _input_formats)
+    output_format = args.output_format or (_detect_format(args.output, _output_formats) if args.output != '-'
+                                           else 'jsonl')
+    parser_kwargs = dict(model_name=args.model, cache_size=args.cache_size, rule_fast_path=args.rule_fast_path,
+                         lean_pipeline=args.lean_pipeline, options=args.options)
+    progress = _Progress(not args.quiet)
+
+    with _open_text(args.input, 'r') as input_file, _open_text(args.output, 'w') as output_file:
+        records = _read_sigs(input_file, input_format, args.column, args.id_column)
+        writer = _RecordWriter(output_file, output_format, args.id_column is not None)
+        # ids of the sigs read by the parser and not yet written, bounded by how far the parser reads ahead
+        row_ids = deque()
+
+        def sigs():
+            for row_id, sig in records:
+                row_ids.append(row_id)
+                yield sig
+
+        if args.workers > 1:
+            with ParallelSigParser(args.workers, chunk_size=args.batch_size, batch_size=args.batch_size,
+                                   **parser_kwargs) as sig_parser:
+                _write_results(sig_parser.parse_stream(sigs()), row_ids, writer, progress)
+        else:
+            sig_parser = SigParser(**parser_kwargs)
+            _write_results(sig_parser.parse_stream(sigs(), args.batch_size), row_ids, writer, progress)
+    if not args.quiet:
+        progress.summary()
+    return progress.rows
+
+
+def run_serve(args):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+    sig_server = server.SigServer(args.host, args.port, args.model, args.max_batch_size, args.max_wait_ms / 1000,
+                                  cache_size=args.cache_size, rule_fast_path=args.rule_fast_path,
+                                  lean_pipeline=args.lean_pipeline)
+    try:
+        sig_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sig_server.close()
+
+
+def _build_arg_parser():
+    arg_parser = argparse.ArgumentParser(prog='parsigs', description='Parse medication sigs into structured sigs')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    parse = commands.add_parser('parse', help='Parse a file of sigs into structured sig records')
+    parse.add_argument('input', help='CSV, TSV, JSONL or text file, optionally .gz compressed, - for stdin')
+    parse.add_argument('-o', '--output', default='-', help='JSONL or CSV output file, optionally .gz, - for stdout')
+    parse.add_argument('--input-format', choices=_input_formats, help='Defaults to the input file extension')
+    parse.add_argument('--output-format', choices=_output_formats, help='Defaults to the output file extension')
+    parse.add_argument('--column', default='sig', help='The CSV/TSV column or JSONL field holding the sig')
+    parse.add_argument('--id-column', help='A CSV/TSV column or JSONL field copied to the output records as id')
+    parse.add_argument('--model', default=default_model_name)
+    parse.add_argument('--batch-size', type=int, default=default_batch_size)
+    parse.add_argument('--workers', type=int, default=1, help='Number of parsing processes')
+    parse.add_argument('--cache-size', type=int, default=0)
+    parse.add_argument('--rule-fast-path', action='store_true')
+    parse.add_argument('--lean-pipeline', action='store_true',
+                       help='Load only the model components entity recognition needs')
+    parse.add_argument('--options', choices=sorted(parse_option_presets), default='noisy-accurate',
+                       help='The parse options preset, trusted-fast skips the autocorrect for sigs without typos')
+    parse.add_argument('-q', '--quiet', action='store_true', help='Do not print progress to stderr')
+    parse.set_defaults(run=run_parse)
+
+    serve = commands.add_parser('serve', help='Serve a local HTTP parsing service')
+    serve.add_argument('--host', default=server.default_host)
+    serve.add_argument('--port', type=int, default=server.default_port)
+    serve.add_argument('--model', default=default_model_name)
+    serve.add_argument('--max-batch-size', type=int, default=64, help='Maximum number of sigs in a model batch')
+    serve.add_argument('--max-wait-ms', type=float, default=5.0,
+                       help='How long a batch waits for more sigs before it is parsed')
+    serve.add_argument('--cache-size', type=int, default=0)
+    serve.add_argument('--rule-fast-path', action='store_true')
+    serve.add_argument('--lean-pipeline', action='store_true',
+                       help='Load only the model components entity recognition needs')
+    serve.set_defaults(run=run_serve)
+    return arg_parser
+
+
+def main(argv=None):
+    args = _build_arg_parser().parse_args(argv)
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+from array import array
+from typing import Iterable
+
+import numpy as np
+
+from parsigs.parse_sig_api import StructuredSig
+
+"""
+A columnar, compact form of many parsed sigs: one row per StructuredSig, stored as NumPy arrays.
+
+The string fields are dictionary encoded, as int32 codes into a list of their distinct values (-1 for None), so the
+frequency and period types take 4 bytes per row and a drug name is stored once however many sigs mention it. The
+numeric fields are stored as int64 or float64 values plus a boolean null mask. sig_index holds the index of the input
+sig every row was parsed from, as multiple instructions sigs are parsed to several rows.
+
+The columns map onto pandas Categorical and nullable arrays, and onto Arrow dictionary and masked arrays, without
+creating a Python object per row (pandas and pyarrow are only imported by to_pandas and to_arrow).
+"""
+
+_string_fields = ('drug', 'form', 'strength', 'frequencyType', 'periodType')
+_int_fields = ('periodAmount', 'times', 'interval')
+_float_fields = ('singleDosageAmount',)
+_field_order = [name for name in StructuredSig.__dataclass_fields__]
+
+
+class _ColumnsBuilder:
+    def __init__(self):
+        self.sig_index = array('q')
+        self.codes = {name: array('i') for name in _string_fields}
+        self.categories = {name: {} for name in _string_fields}
+        self.values = {name: array('q') for name in _int_fields}
+        self.values.update({name: array('d') for name in _float_fields})
+        self.nulls = {name: array('b') for name in _int_fields + _float_fields}
+        self.take_as_needed = array('b')
+
+    def append(self, index: int, structured_sig: StructuredSig):
+        self.sig_index.append(index)
+        for name in _string_fields:
+            value = getattr(structured_sig, name)
+            if value is None:
+                self.codes[name].append(-1)
+            else:
+                self.codes[name].append(self.categories[name].setdefault(value, len(self.categories[name])))
+        for name, values in self.values.items():
+            value = getattr(structured_sig, name)
+            self.nulls[name].append(value is None)
+            values.append(0 if value is None else value)
+        self.take_as_needed.append(bool(structured_sig.takeAsNeeded))
+
+    def build(self):
+        return StructuredSigColumns(
+            np.frombuffer(self.sig_index, dtype=np.int64),
+            {name: np.frombuffer(codes, dtype=np.int32) for name, codes in self.codes.items()},
+            {name: list(categories) for name, categories in self.categories.items()},
+            {name: np.frombuffer(values, dtype=np.int64 if name in _int_fields else np.float64)
+             for name, values in self.values.items()},
+            {name: np.frombuffer(nulls, dtype=np.bool_) for name, nulls in self.nulls.items()},
+            np.frombuffer(self.take_as_needed, dtype=np.bool_))
+
+
+class StructuredSigColumns:
+    def __init__(self, sig_index, codes: dict, categories: dict, values: dict, nulls: dict, take_as_needed):
+        self.sig_index = sig_index
+        self.codes = codes
+        self.categories = categories
+        self.values = values
+        self.nulls = nulls
+        self.take_as_needed = take_as_needed
+
+    @classmethod
+    def from_structured_sigs(cls, structured_sigs_per_sig: Iterable[list]):
+        """
+        Builds the columns from the StructuredSig lists of the input sigs, in the input order (as returned by
+        SigParser.parse_stream), without keeping the StructuredSig objects.
+        """
+        builder = _ColumnsBuilder()
+        for index, structured_sigs in enumerate(structured_sigs_per_sig):
+            for structured_sig in structured_sigs:
+                builder.append(index, structured_sig)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.sig_index)
+
+    def take(self, rows, sig_index):
+        """
+        The columns of the given rows (an array of row positions, in any order and with repeats), with a new
+        sig_index. The category lists are shared.
+        """
+        return StructuredSigColumns(np.asarray(sig_index, dtype=np.int64),
+                                    {name: codes[rows] for name, codes in self.codes.items()}, self.categories,
+                                    {name: values[rows] for name, values in self.values.items()},
+                                    {name: nulls[rows] for name, nulls in self.nulls.items()},
+                                    self.take_as_needed[rows])
+
+    @property
+    def nbytes(self):
+        """
+        The size of the arrays, the category lists hold the only Python objects.
+        """
+        arrays = [self.sig_index, self.take_as_needed, *self.codes.values(), *self.values.values(),
+                  *self.nulls.values()]
+        return sum(column.nbytes for column in arrays)
+
+    def row(self, i: int):
+        return StructuredSig(**{name: self._value(name, i) for name in _field_order})
+
+    def to_structured_sigs(self):
+        return [self.row(i) for i in range(len(self))]
+
+    def to_pandas(self):
+        import pandas as pd
+
+        columns = {'sig_index': self.sig_index}
+        for name in _field_order:
+            if name in self.codes:
+                columns[name] = pd.Categorical.from_codes(self.codes[name], self.categories[name])
+            elif name in _int_fields:
+                columns[name] = pd.arrays.IntegerArray(self.values[name], self.nulls[name])
+            elif name in _float_fields:
+                columns[name] = pd.arrays.FloatingArray(self.values[name], self.nulls[name])
+            else:
+                columns[name] = self.take_as_needed
+        return pd.DataFrame(columns)
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        columns = {'sig_index': pa.array(self.sig_index)}
+        for name in _field_order:
+            if name in self.codes:
+                codes = self.codes[name]
+                columns[name] = pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                                               pa.array(self.categories[name], pa.string()))
+            elif name in self.values:
+                columns[name] = pa.array(self.values[name], mask=self.nulls[name])
+            else:
+                columns[name] = pa.array(self.take_as_needed)
+        return pa.table(columns)
+
+    def _value(self, name: str, i: int):
+        if name in self.codes:
+            code = self.codes[name][i]
+            return self.categories[name][code] if code >= 0 else None
+        if name in self.values:
+            return None if self.nulls[name][i] else self.values[name][i].item()
+        return bool(self.take_as_needed[i])
@@ -0,0 +1,154 @@
+from threading import Lock
+
+from spellchecker import SpellChecker
+
+from parsigs.lru_cache import LRUCache
+
+"""
+Symmetric delete (SymSpell style) spelling correction over the word-frequency table of a SpellChecker.
+
+SpellChecker.correction generates every string within edit distance two of the misspelled word (hundreds of thousands
+of strings for a typical word) and looks each one up. Here every dictionary word is indexed once under the strings
+reachable by deleting up to max_distance characters from its prefix, so a correction only generates the deletes of the
+misspelled word, looks them up, and verifies the few candidates found with a bounded Damerau-Levenshtein distance.
+
+The correction is the same as SpellChecker.correction: the most frequent known word at the smallest edit distance
+(ties broken alphabetically), or the word itself if no known word is within max_distance edits.
+"""
+
+
+default_max_distance = 2
+default_prefix_length = 7
+
+
+def _deletes(word: str, distance: int):
+    deletes = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        deletes |= frontier
+    return deletes
+
+
+def _damerau_levenshtein(source: str, target: str, max_distance: int):
+    # unrestricted Damerau-Levenshtein, so a transposition can be combined with edits between the transposed letters
+    # (as SpellChecker does by applying two single edits one after the other)
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    infinity = len(source) + len(target)
+    rows = [[infinity] * (len(target) + 2)]
+    rows += [[infinity, i] + [0] * len(target) for i in range(len(source) + 1)]
+    rows[1] = [infinity] + list(range(len(target) + 1))
+    last_row_of_letter = {}
+    for i in range(1, len(source) + 1):
+        source_letter = source[i - 1]
+        last_matching_column = 0
+        row, previous_row = rows[i + 1], rows[i]
+        for j in range(1, len(target) + 1):
+            transposed_row = last_row_of_letter.get(target[j - 1], 0)
+            transposed_column = last_matching_column
+            if source_letter == target[j - 1]:
+                cost = 0
+                last_matching_column = j
+            else:
+                cost = 1
+            row[j + 1] = min(previous_row[j] + cost,
+                             row[j] + 1,
+                             previous_row[j + 1] + 1,
+                             rows[transposed_row][transposed_column]
+                             + (i - transposed_row - 1) + 1 + (j - transposed_column - 1))
+        last_row_of_letter[source_letter] = i
+    return rows[len(source) + 1][len(target) + 1]
+
+
+def _is_number(word: str):
+    try:
+        float(word)
+        return True
+    except ValueError:
+        return False
+
+
+class CorrectionIndex:
+    def __init__(self, spell_checker: SpellChecker, max_distance: int = default_max_distance,
+                 prefix_length: int = default_prefix_length, memo_size: int = 10000, deletes_index=None):
+        """
+        deletes_index, if given, is a prebuilt index of the spell checker's words for the same max_distance and
+        prefix_length (e.g. the one of a parsigs.frequency_store.FrequencyStore), used instead of building one.
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._frequencies = spell_checker.word_frequency.dictionary
+        self._longest_word_length = spell_checker.word_frequency.longest_word_length
+        self._deletes_index = deletes_index
+        self._index_lock = Lock()
+        # shared and locked, see the thread safety notes of parse_sig_api
+        self._memo = LRUCache(memo_size)
+
+    def correction(self, word: str):
+        corrected = self._memo.get(word)
+        if corrected is None:
+            corrected = self._correction(word)
+            self._memo.put(word, corrected)
+        return corrected
+
+    def build_index(self):
+        # the index is otherwise built on the first correction
+        self._get_deletes_index()
+
+    def memo_info(self):
+        return self._memo.info()
+
+    def _correction(self, word: str):
+        if word in self._frequencies or not self._should_correct(word):
+            return word
+
+        candidates_by_distance = {}
+        for candidate in self._candidates(word):
+            distance = _damerau_levenshtein(word, candidate, self.max_distance)
+            if distance <= self.max_distance:
+                candidates_by_distance.setdefault(distance, []).append(candidate)
+        if not candidates_by_distance:
+            return word
+        closest = candidates_by_distance[min(candidates_by_distance)]
+        return min(closest, key=lambda candidate: (-self._frequencies[candidate], candidate))
+
+    def _candidates(self, word: str):
+        deletes_index = self._get_deletes_index()
+        candidates = set()
+        for delete in _deletes(word[:self.prefix_length], self.max_distance):
+            indexed = deletes_index.get(delete)
+            if indexed is None:
+                continue
+            if isinstance(indexed, str):
+                candidates.add(indexed)
+            else:
+                candidates.update(indexed)
+        return candidates
+
+    def _should_correct(self, word: str):
+        # same words SpellChecker refuses to check, they are never corrected nor used as corrections
+        return len(word) <= self._longest_word_length + 3 and not _is_number(word)
+
+    def _get_deletes_index(self):
+        if self._deletes_index is None:
+            with self._index_lock:
+                if self._deletes_index is None:
+                    self._deletes_index = self._build_deletes_index()
+        return self._deletes_index
+
+    def _build_deletes_index(self):
+        deletes_index = {}
+        for word in self._frequencies:
+            if not self._should_correct(word):
+                continue
+            for delete in _deletes(word[:self.prefix_length], self.max_distance):
+                # most deletes belong to a single word, keep those as plain strings to save memory
+                indexed = deletes_index.get(delete)
+                if indexed is None:
+                    deletes_index[delete] = word
+                elif isinstance(indexed, str):
+                    deletes_index[delete] = [indexed, word]
+                else:
+                    indexed.append(word)
+        return deletes_index
@@ -0,0 +1,90 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from parsigs.columnar import StructuredSigColumns
+from parsigs.parse_sig_api import ParseOptions, _autocorrect_word, _chunked, _rewrite_words, default_batch_size, \
+    default_parse_options
+
+"""
+Parsing a whole column of sigs, a pandas Series or an Arrow string array, such as a DataFrame column that would
+otherwise be parsed row by row with Series.apply(sig_parser.parse).
+
+The pre processing is done for the column at once: the sigs are lower cased and split into words by the vectorized
+string methods of pandas (run by Arrow compute on Arrow backed columns), the words are factorized, and the per word
+steps of _pre_process (autocorrect, the twice/once/nightly replacement, the parentheses spacing, tab to tablet, number
+words and fractions) run once per distinct word of the column rather than once per word of every sig. Only the
+distinct pre processed sigs go through the model, in batches of batch_size (Language.pipe) and the rule mapping, and
+their rows are then repeated for every sig of the column with the same pre processed text.
+
+The result is a typed DataFrame (see StructuredSigColumns.to_pandas), one row per StructuredSig, indexed by the index
+labels of the sigs they were parsed from, so it can be joined back to the DataFrame the column belongs to. Null sigs
+have no rows. Importing this module registers the parsigs accessor of pandas Series:
+
+    df['sig'].parsigs.parse(sig_parser)    # same as sig_parser.parse_column(df['sig'])
+"""
+
+
+def _as_series(sigs):
+    if isinstance(sigs, pd.Series):
+        return sigs
+    # an Arrow Array or ChunkedArray, kept Arrow backed so the string methods run on Arrow compute
+    return sigs.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def pre_process_column(sigs, options: ParseOptions = default_parse_options):
+    """
+    The pre processed sigs of a Series or an Arrow string array, as an object Series with the index of the sigs,
+    None for null sigs. Every pre processed sig is identical to _pre_process of the sig with the same options.
+    """
+    sigs = _as_series(sigs)
+    # explode gives every sig at least one entry, a null one for null sigs and sigs without words, labelled with the
+    # position of the sig
+    words = sigs.reset_index(drop=True).str.lower().str.split().explode()
+    codes, distinct_words = pd.factorize(words)
+    # the null entries (code -1) pick the trailing empty string
+    rewritten = np.array([' '.join(_rewrite_words([_autocorrect_word(word) if options.autocorrect else word], options))
+                          for word in distinct_words] + [''], dtype=object)[codes].tolist()
+    ends = np.cumsum(np.bincount(words.index.to_numpy(), minlength=len(sigs))).tolist()
+    starts = [0] + ends[:-1]
+    sigs_preprocessed = [None if null else ' '.join(filter(None, rewritten[start:end]))
+                         for start, end, null in zip(starts, ends, sigs.isna().tolist())]
+    return pd.Series(sigs_preprocessed, index=sigs.index, dtype=object)
+
+
+def parse_column(sigs, structure, batch_size: int = default_batch_size, options: ParseOptions = default_parse_options):
+    """
+    structure is called with lists of up to batch_size distinct pre processed sigs and returns the list of
+    StructuredSig objects of every one of them, SigParser.parse_column passes its model and fast path. options are
+    those of the pre processing.
+    """
+    if batch_size < 1:
+        raise ValueError(f'batch_size must be a positive integer, got {batch_size}')
+    sigs = _as_series(sigs)
+    codes, distinct_sigs = pd.factorize(pre_process_column(sigs, options))
+    distinct_columns = StructuredSigColumns.from_structured_sigs(
+        chain.from_iterable(structure(batch) for batch in _chunked(distinct_sigs.tolist(), batch_size)))
+
+    # the rows of every distinct sig are contiguous, the null sigs (code -1) index the trailing zero count
+    counts = np.append(np.bincount(distinct_columns.sig_index, minlength=len(distinct_sigs)), 0)
+    starts = np.cumsum(counts) - counts
+    row_counts = counts[codes]
+    sig_index = np.repeat(np.arange(len(codes)), row_counts)
+    row_starts = np.cumsum(row_counts) - row_counts
+    rows = np.repeat(starts[codes] - row_starts, row_counts) + np.arange(len(sig_index))
+    frame = distinct_columns.take(rows, sig_index).to_pandas()
+    frame.index = sigs.index[sig_index]
+    return frame
+
+
+@pd.api.extensions.register_series_accessor('parsigs')
+class SigsAccessor:
+    def __init__(self, sigs: pd.Series):
+        self._sigs = sigs
+
+    def pre_process(self):
+        return pre_process_column(self._sigs)
+
+    def parse(self, sig_parser, batch_size: int = default_batch_size, options: ParseOptions = None):
+        return sig_parser.parse_column(self._sigs, batch_size, options)
@@ -0,0 +1,59 @@
+import re
+from typing import NamedTuple
+
+from parsigs.parse_sig_api import StructuredSig
+
+"""
+Document mode: parsing a long text that holds many sigs, such as a discharge medication list.
+
+The text is cut into sig sized segments by a few cheap rules: line breaks and bullets end a segment, and list markers
+("1.", "2)", "-", "*") at the start of a segment are dropped. Semicolons do not, they usually separate the
+instructions of a single sig ("take 1 tab po bid; take 2 tabs at bedtime"), which share its drug and form. Every
+segment is then parsed as a sig of its own (SigParser.parse_document batches them through the model), so autocorrect
+and the model never see the whole document and the multiple instructions split of a sig only groups the entities of
+its segment. The segmentation is a single regular expression pass, and the parsing cost of every segment depends only
+on its length, so the document is parsed in time linear in its length.
+
+Segments in which no entity is found, such as headers ("Discharge medications:") and free text lines, parse to a
+single empty StructuredSig and are left out of the results.
+"""
+
+_segment_pattern = re.compile(r'[^\r\n•]+')
+_list_marker_pattern = re.compile(r'(?:\d{1,3}[.)]|[-*])\s+')
+# what a sig without entities is parsed to
+_empty_structured_sigs = [StructuredSig(None, None, None, None, None, None, None, None)]
+
+
+class DocumentSig(NamedTuple):
+    # the character offsets of the segment in the document, text is document[start:end]
+    start: int
+    end: int
+    text: str
+    structured_sigs: list
+
+
+def segment_document(document: str):
+    """
+    The (start, end) character offsets of the sig segments of the document, in order, without surrounding
+    whitespace and list markers. Blank segments are skipped.
+    """
+    segments = []
+    for match in _segment_pattern.finditer(document):
+        start, end = match.span()
+        while start < end and document[start].isspace():
+            start += 1
+        marker = _list_marker_pattern.match(document, start, end)
+        if marker is not None:
+            start = marker.end()
+        while end > start and document[end - 1].isspace():
+            end -= 1
+        if start < end:
+            segments.append((start, end))
+    return segments
+
+
+def is_sig(structured_sigs: list):
+    """
+    Whether a segment parsed to structured_sigs holds a sig, rather than e.g. a header.
+    """
+    return structured_sigs != _empty_structured_sigs
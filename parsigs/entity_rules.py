@@ -0,0 +1,104 @@
+import re
+from typing import Optional
+
+"""
+The rules that read StructuredSig fields out of the text of a tagged entity, as tables compiled once into a single
+regular expression.
+
+EntityRules.scan goes over an entity text once, collecting the time units, keywords and whole word numbers in it, from
+which the entity handlers of parse_sig_api read the frequency type, interval, times and period amount. A new time unit
+or amount word is a new table entry, the scan and the handlers are unchanged. Table words are lower case letters and are
+matched anywhere in the text, so "hour" matches "hours" and "week" matches "weekly".
+"""
+
+# frequencyType and the words that imply it, by precedence: "every 2 hours at night" is Hour
+time_units = (
+    ('Hour', ('hour',)),
+    ('Week', ('week',)),
+    ('Month', ('month',)),
+    ('Year', ('year',)),
+    ('Day', ('day', 'daily', 'night', 'morning', 'evening', 'noon', 'bedtime')),
+)
+# the interval is the amount after it ("every 6 hours")
+interval_keyword = 'every'
+# the times are the amount before it ("3 times a day")
+times_keyword = 'times'
+# amounts implied by a word when there is no number, every other TIME_UNIT means every 2 days, weeks etc
+amount_words = {'other': 2}
+
+
+class EntityScan:
+    __slots__ = ('text', 'time_unit', '_keywords', '_numbers', '_amount_words')
+
+    def __init__(self, text: str, time_unit: Optional[str], keywords: dict, numbers: list, amount_words: list):
+        self.text = text
+        self.time_unit = time_unit
+        # the position of the first occurrence of every keyword found
+        self._keywords = keywords
+        # (start, end, value) of every run of digits, (start, end, amount) of every amount word
+        self._numbers = numbers
+        self._amount_words = amount_words
+
+    def amount(self, start: int = 0, end: int = None):
+        """
+        The first whole word number of text[start:end], or else the amount of the first amount word in it,
+        None if there is neither.
+        """
+        text = self.text
+        end = len(text) if end is None else end
+        for number_start, number_end, value in self._numbers:
+            if start <= number_start and number_end <= end and \
+                    (number_start == start or text[number_start - 1].isspace()) and \
+                    (number_end == end or text[number_end].isspace()):
+                return value
+        for word_start, word_end, value in self._amount_words:
+            if start <= word_start and word_end <= end:
+                return value
+        return None
+
+    def has_keyword(self, keyword: str):
+        return keyword in self._keywords
+
+    def amount_after(self, keyword: str):
+        position = self._keywords.get(keyword)
+        return None if position is None else self.amount(position + len(keyword))
+
+    def amount_before(self, keyword: str):
+        position = self._keywords.get(keyword)
+        return None if position is None else self.amount(0, position)
+
+
+class EntityRules:
+    def __init__(self, time_units=time_units, keywords=(interval_keyword, times_keyword), amount_words=amount_words):
+        # every table word and what it stands for: a time unit rank, a keyword or an amount
+        entries = [(word, ('time_unit', rank)) for rank, (_, words) in enumerate(time_units) for word in words]
+        entries += [(word, ('keyword', word)) for word in keywords]
+        entries += [(word, ('amount', amount)) for word, amount in amount_words.items()]
+        self._time_units = [frequency_type for frequency_type, _ in time_units]
+        words = sorted({word for word, _ in entries}, key=len, reverse=True)
+        # a lookahead, so that overlapping words are all found, only the longest word starting at a position is
+        # captured, it stands for the table words that are its prefixes as well
+        self._roles = {word: [(len(other), role) for other, role in entries if word.startswith(other)]
+                       for word in words}
+        first_letters = ''.join(sorted({word[0] for word in words}))
+        self._pattern = re.compile(r'(?=[%s])(?=(%s))|(\d+)' % (first_letters, '|'.join(map(re.escape, words))))
+
+    def scan(self, text: str):
+        rank = None
+        keywords = {}
+        numbers = []
+        amounts = []
+        for match in self._pattern.finditer(text):
+            word = match.group(1)
+            if word is None:
+                numbers.append((match.start(2), match.end(2), int(match.group(2))))
+                continue
+            start = match.start(1)
+            for length, (kind, value) in self._roles[word]:
+                if kind == 'time_unit':
+                    rank = value if rank is None else min(rank, value)
+                elif kind == 'keyword':
+                    keywords.setdefault(value, start)
+                else:
+                    amounts.append((start, start + length, value))
+        return EntityScan(text, None if rank is None else self._time_units[rank], keywords, numbers, amounts)
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import sqlite3
+from collections import namedtuple
+from itertools import islice
+from threading import Lock
+
+from spacy import Language
+
+from parsigs.rule_fast_path import EntitySpan
+
+"""
+On disk store of the NER model output, so the static rules (structuring, the Latin table, ...) can be re-evaluated over
+a corpus without running the model again.
+
+Every pre processed sig the model runs on is stored with the entity spans of its output (label and character offsets)
+and its token count, in a SQLite table keyed by a hash of the model version and the pre processed text. With
+SigParser(entity_store=path), the model is only run on the pre processed sigs missing from the store, the others are
+structured from their stored spans. A change to the pre processing changes the pre processed texts, so their entities
+are recomputed, as are those of another model version (from the model's meta, lang_name-version).
+"""
+
+EntityStoreInfo = namedtuple('EntityStoreInfo', ['hits', 'misses', 'size'])
+
+# SQLite limits the number of variables of a statement
+_lookup_chunk_size = 500
+
+
+def model_version(language: Language):
+    meta = language.meta
+    return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}"
+
+
+def _key(version: str, sig_preprocessed: str):
+    return hashlib.blake2b(f'{version}\n{sig_preprocessed}'.encode(), digest_size=16).digest()
+
+
+class StoredDoc:
+    """
+    The part of a spaCy Doc the sig structuring reads, rebuilt from the store.
+    """
+    __slots__ = ('text', 'ents', '_n_tokens')
+
+    def __init__(self, text: str, ents: list, n_tokens: int):
+        self.text = text
+        self.ents = ents
+        self._n_tokens = n_tokens
+
+    def __len__(self):
+        return self._n_tokens
+
+
+class EntityStore:
+    def __init__(self, path):
+        self.path = path
+        # the parsers of several threads or processes may share the store
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS entities '
+                                 '(key BLOB PRIMARY KEY, spans TEXT NOT NULL, n_tokens INTEGER NOT NULL)')
+        self._connection.commit()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        # counted once here, then kept up to date by put_many, other writers to the file are not seen
+        self._size = self._connection.execute('SELECT COUNT(*) FROM entities').fetchone()[0]
+
+    def get_many(self, version: str, sigs_preprocessed: list):
+        """
+        The StoredDoc of every pre processed sig, None for the sigs that are not in the store.
+        """
+        keys = [_key(version, sig_preprocessed) for sig_preprocessed in sigs_preprocessed]
+        rows = {}
+        with self._lock:
+            iterator = iter(set(keys))
+            for chunk in iter(lambda: list(islice(iterator, _lookup_chunk_size)), []):
+                rows.update((key, (spans, n_tokens)) for key, spans, n_tokens in self._connection.execute(
+                    f'SELECT key, spans, n_tokens FROM entities WHERE key IN ({",".join("?" * len(chunk))})', chunk))
+        docs = []
+        for key, sig_preprocessed in zip(keys, sigs_preprocessed):
+            row = rows.get(key)
+            if row is None:
+                docs.append(None)
+                continue
+            spans, n_tokens = row
+            docs.append(StoredDoc(sig_preprocessed, [EntitySpan(sig_preprocessed[start:end], label, start, end)
+                                                     for label, start, end in json.loads(spans)], n_tokens))
+        with self._lock:
+            self._misses += docs.count(None)
+            self._hits += len(docs) - docs.count(None)
+        return docs
+
+    def put_many(self, version: str, docs):
+        """
+        Stores the entities of the model output docs.
+        """
+        rows = [(_key(version, doc.text),
+                 json.dumps([(entity.label_, entity.start_char, entity.end_char) for entity in doc.ents]), len(doc))
+                for doc in docs]
+        with self._lock:
+            before = self._connection.total_changes
+            # the rows of keys already stored are left as they are, the same key has the same entities
+            self._connection.executemany('INSERT OR IGNORE INTO entities VALUES (?, ?, ?)', rows)
+            self._size += self._connection.total_changes - before
+            self._connection.commit()
+
+    def info(self):
+        """
+        size is the number of rows of the file when the store was opened plus those added through this store.
+        """
+        with self._lock:
+            return EntityStoreInfo(self._hits, self._misses, self._size)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StoreBackedModel:
+    """
+    Stands for the model in the parse path: the pre processed sigs found in the store are not run through the model,
+    the outputs of the others are stored.
+    """
+
+    def __init__(self, language: Language, store: EntityStore):
+        self.language = language
+        self.store = store
+        self.version = model_version(language)
+
+    def __call__(self, sig_preprocessed: str):
+        return next(self.pipe([sig_preprocessed]))
+
+    def pipe(self, sigs_preprocessed, batch_size: int = None):
+        sigs_preprocessed = list(sigs_preprocessed)
+        docs = self.store.get_many(self.version, sigs_preprocessed)
+        missing = [i for i, doc in enumerate(docs) if doc is None]
+        if missing:
+            model_outputs = list(self.language.pipe([sigs_preprocessed[i] for i in missing], batch_size=batch_size))
+            self.store.put_many(self.version, model_outputs)
+            for i, model_output in zip(missing, model_outputs):
+                docs[i] = model_output
+        # an iterator, as Language.pipe returns
+        return iter(docs)
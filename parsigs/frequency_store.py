@@ -0,0 +1,265 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+
+import spellchecker
+from spellchecker import SpellChecker
+
+from parsigs.correction_index import CorrectionIndex, default_max_distance, default_prefix_length
+
+"""
+Read only, memory mapped store of the merged spell checker word-frequency table (the English dictionary plus the drug
+names) and of the correction deletes index built over it (see parsigs.correction_index).
+
+The tables are flat arrays in a single file: every string table is its strings concatenated, their offsets and an open
+addressing hash table of their positions, so a lookup hashes the word, probes the slots and compares bytes in place.
+Nothing is unpacked into Python objects, the file is mapped read only, so every process using the store shares the
+same page cache copy of it instead of building the dictionary and the index on its own heap.
+The store is optional, build it once with:
+
+    python -m parsigs.frequency_store [path]
+
+and point PARSIGS_FREQUENCY_STORE to it when it is not written to the default location. A store that does not match
+the current resources, pyspellchecker version or correction index parameters is ignored.
+"""
+
+store_env_var = 'PARSIGS_FREQUENCY_STORE'
+default_store_path = Path(__file__).parent / 'resources/word_frequency.store'
+
+_magic = b'PSFS'
+# bump when the layout or the rules that build the merged table change
+_store_format_version = 1
+_prefix = struct.Struct('<4sII')
+# the arrays are in the byte order of the machine that wrote them, every section starts aligned to 8 bytes
+_sections = ('word_offsets', 'word_blob', 'word_slots', 'frequencies',
+             'delete_offsets', 'delete_blob', 'delete_slots', 'posting_offsets', 'postings')
+_section_formats = {'word_blob': 'B', 'delete_blob': 'B', 'frequencies': 'q'}
+
+
+def store_path():
+    return Path(os.environ.get(store_env_var, default_store_path))
+
+
+def store_source_key(*resource_paths):
+    digest = hashlib.sha1(f'{_store_format_version}:{spellchecker.__version__}:{default_max_distance}:'
+                          f'{default_prefix_length}'.encode())
+    for resource_path in resource_paths:
+        digest.update(Path(resource_path).read_bytes())
+    return digest.hexdigest()
+
+
+class _StringTable:
+    def __init__(self, offsets: memoryview, blob: memoryview, slots: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+        self._slots = slots
+        self._mask = len(slots) - 1
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def string(self, i: int):
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def index(self, key: str):
+        """
+        The position of key in the table, -1 if it is not in it.
+        """
+        data = key.encode('utf-8')
+        offsets, blob, slots, mask = self._offsets, self._blob, self._slots, self._mask
+        slot = zlib.crc32(data) & mask
+        entry = slots[slot]
+        while entry != 0:
+            start, end = offsets[entry - 1], offsets[entry]
+            if end - start == len(data) and blob[start:end] == data:
+                return entry - 1
+            slot = (slot + 1) & mask
+            entry = slots[slot]
+        return -1
+
+
+def _string_table_arrays(strings):
+    offsets = array('I', [0])
+    blob = bytearray()
+    encoded = [string.encode('utf-8') for string in strings]
+    for data in encoded:
+        blob += data
+        offsets.append(len(blob))
+    # at most half full, so probe sequences stay short
+    capacity = 1 << max(1, (2 * len(encoded) - 1).bit_length())
+    slots = array('I', bytes(4 * capacity))
+    for i, data in enumerate(encoded):
+        slot = zlib.crc32(data) & (capacity - 1)
+        while slots[slot] != 0:
+            slot = (slot + 1) & (capacity - 1)
+        slots[slot] = i + 1
+    return offsets, bytes(blob), slots
+
+
+class _DeletesIndex:
+    """
+    The deletes index of a FrequencyStore, with the get of the dict CorrectionIndex builds.
+    """
+
+    def __init__(self, deletes: _StringTable, posting_offsets: memoryview, postings: memoryview, words: _StringTable):
+        self._deletes = deletes
+        self._posting_offsets = posting_offsets
+        self._postings = postings
+        self._words = words
+
+    def get(self, delete: str, default=None):
+        i = self._deletes.index(delete)
+        if i < 0:
+            return default
+        return [self._words.string(word_index)
+                for word_index in self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]]
+
+
+class FrequencyStore(Mapping):
+    """
+    The word to frequency mapping of a store file, with the word statistics of the spell checker it was built from.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as store_file:
+            self._mmap = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _prefix.size or \
+                _prefix.unpack_from(self._mmap)[:2] != (_magic, _store_format_version):
+            self._mmap.close()
+            raise ValueError(f'{path} is not a version {_store_format_version} frequency store')
+        header_length = _prefix.unpack_from(self._mmap)[2]
+        header = json.loads(self._mmap[_prefix.size:_prefix.size + header_length])
+        if header['byteorder'] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f'{path} was written on a {header["byteorder"]} endian machine')
+        self.source_key = header['source_key']
+        self.total_words = header['total_words']
+        self.unique_words = header['unique_words']
+        self.letters = set(header['letters'])
+        self.longest_word_length = header['longest_word_length']
+
+        buffer = memoryview(self._mmap)
+        sections = {name: buffer[start:end].cast(_section_formats.get(name, 'I'))
+                    for name, (start, end) in header['sections'].items()}
+        self._words = _StringTable(sections['word_offsets'], sections['word_blob'], sections['word_slots'])
+        self._frequencies = sections['frequencies']
+        self.deletes_index = _DeletesIndex(
+            _StringTable(sections['delete_offsets'], sections['delete_blob'], sections['delete_slots']),
+            sections['posting_offsets'], sections['postings'], self._words)
+
+    def __getitem__(self, word):
+        i = self._words.index(word) if isinstance(word, str) else -1
+        if i < 0:
+            raise KeyError(word)
+        return self._frequencies[i]
+
+    def __contains__(self, word):
+        return isinstance(word, str) and self._words.index(word) >= 0
+
+    def get(self, word, default=None):
+        i = self._words.index(word) if isinstance(word, str) else -1
+        return self._frequencies[i] if i >= 0 else default
+
+    def __iter__(self):
+        return (self._words.string(i) for i in range(len(self._words)))
+
+    def __len__(self):
+        return len(self._words)
+
+    def spell_checker(self):
+        """
+        A SpellChecker whose word-frequency table is this store, read only.
+        """
+        spell_checker = SpellChecker(language=None)
+        word_frequency = spell_checker.word_frequency
+        word_frequency._dictionary = self
+        word_frequency._total_words = self.total_words
+        word_frequency._unique_words = self.unique_words
+        word_frequency._letters = self.letters
+        word_frequency._longest_word_length = self.longest_word_length
+        return spell_checker
+
+
+def write_store(spell_checker: SpellChecker, path, source_key: str):
+    word_frequency = spell_checker.word_frequency
+    words = sorted(word_frequency.dictionary)
+    word_indices = {word: i for i, word in enumerate(words)}
+    word_offsets, word_blob, word_slots = _string_table_arrays(words)
+    frequencies = array('q', (word_frequency.dictionary[word] for word in words))
+
+    deletes_index = CorrectionIndex(spell_checker)._build_deletes_index()
+    deletes = sorted(deletes_index)
+    delete_offsets, delete_blob, delete_slots = _string_table_arrays(deletes)
+    posting_offsets = array('I', [0])
+    postings = array('I')
+    for delete in deletes:
+        indexed = deletes_index[delete]
+        postings.extend(word_indices[word] for word in ([indexed] if isinstance(indexed, str) else indexed))
+        posting_offsets.append(len(postings))
+
+    arrays = {'word_offsets': word_offsets, 'word_blob': word_blob, 'word_slots': word_slots,
+              'frequencies': frequencies, 'delete_offsets': delete_offsets, 'delete_blob': delete_blob,
+              'delete_slots': delete_slots, 'posting_offsets': posting_offsets, 'postings': postings}
+    header = {
+        'source_key': source_key,
+        'byteorder': sys.byteorder,
+        'total_words': word_frequency.total_words,
+        'unique_words': word_frequency.unique_words,
+        'letters': ''.join(sorted(word_frequency.letters)),
+        'longest_word_length': word_frequency.longest_word_length,
+    }
+    # the section positions depend on the header length, which depends on them: reserve digits for them first
+    sections_start = _prefix.size + len(json.dumps(dict(header, sections={
+        name: [10 ** 12, 10 ** 12] for name in _sections}))) + 8
+    position = sections_start
+    header['sections'] = {}
+    for name in _sections:
+        position += -position % 8
+        length = len(arrays[name]) * (arrays[name].itemsize if isinstance(arrays[name], array) else 1)
+        header['sections'][name] = [position, position + length]
+        position += length
+    encoded_header = json.dumps(header).encode().ljust(sections_start - _prefix.size)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as store_file:
+        store_file.write(_prefix.pack(_magic, _store_format_version, len(encoded_header)))
+        store_file.write(encoded_header)
+        for name in _sections:
+            start, _ = header['sections'][name]
+            store_file.write(bytes(start - store_file.tell()))
+            store_file.write(bytes(arrays[name]))
+    os.replace(tmp_path, path)
+
+
+"""
+Returns the store at path, or None if there is no store or it is stale.
+"""
+
+
+def open_store(path, source_key: str):
+    try:
+        store = FrequencyStore(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return store if store.source_key == source_key else None
+
+
+def main(argv=None):
+    from parsigs.parse_sig_api import _build_spell_checker, drug_names_path
+
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0]) if argv else store_path()
+    write_store(_build_spell_checker(), path, store_source_key(drug_names_path))
+    print(f'Wrote frequency store to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import logging
+import warnings
+from pathlib import Path
+
+import spacy
+from spacy.language import Language
+
+"""
+Loads only the spaCy pipeline components the sig parsing needs.
+
+Only doc.ents is read from the model output, so the components that set entities (ner, entity_ruler or any component
+whose factory assigns doc.ents) are kept, together with the embedding components (tok2vec, transformer) that their
+models listen to. Every other component (tagger, parser, lemmatizer, ...) is excluded from spacy.load, so its weights
+are neither loaded nor run.
+
+The kept components are found from the model's config.cfg, without loading the model. If a kept component requires
+an attribute (e.g. token.pos) that an excluded component assigns, the excluded component turns out to be needed: a
+warning is issued and the component is kept.
+"""
+
+logger = logging.getLogger(__name__)
+
+_entity_factories = ('ner', 'beam_ner', 'entity_ruler')
+_embedding_factories = ('tok2vec', 'transformer')
+
+
+class LeanPipelineWarning(UserWarning):
+    pass
+
+
+def _model_path(model_name):
+    if spacy.util.is_package(model_name):
+        package_path = spacy.util.get_package_path(model_name)
+        meta = spacy.util.get_model_meta(package_path)
+        return package_path / f"{meta['lang']}_{meta['name']}-{meta['version']}"
+    return Path(model_name)
+
+
+def _listened_components(model_config, embedding_components):
+    """
+    The names of the embedding components a component's model listens to ("*" listens to all of them).
+    """
+    if not isinstance(model_config, dict):
+        return set()
+    listened = set()
+    if 'Listener' in str(model_config.get('@architectures', '')) and 'upstream' in model_config:
+        upstream = model_config['upstream']
+        listened |= set(embedding_components) if upstream == '*' else {upstream}
+    for value in model_config.values():
+        listened |= _listened_components(value, embedding_components)
+    return listened
+
+
+def _factory_meta(factory):
+    if factory is None:
+        return None
+    try:
+        return Language.get_factory_meta(factory)
+    except ValueError:
+        return None
+
+
+def _sets_entities(factory):
+    meta = _factory_meta(factory)
+    return factory in _entity_factories or (meta is not None and 'doc.ents' in meta.assigns)
+
+
+def _assigned_by(components):
+    assigned = {}
+    for name, factory in components.items():
+        meta = _factory_meta(factory)
+        for attribute in (meta.assigns if meta is not None else []):
+            assigned.setdefault(attribute, name)
+    return assigned
+
+
+def components_to_exclude(config):
+    """
+    The names of the pipeline components of the config that sig parsing does not need.
+    """
+    if hasattr(spacy.util.registry, 'ensure_populated'):
+        # factory meta data is only registered once the registry is populated
+        spacy.util.registry.ensure_populated()
+    pipeline = config['nlp']['pipeline']
+    # sourced components have no factory in the config, they are kept as their role is unknown
+    factories = {name: config['components'][name].get('factory') for name in pipeline}
+    embedding_components = [name for name, factory in factories.items() if factory in _embedding_factories]
+
+    if not any(_sets_entities(factory) for factory in factories.values()):
+        warnings.warn(f'No entity recognition component in {pipeline}, loading the full pipeline',
+                      LeanPipelineWarning)
+        return []
+    keep = {name for name, factory in factories.items() if _sets_entities(factory) or factory is None}
+    checked = set()
+    while keep - checked:
+        name = (keep - checked).pop()
+        checked.add(name)
+        keep |= _listened_components(config['components'][name].get('model'), embedding_components)
+        excluded = {other: factories[other] for other in pipeline if other not in keep}
+        assigned = _assigned_by(excluded)
+        meta = _factory_meta(factories[name])
+        for attribute in (meta.requires if meta is not None else []):
+            if attribute in assigned:
+                warnings.warn(f'{name} requires {attribute}, assigned by the excluded {assigned[attribute]} '
+                              f'component, which is kept', LeanPipelineWarning)
+                keep.add(assigned[attribute])
+    return [name for name in pipeline if name not in keep]
+
+
+def load_lean(model_name):
+    """
+    spacy.load of only the components sig parsing needs.
+    """
+    config = spacy.util.load_config(_model_path(model_name) / 'config.cfg')
+    exclude = components_to_exclude(config)
+    logger.debug('loading %s without %s', model_name, exclude)
+    return spacy.load(model_name, exclude=exclude)
@@ -0,0 +1,57 @@
+from collections import OrderedDict, namedtuple
+from contextlib import nullcontext
+from threading import Lock
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+_missing = object()
+
+"""
+A size bounded, thread safe, least recently used mapping with hit, miss and eviction counters.
+With thread_safe=False it takes no lock, for a cache only ever used by a single thread.
+"""
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, thread_safe: bool = True):
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be a positive integer, got {maxsize}')
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock() if thread_safe else nullcontext()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _missing)
+            if value is _missing:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
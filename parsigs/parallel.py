@@ -0,0 +1,102 @@
+import gc
+import multiprocessing
+import os
+import sys
+from collections import deque
+from itertools import chain
+from typing import Iterable
+
+from parsigs.parse_sig_api import SigParser, StreamResult, _chunked, _deduplicate, _fan_out, _load_resources, \
+    default_batch_size, default_model_name
+
+"""
+Parses sigs on several worker processes, each holding a SigParser that is loaded only once.
+
+On Linux the workers are forked: the model and every lazily loaded resource (spell checker, correction index, Latin
+table) are loaded in the parent before the workers are started, so the workers inherit them and share their memory
+pages copy-on-write. Elsewhere the platform's default start method is used (fork is not safe with the system
+frameworks of macOS), and every worker loads its own SigParser when it starts.
+Work is handed out in chunks of chunk_size sigs, and the results are returned in the input order. Only the distinct
+sigs of a chunk are sent to the workers, the results of repeated sigs are copied in the parent.
+"""
+
+_worker_parser = None
+
+
+def _init_worker(parser_kwargs):
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = SigParser(**parser_kwargs)
+
+
+def _parse_chunk(sigs, batch_size):
+    return [result.structured_sigs for result in _worker_parser.parse_stream(sigs, batch_size)]
+
+
+def _chunk_results(async_result, unique_indices):
+    return _fan_out(async_result.get(), unique_indices)
+
+
+class ParallelSigParser:
+    def __init__(self, n_process: int = None, model_name=default_model_name, chunk_size: int = default_batch_size,
+                 batch_size: int = default_batch_size, start_method: str = None, **parser_kwargs):
+        """
+        n_process defaults to the number of CPUs. parser_kwargs are passed to every worker's SigParser.
+        start_method defaults to fork on Linux and to multiprocessing's default start method elsewhere.
+        """
+        global _worker_parser
+        if chunk_size < 1 or batch_size < 1:
+            raise ValueError('chunk_size and batch_size must be positive integers')
+        self.n_process = n_process or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        parser_kwargs = dict(parser_kwargs, model_name=model_name)
+        if start_method is None and sys.platform.startswith('linux'):
+            start_method = 'fork'
+        context = multiprocessing.get_context(start_method)
+        start_method = context.get_start_method()
+
+        if start_method == 'fork':
+            _worker_parser = SigParser(**parser_kwargs)
+            _load_resources()
+            # keeps the garbage collector from touching, and so copying, the inherited objects in the workers
+            gc.freeze()
+        self._pool = context.Pool(self.n_process, initializer=_init_worker, initargs=(parser_kwargs,))
+        if start_method == 'fork':
+            _worker_parser = None
+            gc.unfreeze()
+
+    def parse_many(self, sigs: list):
+        return list(chain.from_iterable(result.structured_sigs for result in self.parse_stream(sigs)))
+
+    def parse_stream(self, sigs: Iterable[str]):
+        """
+        Same as SigParser.parse_stream, with the chunks parsed on the worker processes.
+        Only a bounded number of chunks is read ahead of the workers.
+        """
+        pending = deque()
+        index = 0
+        for chunk in _chunked(sigs, self.chunk_size):
+            unique_sigs, unique_indices = _deduplicate(chunk)
+            pending.append((self._pool.apply_async(_parse_chunk, (unique_sigs, self.batch_size)), unique_indices))
+            if len(pending) >= 2 * self.n_process:
+                for structured_sigs in _chunk_results(*pending.popleft()):
+                    yield StreamResult(index, structured_sigs)
+                    index += 1
+        while pending:
+            for structured_sigs in _chunk_results(*pending.popleft()):
+                yield StreamResult(index, structured_sigs)
+                index += 1
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.terminate()
@@ -1,17 +1,35 @@
 import sys
+import time
+import logging
 from pathlib import Path
 
 import spacy
 from word2number import w2n
 import re
 from spacy import Language
-from itertools import chain
+from itertools import chain, islice
 from dataclasses import dataclass, replace
+from typing import Iterable, NamedTuple
+from contextlib import contextmanager
 import copy
 import os
+import threading
+import weakref
+from functools import lru_cache
 from spellchecker import SpellChecker
 import json
-import inflect
+
+from parsigs import frequency_store, spell_checker_snapshot
+from parsigs.correction_index import CorrectionIndex
+from parsigs.entity_rules import EntityRules, interval_keyword, times_keyword
+from parsigs.entity_store import EntityStore, StoreBackedModel
+from parsigs.lean_pipeline import load_lean
+from parsigs.lru_cache import LRUCache, CacheInfo
+from parsigs.profiling import ParseProfiler, SigProfile
+from parsigs.rule_fast_path import RuleFastPath, FastPathInfo, _load_single_word_drug_names
+from parsigs.sig_vocabulary import SigVocabulary, as_needed, latin_frequency
+
+_dataclass_slots = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 """
 Represents a structured medication dosage instructions.
@@ -35,10 +53,14 @@ periodAmount : int
     The duration of the period for the dosage (e.g. 7 days, 2 months, etc.).
 takeAsNeeded : bool
     Some instructions contains a statement that the medication should be taken as needed by patient
+
+Instances are slotted (on Python 3.10+) and have no per instance __dict__, as bulk jobs keep millions of them.
+The string fields hold shared references (e.g. every frequencyType="Day" is the same str object), so they add no
+memory per sig. For a compact form of many parsed sigs see parsigs.columnar.StructuredSigColumns.
 """
 
 
-@dataclass
+@dataclass(**_dataclass_slots)
 class StructuredSig:
     drug: str
     form: str
@@ -53,35 +75,194 @@ class StructuredSig:
 
 
 dose_instructions = ['take', 'inhale', 'instill', 'apply', 'spray', 'swallow']
+# units and abbreviations that are valid in sigs but unknown to (or "corrected" by) the english spell checker
+domain_words = ['mg', 'mcg', 'ml', 'g', 'kg', 'l', 'iu', 'meq', 'gtt', 'gtts', 'po', 'prn', 'hs', 'qhs', 'qam', 'qpm',
+                'ac', 'pc', 'sl', 'od', 'os', 'ou', 'tab', 'tabs', 'cap', 'caps']
 number_words = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]
 
 default_model_name = "en_parsigs"
+default_batch_size = 256
 
-inflect_engine = inflect.engine()
+logger = logging.getLogger(__name__)
 
+drug_names_path = Path(__file__).parent / 'resources/drug_names.txt'
+latin_frequency_path = Path(__file__).parent / 'resources/latin_frequency.json'
 
-def _open_latin_type_dict():  # add parameters path, name
-    latin_frequency_file_path = Path(__file__).parent / 'resources/latin_frequency.json'
-    with open(latin_frequency_file_path, 'r') as latin_file:
-        return json.load(latin_file)
+"""
+The resources below are loaded lazily on first use and then shared by the whole process,
+so importing this module and creating a SigParser stay cheap.
+"""
 
 
-latin_type_dict = _open_latin_type_dict()
+@lru_cache(maxsize=None)
+def _get_inflect_engine():
+    import inflect
+    return inflect.engine()
 
 
-def _create_spell_checker():
+@lru_cache(maxsize=None)
+def _get_latin_type_dict():
+    return _open_latin_type_dict()
+
+
+@lru_cache(maxsize=None)
+def _get_spell_checker():
+    return _create_spell_checker()
+
+
+@lru_cache(maxsize=None)
+def _get_frequency_store():
+    return frequency_store.open_store(frequency_store.store_path(), frequency_store.store_source_key(drug_names_path))
+
+
+@lru_cache(maxsize=None)
+def _get_correction_index():
+    store = _get_frequency_store()
+    return CorrectionIndex(_get_spell_checker(), deletes_index=store.deletes_index if store is not None else None)
+
+
+@lru_cache(maxsize=None)
+def _get_sig_vocabulary():
+    return SigVocabulary(_get_latin_type_dict(), dose_instructions)
+
+
+@lru_cache(maxsize=None)
+def _get_domain_words():
+    return frozenset(domain_words).union(_get_latin_type_dict())
+
+
+def _load_resources():
+    # loads every lazy resource up front, e.g. before forking worker processes that share them copy-on-write
+    _get_inflect_engine()
+    _get_domain_words()
+    _get_sig_vocabulary()
+    _load_single_word_drug_names()
+    _get_correction_index().build_index()
+
+
+def _open_latin_type_dict():  # add parameters path, name
+    with open(latin_frequency_path, 'r') as latin_file:
+        return json.load(latin_file)
+
+
+def _build_spell_checker():
     sc = SpellChecker()
-    drug_words_frequency = Path(__file__).parent / 'resources/drug_names.txt'
-    sc.word_frequency.load_text_file(drug_words_frequency)
+    sc.word_frequency.load_text_file(drug_names_path)
     sc.word_frequency.remove_words(["talbot"])
     return sc
 
 
-spell_checker = _create_spell_checker()
+def _create_spell_checker():
+    # prefer the memory mapped store, shared by every process using it, then the precompiled snapshot of the merged
+    # word-frequency table, if one was built
+    store = _get_frequency_store()
+    if store is not None:
+        return store.spell_checker()
+    sc = spell_checker_snapshot.read_snapshot(spell_checker_snapshot.snapshot_path(),
+                                              spell_checker_snapshot.snapshot_source_key(drug_names_path))
+    return sc if sc is not None else _build_spell_checker()
+
+
+_lazy_module_attributes = {
+    'inflect_engine': _get_inflect_engine,
+    'latin_type_dict': _get_latin_type_dict,
+    'spell_checker': _get_spell_checker,
+}
 
 
-def _flatmap(func, iterable):
-    return list(chain.from_iterable(map(func, iterable)))
+def __getattr__(name):
+    # these used to be built at import time, keep them reachable as module attributes
+    if name in _lazy_module_attributes:
+        return _lazy_module_attributes[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+"""
+Throughput report of a single parse_many batch, passed to the on_batch callback.
+Attributes:
+-----------
+batch_index : int
+    The position of the batch in the parsed input, starting from 0.
+size : int
+    The number of sigs in the batch.
+seconds : float
+    Wall time spent pre processing, running the model and structuring the batch.
+duplicates : int
+    The number of sigs of the batch that repeat an earlier sig of the batch (ignoring case and whitespace), they are
+    parsed once and copied.
+"""
+
+
+@dataclass
+class BatchStats:
+    batch_index: int
+    size: int
+    seconds: float
+    duplicates: int = 0
+
+    @property
+    def sigs_per_second(self):
+        return self.size / self.seconds if self.seconds > 0 else float('inf')
+
+
+class StreamResult(NamedTuple):
+    index: int
+    structured_sigs: list
+
+
+"""
+The stages of the parsing that can be switched off, e.g. for clean, machine generated sigs.
+Attributes:
+-----------
+autocorrect : bool
+    Spelling correction of the sig words (_autocorrect_word), which can also "correct" valid abbreviations.
+number_words : bool
+    Conversion of the number words ("one" ... "ten") to digits.
+fractions : bool
+    Conversion of the fractions ("1/2") to decimals.
+latin_frequencies : bool
+    Lookup of the Latin frequency abbreviations ("bid", "q6h", ...) in the Latin table.
+singularize : bool
+    Turning the forms to singular (_to_singular), "tablets" to "tablet".
+
+SigParser takes the options of every parse call, or one of parse_option_presets by name:
+'noisy-accurate' runs every stage (the default), 'trusted-fast' skips the autocorrect, for sigs without typos such as
+machine generated ones. The other stages are dictionary lookups and cost little.
+"""
+
+
+class ParseOptions(NamedTuple):
+    autocorrect: bool = True
+    number_words: bool = True
+    fractions: bool = True
+    latin_frequencies: bool = True
+    singularize: bool = True
+
+
+default_parse_options = ParseOptions()
+parse_option_presets = {
+    'noisy-accurate': default_parse_options,
+    'trusted-fast': ParseOptions(autocorrect=False),
+}
+
+
+def _resolve_options(options):
+    if options is None:
+        return default_parse_options
+    if not isinstance(options, str):
+        return options
+    if options not in parse_option_presets:
+        raise ValueError(f'Unknown parse options preset {options!r}, expected one of {sorted(parse_option_presets)}')
+    return parse_option_presets[options]
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 """
@@ -90,32 +271,261 @@ The input string is pre processed, and than combining static rules and NER model
 """
 
 
-def _parse_sigs(sig_lst, model: Language):
-    return _flatmap(lambda sig: _parse_sig(sig, model), sig_lst)
+def _parse_sigs(sig_lst, model: Language, batch_size=default_batch_size, on_batch=None, cache: LRUCache = None,
+                fast_path: RuleFastPath = None, profiler: ParseProfiler = None,
+                options: ParseOptions = default_parse_options):
+    return list(chain.from_iterable(_parse_sig_batches(sig_lst, model, batch_size, on_batch, cache, fast_path,
+                                                       profiler, options)))
+
+
+"""
+Parses the sigs in chunks of batch_size, running every chunk through the model with a single Language.pipe call.
+Only the first of the sigs of a chunk with the same normalized text is parsed, the others get copies of its result.
+Yields the list of StructuredSig objects of every input sig, in the input order.
+"""
 
 
-def _parse_sig(sig: str, model: Language):
-    sig_preprocessed = _pre_process(sig)
+def _parse_sig_batches(sig_lst, model: Language, batch_size=default_batch_size, on_batch=None, cache: LRUCache = None,
+                       fast_path: RuleFastPath = None, profiler: ParseProfiler = None,
+                       options: ParseOptions = default_parse_options):
+    if batch_size < 1:
+        raise ValueError(f'batch_size must be a positive integer, got {batch_size}')
+    for batch_index, batch in enumerate(_chunked(sig_lst, batch_size)):
+        start = time.perf_counter()
+        unique_sigs, unique_indices = _deduplicate(batch)
+        if profiler is None:
+            structured_sigs = _parse_batch(unique_sigs, model, batch_size, cache, fast_path, options)
+        else:
+            profiler.record_duplicates(len(batch) - len(unique_sigs))
+            structured_sigs = _parse_batch_profiled(unique_sigs, model, batch_size, profiler, cache, fast_path,
+                                                    options)
+        structured_sigs = _fan_out(structured_sigs, unique_indices)
+        stats = BatchStats(batch_index, len(batch), time.perf_counter() - start, len(batch) - len(unique_sigs))
+        logger.debug('parsed batch %d: %d sigs (%d duplicates) in %.3fs (%.1f sigs/s)',
+                     stats.batch_index, stats.size, stats.duplicates, stats.seconds, stats.sigs_per_second)
+        if on_batch is not None:
+            on_batch(stats)
+        yield from structured_sigs
+
+
+"""
+The sigs with distinct normalized texts (the first of each) and, for every sig, the position of its text among them.
+"""
+
+
+def _deduplicate(sigs):
+    positions = {}
+    unique_sigs = []
+    unique_indices = []
+    for sig in sigs:
+        key = _normalize_sig(sig)
+        index = positions.get(key)
+        if index is None:
+            index = positions[key] = len(unique_sigs)
+            unique_sigs.append(sig)
+        unique_indices.append(index)
+    return unique_sigs, unique_indices
+
+
+def _fan_out(unique_results, unique_indices):
+    if len(unique_indices) == len(unique_results):
+        return unique_results
+    # the first sig of every text gets the parsed StructuredSig objects, the others copies of them
+    used = [False] * len(unique_results)
+    results = []
+    for index in unique_indices:
+        results.append(_copy_structured_sigs(unique_results[index]) if used[index] else unique_results[index])
+        used[index] = True
+    return results
+
+
+def _parse_batch(batch, model: Language, batch_size, cache: LRUCache = None, fast_path: RuleFastPath = None,
+                 options: ParseOptions = default_parse_options):
+    if cache is None:
+        return _parse_preprocessed([_pre_process(sig, options) for sig in batch], model, batch_size, fast_path, options)
+
+    keys = [_cache_key(sig, options) for sig in batch]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, structured_sigs in enumerate(results) if structured_sigs is None]
+    for i, structured_sigs in zip(missing, _parse_batch([batch[i] for i in missing], model, batch_size,
+                                                        fast_path=fast_path, options=options)):
+        cache.put(keys[i], structured_sigs)
+        results[i] = structured_sigs
+    return [_copy_structured_sigs(structured_sigs) for structured_sigs in results]
+
+
+def _parse_preprocessed(sigs_preprocessed, model: Language, batch_size, fast_path: RuleFastPath = None,
+                        options: ParseOptions = default_parse_options):
+    if fast_path is None:
+        return [_create_structured_sigs(model_output, options)
+                for model_output in model.pipe(sigs_preprocessed, batch_size=batch_size)]
+    # only the sigs the fast path could not fully recognise are sent to the model
+    rule_entities = [fast_path.match(sig_preprocessed) for sig_preprocessed in sigs_preprocessed]
+    model_outputs = model.pipe([sig_preprocessed for sig_preprocessed, entities in zip(sigs_preprocessed, rule_entities)
+                                if entities is None], batch_size=batch_size)
+    return [_create_structured_sigs(next(model_outputs), options) if entities is None
+            else _structure_entities(entities, options=options) for entities in rule_entities]
+
+
+"""
+Same as _parse_batch, recording the SigProfile of every parsed sig in the profiler (see parsigs.profiling).
+The pre processing is the same as _pre_process, with the autocorrected words materialized in between to time the
+autocorrect apart from the rest.
+"""
+
+
+def _parse_batch_profiled(batch, model: Language, batch_size, profiler: ParseProfiler, cache: LRUCache = None,
+                          fast_path: RuleFastPath = None, options: ParseOptions = default_parse_options):
+    if cache is not None:
+        keys = [_cache_key(sig, options) for sig in batch]
+        results = [cache.get(key) for key in keys]
+        missing = [i for i, structured_sigs in enumerate(results) if structured_sigs is None]
+        profiler.record_cache_hits(len(batch) - len(missing))
+        for i, structured_sigs in zip(missing, _parse_batch_profiled([batch[i] for i in missing], model, batch_size,
+                                                                     profiler, fast_path=fast_path, options=options)):
+            cache.put(keys[i], structured_sigs)
+            results[i] = structured_sigs
+        return [_copy_structured_sigs(structured_sigs) for structured_sigs in results]
+
+    sigs_preprocessed = []
+    pre_process_profiles = []
+    for sig in batch:
+        start = time.perf_counter()
+        words = sig.lower().split()
+        corrected_words = list(map(_autocorrect_word, words)) if options.autocorrect else words
+        autocorrected = time.perf_counter()
+        sigs_preprocessed.append(' '.join(_rewrite_words(corrected_words, options)))
+        corrections = sum(word != corrected_word for word, corrected_word in zip(words, corrected_words))
+        pre_process_profiles.append((autocorrected - start, time.perf_counter() - autocorrected, corrections))
+
+    rule_entities = [None] * len(batch)
+    fast_path_seconds = [None] * len(batch)
+    if fast_path is not None:
+        for i, sig_preprocessed in enumerate(sigs_preprocessed):
+            start = time.perf_counter()
+            rule_entities[i] = fast_path.match(sig_preprocessed)
+            fast_path_seconds[i] = time.perf_counter() - start
+
+    model_inputs = [sig_preprocessed for sig_preprocessed, entities in zip(sigs_preprocessed, rule_entities)
+                    if entities is None]
+    start = time.perf_counter()
+    model_outputs = list(model.pipe(model_inputs, batch_size=batch_size))
+    # the model runs over the batch at once, every sig gets an equal share of its time
+    model_seconds = (time.perf_counter() - start) / len(model_inputs) if model_inputs else 0.0
+    model_outputs = iter(model_outputs)
+
+    results = []
+    for i, entities in enumerate(rule_entities):
+        start = time.perf_counter()
+        if entities is None:
+            model_output = next(model_outputs)
+            structured_sigs = _create_structured_sigs(model_output, options)
+            tokens, path, sig_model_seconds = len(model_output), 'model', model_seconds
+        else:
+            structured_sigs = _structure_entities(entities, options=options)
+            tokens, path, sig_model_seconds = len(sigs_preprocessed[i].split()), 'fast_path', None
+        structure_seconds = time.perf_counter() - start
+        autocorrect_seconds, pre_process_seconds, corrections = pre_process_profiles[i]
+        profiler.record(SigProfile(batch[i], tokens, corrections, path, autocorrect_seconds, pre_process_seconds,
+                                   fast_path_seconds[i], sig_model_seconds, structure_seconds))
+        results.append(structured_sigs)
+    return results
+
+
+def _parse_sig(sig: str, model: Language, cache: LRUCache = None, fast_path: RuleFastPath = None,
+               options: ParseOptions = default_parse_options):
+    if cache is not None:
+        key = _cache_key(sig, options)
+        structured_sigs = cache.get(key)
+        if structured_sigs is None:
+            structured_sigs = _parse_sig(sig, model, fast_path=fast_path, options=options)
+            cache.put(key, structured_sigs)
+        return _copy_structured_sigs(structured_sigs)
+
+    sig_preprocessed = _pre_process(sig, options)
+    if fast_path is not None:
+        entities = fast_path.match(sig_preprocessed)
+        if entities is not None:
+            return _structure_entities(entities, options=options)
     model_output = model(sig_preprocessed)
 
-    return _create_structured_sigs(model_output)
+    return _create_structured_sigs(model_output, options)
+
+
+"""
+The pre processing only depends on the lower cased words of the sig, so sigs that normalize to the same text
+are parsed to the same result.
+"""
+
+
+def _normalize_sig(sig: str):
+    return ' '.join(sig.lower().split())
+
+
+def _cache_key(sig: str, options: ParseOptions):
+    # the default options, by far the most common, keep the plain normalized sig as the key
+    normalized = _normalize_sig(sig)
+    return normalized if options == default_parse_options else (normalized, options)
+
+
+def _copy_structured_sigs(structured_sigs):
+    # cached results are shared, callers get their own copies to modify
+    return [copy.copy(structured_sig) for structured_sig in structured_sigs]
 
 
 def _autocorrect(sig):
-    sig = sig.lower().strip()
-    corrected_words = []
-    for word in sig.split():
-        # checking if the word is only letters
-        if not re.match(r"^[a-zA-Z]+$", word) or spell_checker.known([word]):
-            corrected_words.append(word)
+    return ' '.join(map(_autocorrect_word, sig.lower().split()))
+
+
+@lru_cache(maxsize=16384)
+def _autocorrect_word(word):
+    # checking if the word is only letters
+    if not (word.isascii() and word.isalpha()) or word in _get_domain_words() \
+            or word in _get_spell_checker().word_frequency.dictionary:
+        return word
+    return _get_correction_index().correction(word)
+
+
+"""
+Pre processes the sig in a single pass over its words: every lower cased word is autocorrected, the frequency words
+are replaced, the parentheses are split from the surrounding text, and then abbreviated forms, number words and
+fractions are converted. The output is identical to _pre_process_reference, the original multi pass implementation.
+"""
+
+
+def _pre_process(sig, options: ParseOptions = default_parse_options):
+    words = sig.lower().split()
+    return ' '.join(_rewrite_words(map(_autocorrect_word, words) if options.autocorrect else words, options))
+
+
+_word_replacements = {'twice': '2 times', 'once': '1 time', 'nightly': 'every night', '(': ' (', ')': ') '}
+# corrections can be multi word dictionary entries, their whitespace splits them like any other word boundary
+_word_replacements_pattern = re.compile('|'.join(map(re.escape, _word_replacements)) + r'|\s')
+_form_conversions = {'tab': 'tablet', 'tabs': 'tablet'}
+_word_conversions = dict(_form_conversions,
+                         **{number_word: str(w2n.word_to_num(number_word)) for number_word in number_words})
+
+
+def _rewrite_words(words, options: ParseOptions = default_parse_options):
+    conversions = _word_conversions if options.number_words else _form_conversions
+    fractions = options.fractions
+    for word in words:
+        if _word_replacements_pattern.search(word):
+            replaced = _word_replacements_pattern.sub(lambda match: _word_replacements.get(match.group(), ' '), word)
+            for replaced_word in replaced.split():
+                yield _convert_word(replaced_word, conversions, fractions)
         else:
-            corrected_word = spell_checker.correction(word)
-            corrected_words.append(corrected_word)
-    sig = ' '.join(corrected_words)
-    return sig
+            yield _convert_word(word, conversions, fractions)
+
+
+def _convert_word(word, conversions=_word_conversions, fractions=True):
+    converted = conversions.get(word)
+    if converted is not None:
+        return converted
+    return _convert_fraction(word) if fractions and '/' in word else word
 
 
-def _pre_process(sig):
+def _pre_process_reference(sig):
     sig = _autocorrect(sig)
     sig = sig.replace('twice', '2 times').replace("once", '1 time').replace("nightly", "every night")
     sig = _add_space_around_parentheses(sig)
@@ -163,83 +573,142 @@ def _split_entities_for_multiple_instructions(model_entities):
     return result
 
 
-def _create_structured_sigs(model_output):
-    entities = _get_model_entities(model_output)
+def _create_structured_sigs(model_output, options: ParseOptions = default_parse_options):
+    return _structure_entities(_get_model_entities(model_output), model_output.text, options)
 
+
+"""
+sig is the pre processed sig the entities were tagged in, if given the Latin frequencies and as needed phrases found
+outside of the entities are applied too.
+"""
+
+
+def _structure_entities(entities, sig: str = None, options: ParseOptions = default_parse_options):
     multiple_instructions = _split_entities_for_multiple_instructions(entities)
 
-    first_sig = _create_structured_sig(multiple_instructions[0])
+    first_sig = _create_structured_sig(multiple_instructions[0], options=options)
 
     # incase multiple instructions exist, they apply to the same drug and form
-    other_sigs = [_create_structured_sig(instruction_entities, first_sig.drug, first_sig.form)
+    other_sigs = [_create_structured_sig(instruction_entities, first_sig.drug, first_sig.form, options)
                   for instruction_entities in multiple_instructions[1:]]
-    return [first_sig] + other_sigs
+    structured_sigs = [first_sig] + other_sigs
+    if sig is not None:
+        _apply_untagged_vocabulary(sig, multiple_instructions, structured_sigs, options.latin_frequencies)
+    return structured_sigs
 
 
-def _get_form_from_dosage_tag(text):
-    splitted = text.split(' ')
-    if len(splitted) == 2:
-        return splitted[1]
+"""
+Latin frequencies and as needed phrases that are not part of any entity (the model missed them, e.g. "1 tab po q 6 h")
+are applied to the instruction they appear in: the last one with an entity before them. A Latin frequency is only
+applied to an instruction without a Frequency entity.
+"""
 
 
+def _apply_untagged_vocabulary(sig: str, multiple_instructions, structured_sigs, latin_frequencies: bool = True):
+    entity_spans = [(entity.start_char, entity.end_char)
+                    for instruction_entities in multiple_instructions for entity in instruction_entities]
+    has_frequency = [any(entity.label_ == 'Frequency' for entity in instruction_entities)
+                     for instruction_entities in multiple_instructions]
+    for match in _get_sig_vocabulary().match(sig):
+        if match.kind not in (latin_frequency, as_needed) or (match.kind == latin_frequency and not latin_frequencies) \
+                or any(start < match.end_char and match.start_char < end for start, end in entity_spans):
+            continue
+        instruction = 0
+        for i, instruction_entities in enumerate(multiple_instructions):
+            if instruction_entities and instruction_entities[0].start_char <= match.start_char:
+                instruction = i
+        if match.kind == as_needed:
+            structured_sigs[instruction].takeAsNeeded = True
+        elif not has_frequency[instruction]:
+            structured_sigs[instruction] = replace(structured_sigs[instruction], **match.value)
+            has_frequency[instruction] = True
+
+
+@lru_cache(maxsize=1024)
 def _to_singular(text):
     # turn to singular if plural else keep as is
-    singular = inflect_engine.singular_noun(text)
+    singular = _get_inflect_engine().singular_noun(text)
     return singular if singular else text
 
 
-def _create_structured_sig(model_entities, drug=None, form=None):
-    structured_sig = StructuredSig(drug, form, None, None, None, None, None, None)
+"""
+Every entity label has a handler that reads the StructuredSig fields out of the entity text, as (field, value) pairs.
+The time units and keywords the handlers read are tables in parsigs.entity_rules, compiled into _entity_rules.
+The fields only depend on the label, the text and the parse options, entity texts repeat a lot across sigs so they
+are memoized.
+"""
 
-    for entity in model_entities:
-        text = entity.text
-        label = entity.label_
-        if label == 'Dosage' and text.split()[0].isnumeric():
-            structured_sig.singleDosageAmount = float(text.split()[0])
-            structured_sig.frequencyType = _get_frequency_type(text)
-            form_from_dosage = _get_form_from_dosage_tag(text)
-            if form_from_dosage is not None:
-                structured_sig.form = _to_singular(form_from_dosage)
-        elif label == 'Drug':
-            structured_sig.drug = text
-        elif label == 'Form':
-            structured_sig.form = _to_singular(text)
-        elif label == 'Frequency':
-            structured_sig.frequencyType = _get_frequency_type(text)
-            interval_text = _get_string_after_keyword(text, "every")
-            if len(interval_text) > 0:
-                structured_sig.interval = _get_amount_from_frequency_tags(interval_text)
-            latin_frequency_dict = _get_latin_frequency(text)
-            if latin_frequency_dict:
-                # we assume that the latin_frequency_dict values are a dict of frequencyType, interval and times
-                structured_sig = replace(structured_sig, **latin_frequency_dict)
-            else:
-                times_text = _get_string_until_keyword(text, "times")
-                structured_sig.times = _get_amount_from_frequency_tags(times_text)
-            # Default added only if there is a frequency tag in the sig, handles cases such as "Every TIME_UNIT"
-            if structured_sig.interval is None:
-                structured_sig.interval = 1
-            structured_sig.takeAsNeeded = _should_take_as_needed(text)
-        elif label == 'Duration':
-            structured_sig.periodType = _get_frequency_type(text)
-            structured_sig.periodAmount = _get_amount_from_frequency_tags(text)
-        elif label == 'Strength':
-            structured_sig.strength = text
-    return structured_sig
+
+def _dosage_fields(text: str, options: ParseOptions):
+    words = text.split()
+    if not words[0].isnumeric():
+        return ()
+    fields = (('singleDosageAmount', float(words[0])), ('frequencyType', _entity_rules.scan(text).time_unit))
+    if len(words) == 2:
+        fields += (('form', _to_singular(words[1]) if options.singularize else words[1]),)
+    return fields
+
+
+def _drug_fields(text: str, options: ParseOptions):
+    return ('drug', text),
+
+
+def _form_fields(text: str, options: ParseOptions):
+    return ('form', _to_singular(text) if options.singularize else text),
+
+
+def _frequency_fields(text: str, options: ParseOptions):
+    scan = _entity_rules.scan(text)
+    fields = [('frequencyType', scan.time_unit)]
+    if scan.has_keyword(interval_keyword):
+        interval = scan.amount_after(interval_keyword)
+        # Default added only if there is a frequency tag in the sig, handles cases such as "Every TIME_UNIT"
+        fields.append(('interval', interval if interval is not None else 1))
+    vocabulary_matches = _get_sig_vocabulary().match_words(text.split())
+    latin_frequency_dict = next((match.value for match in vocabulary_matches if match.kind == latin_frequency),
+                                None) if options.latin_frequencies else None
+    if latin_frequency_dict:
+        # we assume that the latin_frequency_dict values are a dict of frequencyType, interval and times
+        fields += latin_frequency_dict.items()
+    else:
+        fields.append(('times', scan.amount_before(times_keyword)))
+    fields.append(('takeAsNeeded', any(match.kind == as_needed for match in vocabulary_matches)))
+    return tuple(fields)
 
 
-def _get_string_after_keyword(input_string: str, keyword: str):
-    keyword_index = input_string.find(keyword)
-    if keyword_index != -1:
-        return input_string[keyword_index + len(keyword):].strip()
-    return ""
+def _duration_fields(text: str, options: ParseOptions):
+    scan = _entity_rules.scan(text)
+    return ('periodType', scan.time_unit), ('periodAmount', scan.amount())
 
 
-def _get_string_until_keyword(input_string: str, keyword: str):
-    keyword_index = input_string.find(keyword)
-    if keyword_index != -1:
-        return input_string[:keyword_index].strip()
-    return ""
+def _strength_fields(text: str, options: ParseOptions):
+    return ('strength', text),
+
+
+_entity_rules = EntityRules()
+_entity_handlers = {
+    'Dosage': _dosage_fields,
+    'Drug': _drug_fields,
+    'Form': _form_fields,
+    'Frequency': _frequency_fields,
+    'Duration': _duration_fields,
+    'Strength': _strength_fields,
+}
+
+
+@lru_cache(maxsize=8192)
+def _entity_fields(label: str, text: str, options: ParseOptions = default_parse_options):
+    handler = _entity_handlers.get(label)
+    return handler(text, options) if handler is not None else ()
+
+
+def _create_structured_sig(model_entities, drug=None, form=None, options: ParseOptions = default_parse_options):
+    structured_sig = StructuredSig(drug, form, None, None, None, None, None, None)
+
+    for entity in model_entities:
+        for field, value in _entity_fields(entity.label_, entity.text, options):
+            setattr(structured_sig, field, value)
+    return structured_sig
 
 
 def _get_model_entities(model_output):
@@ -260,19 +729,14 @@ def _get_duration_string(sig):
 
 
 def _convert_fract_to_num(sentence):
-    def is_frac(_word):
-        nums = _word.split('/')
-        return len(nums) == 2 and '/' in _word and nums[0].isdigit() and nums[1].isdigit()
+    return ' '.join(map(_convert_fraction, sentence.split()))
 
-    words = sentence.split()
-    output_words = []
-    for word in words:
-        if is_frac(word):
-            num, denom = word.split('/')
-            output_words.append(str(int(num) / int(denom)))
-        else:
-            output_words.append(word)
-    return ' '.join(output_words)
+
+def _convert_fraction(word):
+    nums = word.split('/')
+    if len(nums) == 2 and nums[0].isdigit() and nums[1].isdigit():
+        return str(int(nums[0]) / int(nums[1]))
+    return word
 
 
 def _convert_words_to_numbers(sentence):
@@ -305,46 +769,259 @@ def _is_str_float(s):
         return False
 
 
-def _get_frequency_type(frequency):
-    if frequency is not None:
-        if "hour" in frequency:
-            return "Hour"
-        if "week" in frequency:
-            return "Week"
-        if "month" in frequency:
-            return "Month"
-        if "year" in frequency:
-            return "Year"
-        if any(daily_instruction in frequency for daily_instruction in
-               ("day", "daily", "night", "morning", "evening", "noon", "bedtime")):
-            return "Day"
+def _get_latin_frequency(frequency: str):
+    # anywhere in the frequency, including multi token forms such as "q 6 h" or "q. a. m."
+    match = _get_sig_vocabulary().first(frequency, latin_frequency)
+    return match.value if match is not None else None
 
 
-def _get_amount_from_frequency_tags(frequency):
-    if frequency is not None:
-        for word in frequency.split():
-            if word.isdigit():
-                return int(word)
-        # every other TIME_UNIT means every 2 days,weeks etc
-        if "other" in frequency:
-            return 2
+def _should_take_as_needed(frequency):
+    return _get_sig_vocabulary().first(frequency, as_needed) is not None
 
 
-def _get_latin_frequency(frequency: str):
-    stripped_freq = frequency.split()[0].replace('.', '')
-    return latin_type_dict.get(stripped_freq) if latin_type_dict.get(stripped_freq) else None
+"""
+Thread safety: a SigParser can be shared by threads, e.g. the workers of a ThreadPoolExecutor calling parse
+concurrently, and all of them use its single loaded model.
+The process wide resources (spell checker, correction index, Latin table, inflect engine, ...) are only read once
+loaded: corrections go through the CorrectionIndex rather than the SpellChecker methods, and singular_noun only reads
+the inflect engine settings. The memo tables of the parse path are functools.lru_cache, which takes no lock on GIL
+builds. Without thread_safe the resources are loaded lazily, so the threads parsing the first sigs may all build them,
+and the result cache and fast path counters are shared and locked on every sig.
+
+With thread_safe=True the resources are loaded when the SigParser is created, and every thread gets its own
+_ParserState: a result cache (of up to cache_size sigs per thread) and a rule fast path whose counters take no lock.
+The state of a thread is dropped when the thread exits, so threads started and stopped over the life of the parser
+(a thread per request, executors created per job) do not pile up caches, and its counters are kept as totals.
+cache_info and fast_path_info add up the states of the running threads and the totals of the exited ones.
+The memo of the shared CorrectionIndex still takes a lock: it is only reached for the words missing from the
+lock free lru_cache of _autocorrect_word, whose correction (an edit distance search) costs far more than the lock,
+and a per thread memo would recompute the corrections in every thread.
+"""
 
 
-def _should_take_as_needed(frequency):
-    return "as needed" in frequency
+class _ParserState:
+    __slots__ = ('cache', 'fast_path')
 
+    def __init__(self, cache_size: int, rule_fast_path: bool, thread_safe: bool = True):
+        self.cache = LRUCache(cache_size, thread_safe) if cache_size > 0 else None
+        self.fast_path = RuleFastPath(_get_sig_vocabulary(), thread_safe) if rule_fast_path else None
 
-class SigParser:
-    def __init__(self, model_name="en_parsigs"):
-        self.__language = spacy.load(model_name)
 
-    def parse(self, sig: str):
-        return _parse_sig(sig, self.__language)
+class _ThreadToken:
+    # only referenced by the thread local storage of its thread, so it is released when the thread exits
+    __slots__ = ('__weakref__',)
+
+
+class _ParserStates:
+    """
+    The _ParserState of every running thread, and the counter totals of the threads that have exited.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._exited_cache_info = CacheInfo(0, 0, 0, 0, 0)
+        self._exited_fast_path_info = FastPathInfo(0, 0)
+
+    def add(self, token: _ThreadToken, state: _ParserState):
+        with self._lock:
+            self._states[id(token)] = state
+        # the callback holds this registry but not the parser, which can be released before the threads exit
+        weakref.finalize(token, self._remove, id(token))
+
+    def _remove(self, key):
+        with self._lock:
+            state = self._states.pop(key)
+            if state.cache is not None:
+                hits, misses, evictions, _, _ = state.cache.info()
+                self._exited_cache_info = self._exited_cache_info._replace(
+                    hits=self._exited_cache_info.hits + hits, misses=self._exited_cache_info.misses + misses,
+                    evictions=self._exited_cache_info.evictions + evictions)
+            if state.fast_path is not None:
+                self._exited_fast_path_info = FastPathInfo(*map(sum, zip(self._exited_fast_path_info,
+                                                                          state.fast_path.info())))
+
+    def states(self):
+        with self._lock:
+            return list(self._states.values())
+
+    def exited_info(self):
+        with self._lock:
+            return self._exited_cache_info, self._exited_fast_path_info
+
+    def reset_exited_cache_info(self):
+        with self._lock:
+            self._exited_cache_info = CacheInfo(0, 0, 0, 0, 0)
+
+
+class _ThreadStates(threading.local):
+    # __init__ runs in every thread on its first access, with the arguments the instance was created with
+    def __init__(self, cache_size: int, rule_fast_path: bool, parser_states: _ParserStates):
+        self.state = _ParserState(cache_size, rule_fast_path, thread_safe=False)
+        self.token = _ThreadToken()
+        parser_states.add(self.token, self.state)
+
+
+class SigParser:
+    def __init__(self, model_name="en_parsigs", cache_size: int = 0, rule_fast_path: bool = False,
+                 lean_pipeline: bool = False, entity_store=None, thread_safe: bool = False,
+                 options: ParseOptions = default_parse_options):
+        """
+        cache_size, if positive, enables a thread safe LRU cache of up to cache_size parsed sigs,
+        keyed on the normalized sig text.
+        rule_fast_path enables the grammar based fast path, sigs it fully recognises are structured without the model.
+        lean_pipeline loads only the pipeline components entity recognition needs, see parsigs.lean_pipeline.
+        entity_store, an EntityStore or the path of its SQLite file, stores the model output of the parsed sigs and
+        replays it instead of running the model on sigs parsed before, see parsigs.entity_store.
+        thread_safe loads every resource up front and keeps the cache and the fast path per thread, for a parser
+        shared by a pool of threads (see the thread safety notes above).
+        options, a ParseOptions or the name of one of parse_option_presets, are the stages of the parsing to run,
+        unless a parse call passes its own.
+        """
+        self.__language = load_lean(model_name) if lean_pipeline else spacy.load(model_name)
+        if entity_store is not None:
+            store = entity_store if isinstance(entity_store, EntityStore) else EntityStore(entity_store)
+            self.__language = StoreBackedModel(self.__language, store)
+        self.__cache_size = cache_size
+        if thread_safe:
+            _load_resources()
+            self.__parser_states = _ParserStates()
+            self.__thread_states = _ThreadStates(cache_size, rule_fast_path, self.__parser_states)
+        else:
+            self.__parser_state = _ParserState(cache_size, rule_fast_path)
+            self.__thread_states = None
+        self.__profiler = None
+        self.__options = _resolve_options(options)
+
+    def __state(self):
+        return self.__thread_states.state if self.__thread_states is not None else self.__parser_state
+
+    def parse(self, sig: str, options: ParseOptions = None):
+        """
+        options, a ParseOptions or a preset name, override those of the parser for this sig.
+        """
+        state = self.__state()
+        options = self.__options if options is None else _resolve_options(options)
+        if self.__profiler is not None:
+            return _parse_batch_profiled([sig], self.__language, 1, self.__profiler, state.cache, state.fast_path,
+                                         options)[0]
+        return _parse_sig(sig, self.__language, state.cache, state.fast_path, options)
+
+    def parse_many(self, sigs: list, batch_size: int = default_batch_size, on_batch=None,
+                   options: ParseOptions = None):
+        """
+        Parses the sigs in batches through the model's Language.pipe.
+        on_batch, if given, is called with the BatchStats of every parsed batch.
+        options, a ParseOptions or a preset name, override those of the parser for these sigs.
+        """
+        state = self.__state()
+        options = self.__options if options is None else _resolve_options(options)
+        return _parse_sigs(sigs, self.__language, batch_size, on_batch, state.cache, state.fast_path, self.__profiler,
+                           options)
+
+    def parse_stream(self, sigs: Iterable[str], batch_size: int = default_batch_size, on_batch=None,
+                     options: ParseOptions = None):
+        """
+        Lazily parses an iterable of sigs of any length, reading batch_size sigs at a time.
+        Yields a StreamResult per input sig, in the input order: its index in the input and the list of
+        StructuredSig objects it was parsed to (more than one for multiple instructions sigs).
+        """
+        # with thread_safe, the stream keeps the state of the thread that starts consuming it
+        state = self.__state()
+        options = self.__options if options is None else _resolve_options(options)
+        parsed = _parse_sig_batches(sigs, self.__language, batch_size, on_batch, state.cache, state.fast_path,
+                                    self.__profiler, options)
+        for index, structured_sigs in enumerate(parsed):
+            yield StreamResult(index, structured_sigs)
+
+    def parse_many_columnar(self, sigs: Iterable[str], batch_size: int = default_batch_size, on_batch=None,
+                            options: ParseOptions = None):
+        """
+        Same as parse_many, returning a parsigs.columnar.StructuredSigColumns rather than a list of StructuredSig.
+        The sigs are parsed lazily and their StructuredSig objects are not kept, so the memory used is about the
+        size of the columns.
+        """
+        from parsigs.columnar import StructuredSigColumns
+        return StructuredSigColumns.from_structured_sigs(
+            result.structured_sigs for result in self.parse_stream(sigs, batch_size, on_batch, options))
+
+    def parse_column(self, sigs, batch_size: int = default_batch_size, options: ParseOptions = None):
+        """
+        Parses a pandas Series or an Arrow string array of sigs, pre processing the whole column at once and running
+        each distinct pre processed sig through the model once, see parsigs.dataframe. The result cache and the
+        profiler are not used.
+        Returns a typed pandas DataFrame with a row per StructuredSig, indexed by the index labels of the sigs.
+        options, a ParseOptions or a preset name, override those of the parser for these sigs.
+        """
+        from parsigs.dataframe import parse_column
+        fast_path = self.__state().fast_path
+        options = self.__options if options is None else _resolve_options(options)
+        return parse_column(sigs, lambda sigs_preprocessed: _parse_preprocessed(sigs_preprocessed, self.__language,
+                                                                                batch_size, fast_path, options),
+                            batch_size, options)
+
+    def parse_document(self, document: str, batch_size: int = default_batch_size, on_batch=None,
+                       options: ParseOptions = None):
+        """
+        Parses a text holding many sigs (e.g. a medication list), see parsigs.document.
+        Returns a DocumentSig per sig segment of the document, in order: its character offsets in the document, its
+        text and the list of StructuredSig objects it was parsed to. Segments without any entity are left out.
+        """
+        from parsigs.document import DocumentSig, is_sig, segment_document
+        segments = segment_document(document)
+        results = self.parse_stream((document[start:end] for start, end in segments), batch_size, on_batch, options)
+        return [DocumentSig(start, end, document[start:end], result.structured_sigs)
+                for (start, end), result in zip(segments, results) if is_sig(result.structured_sigs)]
+
+    @contextmanager
+    def profile(self, profiler: ParseProfiler = None):
+        """
+        Records the per stage timings of the sigs parsed in the with block (by any thread) in the profiler,
+        a new ParseProfiler if not given, which the with statement returns.
+        """
+        profiler = profiler if profiler is not None else ParseProfiler()
+        previous, self.__profiler = self.__profiler, profiler
+        try:
+            yield profiler
+        finally:
+            self.__profiler = previous
+
+    def cache_info(self):
+        """
+        With thread_safe, the sums over the caches of every running thread, maxsize included, plus the hits, misses
+        and evictions of the threads that have exited.
+        """
+        infos = [state.cache.info() for state in self.__all_states() if state.cache is not None]
+        if self.__thread_states is not None:
+            infos.append(self.__parser_states.exited_info()[0])
+        return CacheInfo(*map(sum, zip(*infos))) if infos else CacheInfo(0, 0, 0, 0, 0)
+
+    def fast_path_info(self):
+        """
+        The number of sigs structured by the rule fast path and by the model, while the fast path is enabled.
+        """
+        infos = [state.fast_path.info() for state in self.__all_states() if state.fast_path is not None]
+        if self.__thread_states is not None:
+            infos.append(self.__parser_states.exited_info()[1])
+        return FastPathInfo(*map(sum, zip(*infos))) if infos else FastPathInfo(0, 0)
+
+    def entity_store_info(self):
+        """
+        The hits and misses of the entity store and the number of sigs it holds, None without an entity store.
+        """
+        return self.__language.store.info() if isinstance(self.__language, StoreBackedModel) else None
+
+    def clear_cache(self):
+        for state in self.__all_states():
+            if state.cache is None:
+                continue
+            if self.__thread_states is None:
+                state.cache.clear()
+            else:
+                # the cache of another thread takes no lock, it may be in use: swap it for an empty one
+                state.cache = LRUCache(self.__cache_size, thread_safe=False)
+        if self.__thread_states is not None:
+            self.__parser_states.reset_exited_cache_info()
 
-    def parse_many(self, sigs: list):
-        return _parse_sigs(sigs, self.__language)
+    def __all_states(self):
+        return self.__parser_states.states() if self.__thread_states is not None else [self.__parser_state]
@@ -0,0 +1,134 @@
+import threading
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+"""
+Per stage timing of the sig parsing.
+
+    profiler = ParseProfiler()
+    with sig_parser.profile(profiler):
+        sig_parser.parse_many(sigs)
+    profiler.to_dict()        # or profiler.to_prometheus()
+
+While a profiler is attached, every parsed sig is recorded as a SigProfile: the wall time of its autocorrect, of the
+rest of its pre processing, of the rule fast path (if enabled), of the model and of structuring the model output
+(_create_structured_sigs), with its token and correction counts. The profiler aggregates them into histograms, and
+passes every SigProfile to its on_sig callback, if given.
+The model runs over a whole batch at once (Language.pipe), so in parse_many every sig of the batch is attributed an
+equal share of the batch model time. Sigs served from the cache, and the duplicates of a batch (parsed once, see
+_parse_sig_batches), are only counted.
+
+When no profiler is attached the parse path is the same as before, at the cost of a single check per batch.
+"""
+
+latency_buckets = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+count_buckets = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+stages = ('autocorrect', 'pre_process', 'fast_path', 'model', 'structure')
+
+
+class Histogram:
+    """
+    A thread safe histogram of observed values over fixed bucket upper bounds.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def to_dict(self):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        return {'buckets': list(self.buckets), 'counts': counts, 'sum': total, 'count': sum(counts)}
+
+    def render(self, name: str, labels: str = ''):
+        """
+        The histogram in Prometheus text format lines, labels is a comma separated list of name="value" pairs.
+        """
+        histogram = self.to_dict()
+        separator = ',' if labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram['counts']):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {histogram["count"]}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {histogram["sum"]}')
+        lines.append(f'{name}_count{suffix} {histogram["count"]}')
+        return lines
+
+
+class SigProfile(NamedTuple):
+    sig: str
+    tokens: int
+    corrections: int
+    # model or fast_path, the path that structured the sig
+    path: str
+    autocorrect_seconds: float
+    pre_process_seconds: float
+    # None if the sig did not go through the stage
+    fast_path_seconds: Optional[float]
+    model_seconds: Optional[float]
+    structure_seconds: float
+
+
+class ParseProfiler:
+    def __init__(self, on_sig=None):
+        """
+        on_sig, if given, is called with the SigProfile of every profiled sig.
+        """
+        self.on_sig = on_sig
+        self.stage_seconds = {stage: Histogram(latency_buckets) for stage in stages}
+        self.tokens = Histogram(count_buckets)
+        self.corrections = Histogram(count_buckets)
+        self._lock = threading.Lock()
+        self._paths = {'model': 0, 'fast_path': 0, 'cache': 0, 'duplicate': 0}
+
+    def record(self, profile: SigProfile):
+        for stage in stages:
+            seconds = getattr(profile, f'{stage}_seconds')
+            if seconds is not None:
+                self.stage_seconds[stage].observe(seconds)
+        self.tokens.observe(profile.tokens)
+        self.corrections.observe(profile.corrections)
+        with self._lock:
+            self._paths[profile.path] += 1
+        if self.on_sig is not None:
+            self.on_sig(profile)
+
+    def record_cache_hits(self, count: int):
+        with self._lock:
+            self._paths['cache'] += count
+
+    def record_duplicates(self, count: int):
+        with self._lock:
+            self._paths['duplicate'] += count
+
+    def to_dict(self):
+        with self._lock:
+            paths = dict(self._paths)
+        return {'sigs': paths,
+                'stage_seconds': {stage: histogram.to_dict() for stage, histogram in self.stage_seconds.items()},
+                'tokens': self.tokens.to_dict(),
+                'corrections': self.corrections.to_dict()}
+
+    def to_prometheus(self):
+        lines = ['# TYPE parsigs_stage_duration_seconds histogram']
+        for stage, histogram in self.stage_seconds.items():
+            lines += histogram.render('parsigs_stage_duration_seconds', f'stage="{stage}"')
+        lines.append('# TYPE parsigs_sig_tokens histogram')
+        lines += self.tokens.render('parsigs_sig_tokens')
+        lines.append('# TYPE parsigs_sig_corrections histogram')
+        lines += self.corrections.render('parsigs_sig_corrections')
+        lines.append('# TYPE parsigs_sigs_total counter')
+        with self._lock:
+            lines += [f'parsigs_sigs_total{{path="{path}"}} {count}' for path, count in self._paths.items()]
+        return '\n'.join(lines) + '\n'
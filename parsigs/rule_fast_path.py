@@ -0,0 +1,224 @@
+import re
+from collections import namedtuple
+from contextlib import nullcontext
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import NamedTuple
+
+from parsigs.sig_vocabulary import SigVocabulary, as_needed, dose_instruction, latin_frequency
+
+"""
+A deterministic, grammar based alternative to the NER model for formulaic sigs such as "1 tablet po bid" or
+"take 2 tablets every 6 hours for 5 days".
+
+The grammar runs over the pre processed sig and tags the same spans the model would (Dosage, Drug, Frequency, Duration,
+Strength), which are then structured by the same static rules as the model's entities. A sig is only handled here if
+every one of its words is accounted for by the grammar, anything else is left to the model.
+
+Adjacent frequencies ("daily at bedtime") are tagged as a single Frequency span, as the model does. The structuring
+starts a new instruction at every repeated label, so a sig whose instructions after the first would not start with a
+Dosage ("1 tablet for 5 days for 2 weeks") is left to the model too.
+"""
+
+
+class EntitySpan(NamedTuple):
+    text: str
+    label_: str
+    start_char: int
+    end_char: int
+
+
+FastPathInfo = namedtuple('FastPathInfo', ['fast_path', 'model'])
+
+_number_pattern = re.compile(r'^\d+(\.\d+)?$')
+_strength_pattern = re.compile(r'^\d+(\.\d+)?(mg|mcg|g|ml|meq|units?)$')
+_strength_units = {'mg', 'mcg', 'g', 'ml', 'meq', 'unit', 'units'}
+_time_units = {'hour', 'hours', 'day', 'days', 'week', 'weeks', 'month', 'months', 'year', 'years'}
+_times_of_day = {'day', 'morning', 'evening', 'night', 'noon', 'bedtime'}
+_forms = {'tablet', 'tablets', 'capsule', 'capsules', 'pill', 'pills', 'puff', 'puffs', 'drop', 'drops',
+          'spray', 'sprays', 'patch', 'patches', 'softgel', 'softgels', 'lozenge', 'lozenges'}
+# words the model leaves untagged, they do not change the structured sig
+_fillers = [('by', 'mouth'), ('po',), ('orally',), ('and', 'then'), ('and', 'than'), ('then',), ('and',)]
+
+_drug_names_path = Path(__file__).parent / 'resources/drug_names.txt'
+
+
+# shared by every RuleFastPath, e.g. the per thread ones of a thread safe SigParser
+@lru_cache(maxsize=None)
+def _load_single_word_drug_names():
+    with open(_drug_names_path, 'r') as drug_names_file:
+        return frozenset(line.strip().lower() for line in drug_names_file if line.strip().isalpha())
+
+
+class _Words:
+    def __init__(self, sig: str, vocabulary: SigVocabulary):
+        self.sig = sig
+        self.words = sig.split()
+        # the vocabulary matches by the index of their first word
+        self.vocabulary_matches = {match.start: match for match in vocabulary.match_words(self.words)}
+        self.offsets = []
+        position = 0
+        for word in self.words:
+            position = sig.index(word, position)
+            self.offsets.append(position)
+            position += len(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def get(self, i):
+        return self.words[i] if i < len(self.words) else None
+
+    def vocabulary_end(self, i, kind):
+        """
+        The end of the vocabulary match of the given kind starting at word i, None if there is none.
+        """
+        match = self.vocabulary_matches.get(i)
+        return match.end if match is not None and match.kind == kind else None
+
+    def span(self, start, end, label):
+        start_char = self.offsets[start]
+        end_char = self.offsets[end - 1] + len(self.words[end - 1])
+        return EntitySpan(self.sig[start_char:end_char], label, start_char, end_char)
+
+
+class RuleFastPath:
+    def __init__(self, vocabulary: SigVocabulary, thread_safe: bool = True):
+        """
+        thread_safe=False drops the lock around the path counters, for a fast path only used by a single thread.
+        """
+        self._vocabulary = vocabulary
+        self._drug_names = None
+        self._lock = Lock() if thread_safe else nullcontext()
+        self._fast_path_count = 0
+        self._model_count = 0
+
+    def match(self, sig_preprocessed: str):
+        """
+        Returns the entities of the pre processed sig, or None if the sig is not fully recognised by the grammar
+        and has to go through the model.
+        """
+        entities = self._match(sig_preprocessed)
+        with self._lock:
+            if entities is None:
+                self._model_count += 1
+            else:
+                self._fast_path_count += 1
+        return entities
+
+    def info(self):
+        with self._lock:
+            return FastPathInfo(self._fast_path_count, self._model_count)
+
+    def _match(self, sig: str):
+        words = _Words(sig, self._vocabulary)
+        entities = []
+        # the word range of the last entity
+        last_start, last_end = None, None
+        i = 0
+        while i < len(words):
+            for rule in (self._match_filler, self._match_dosage, self._match_drug, self._match_strength,
+                         self._match_frequency, self._match_duration):
+                matched = rule(words, i, entities)
+                if matched is not None:
+                    label, start, end = matched
+                    if label == 'Frequency' and last_end == start and entities[-1].label_ == 'Frequency':
+                        entities[-1] = words.span(last_start, end, label)
+                        last_end = end
+                    elif label is not None:
+                        entities.append(words.span(start, end, label))
+                        last_start, last_end = start, end
+                    i = end
+                    break
+            else:
+                return None
+        return entities if entities and _instructions_start_with_dosage(entities) else None
+
+    def _match_filler(self, words: _Words, i, entities):
+        end = words.vocabulary_end(i, dose_instruction)
+        if end is not None:
+            return None, i, end
+        for filler in _fillers:
+            if tuple(words.words[i:i + len(filler)]) == filler:
+                return None, i, i + len(filler)
+        return None
+
+    def _match_dosage(self, words: _Words, i, entities):
+        if _is_number(words.get(i)) and words.get(i + 1) in _forms:
+            return 'Dosage', i, i + 2
+        return None
+
+    def _match_drug(self, words: _Words, i, entities):
+        # only "<dosage> of <drug>", the drug vocabulary alone is too noisy to tag drugs anywhere in the sig
+        if words.get(i) == 'of' and entities and entities[-1].label_ == 'Dosage' \
+                and words.get(i + 1) in self._get_drug_names():
+            return 'Drug', i + 1, i + 2
+        return None
+
+    def _match_strength(self, words: _Words, i, entities):
+        word = words.get(i)
+        if _strength_pattern.match(word):
+            return 'Strength', i, i + 1
+        if _is_number(word) and words.get(i + 1) in _strength_units:
+            return 'Strength', i, i + 2
+        return None
+
+    def _match_frequency(self, words: _Words, i, entities):
+        end = i if words.vocabulary_end(i, as_needed) is not None else self._match_frequency_end(words, i)
+        if end is None:
+            return None
+        # "as needed" (or prn, ...) is part of the frequency span, it sets takeAsNeeded
+        as_needed_end = words.vocabulary_end(end, as_needed)
+        return 'Frequency', i, as_needed_end if as_needed_end is not None else end
+
+    def _match_frequency_end(self, words: _Words, i):
+        word = words.get(i)
+        latin_end = words.vocabulary_end(i, latin_frequency)
+        if latin_end is not None:
+            return latin_end
+        if word == 'daily':
+            return i + 1
+        if word == 'every':
+            if words.get(i + 1) in _time_units or words.get(i + 1) in _times_of_day:
+                return i + 2
+            if (_is_number(words.get(i + 1)) or words.get(i + 1) == 'other') and words.get(i + 2) in _time_units:
+                return i + 3
+            return None
+        if word == 'at' and words.get(i + 1) == 'bedtime':
+            return i + 2
+        if _is_number(word) and words.get(i + 1) in ('time', 'times'):
+            if words.get(i + 2) == 'daily':
+                return i + 3
+            if words.get(i + 2) in ('a', 'per', 'every') and words.get(i + 3) in _time_units:
+                return i + 4
+        return None
+
+    def _match_duration(self, words: _Words, i, entities):
+        if words.get(i) == 'for' and _is_number(words.get(i + 1)) and words.get(i + 2) in _time_units:
+            return 'Duration', i, i + 3
+        return None
+
+    def _get_drug_names(self):
+        if self._drug_names is None:
+            self._drug_names = _load_single_word_drug_names()
+        return self._drug_names
+
+
+def _instructions_start_with_dosage(entities):
+    """
+    Whether every instruction after the first, as split by _split_entities_for_multiple_instructions, starts with a
+    Dosage.
+    """
+    seen_labels = set()
+    for entity in entities:
+        if entity.label_ in seen_labels:
+            if entity.label_ != 'Dosage':
+                return False
+            seen_labels.clear()
+        seen_labels.add(entity.label_)
+    return True
+
+
+def _is_number(word):
+    return word is not None and _number_pattern.match(word) is not None
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from parsigs.async_parser import AsyncSigParser
+from parsigs.parse_sig_api import _load_resources, default_model_name
+from parsigs.profiling import Histogram
+
+"""
+A local HTTP parsing service, standard library only, holding a single SigParser:
+
+    parsigs serve --port 8000
+
+    POST /parse        {"sig": "1 tab po bid"}          -> {"structured_sigs": [...]}
+    POST /parse_many   {"sigs": ["1 tab po bid", ...]}  -> {"results": [{"structured_sigs": [...]}, {"error": "..."}]}
+    GET  /metrics      Prometheus text format metrics
+    GET  /health       {"status": "ok"}
+
+Requests are handled on threads and their sigs are handed to an AsyncSigParser running on a background event loop, so
+the sigs of concurrent requests are grouped into the same model batches.
+The metrics are request latency histograms per endpoint, a histogram of the model batch sizes, the number of sigs
+queued for a batch and request/error counters.
+"""
+
+logger = logging.getLogger(__name__)
+
+default_host = '127.0.0.1'
+default_port = 8000
+_max_body_bytes = 16 << 20
+_latency_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_batch_size_buckets = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class _Metrics:
+    def __init__(self):
+        self.request_latency = {path: Histogram(_latency_buckets) for path in ('/parse', '/parse_many')}
+        self.batch_size = Histogram(_batch_size_buckets)
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._sig_errors = 0
+
+    def observe_request(self, path: str, status: int, seconds: float):
+        # unknown paths share a label, so that arbitrary request paths do not grow the metrics
+        path = path if path in self.request_latency else 'unknown'
+        with self._lock:
+            self._requests[path, int(status)] = self._requests.get((path, int(status)), 0) + 1
+        if path in self.request_latency:
+            self.request_latency[path].observe(seconds)
+
+    def observe_batch(self, batch_stats):
+        self.batch_size.observe(batch_stats.size)
+
+    def count_sig_errors(self, count: int):
+        with self._lock:
+            self._sig_errors += count
+
+    def render(self, queue_depth: int):
+        lines = ['# TYPE parsigs_request_duration_seconds histogram']
+        for path, histogram in self.request_latency.items():
+            lines += histogram.render('parsigs_request_duration_seconds', f'path="{path}"')
+        lines.append('# TYPE parsigs_batch_size histogram')
+        lines += self.batch_size.render('parsigs_batch_size')
+        lines.append('# TYPE parsigs_queue_depth gauge')
+        lines.append(f'parsigs_queue_depth {queue_depth}')
+        with self._lock:
+            requests, sig_errors = dict(self._requests), self._sig_errors
+        lines.append('# TYPE parsigs_requests_total counter')
+        for (path, status), count in sorted(requests.items()):
+            lines.append(f'parsigs_requests_total{{path="{path}",status="{status}"}} {count}')
+        lines.append('# TYPE parsigs_sig_errors_total counter')
+        lines.append(f'parsigs_sig_errors_total {sig_errors}')
+        return '\n'.join(lines) + '\n'
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'parsigs'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._respond(HTTPStatus.OK, self.server.sig_server.render_metrics().encode(),
+                          'text/plain; version=0.0.4')
+        elif self.path == '/health':
+            self._respond_json(HTTPStatus.OK, {'status': 'ok'})
+        else:
+            self._respond_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            if self.path not in ('/parse', '/parse_many'):
+                raise _BadRequest(HTTPStatus.NOT_FOUND, f'Unknown path {self.path}')
+            body = self._read_json()
+            if self.path == '/parse':
+                status, response = self._parse(body)
+            else:
+                status, response = self._parse_many(body)
+        except _BadRequest as e:
+            status, response = e.status, {'error': str(e)}
+            # the request body may not have been read, the connection cannot be reused
+            self.close_connection = True
+        self._respond_json(status, response)
+        self.server.sig_server.metrics.observe_request(self.path, status, time.perf_counter() - start)
+
+    def _parse(self, body):
+        sig = body.get('sig')
+        if not isinstance(sig, str):
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Expected a JSON object with a "sig" string')
+        result = self.server.sig_server.parse_sigs([sig])[0]
+        if isinstance(result, Exception):
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {'error': repr(result)}
+        return HTTPStatus.OK, {'structured_sigs': [asdict(structured_sig) for structured_sig in result]}
+
+    def _parse_many(self, body):
+        sigs = body.get('sigs')
+        if not isinstance(sigs, list) or not all(isinstance(sig, str) for sig in sigs):
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Expected a JSON object with a "sigs" list of strings')
+        results = [{'error': repr(result)} if isinstance(result, Exception)
+                   else {'structured_sigs': [asdict(structured_sig) for structured_sig in result]}
+                   for result in self.server.sig_server.parse_sigs(sigs)]
+        return HTTPStatus.OK, {'results': results}
+
+    def _read_json(self):
+        length = self.headers.get('Content-Length')
+        if length is None or not length.strip().isdigit():
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Expected a non negative integer Content-Length header')
+        length = int(length)
+        if length > _max_body_bytes:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                              f'Request body is larger than {_max_body_bytes} bytes')
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Request body is not valid JSON')
+        if not isinstance(body, dict):
+            raise _BadRequest(HTTPStatus.BAD_REQUEST, 'Request body must be a JSON object')
+        return body
+
+    def _respond_json(self, status: HTTPStatus, response: dict):
+        self._respond(status, json.dumps(response).encode(), 'application/json')
+
+    def _respond(self, status: HTTPStatus, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+
+class SigServer:
+    def __init__(self, host: str = default_host, port: int = default_port, model_name=default_model_name,
+                 max_batch_size: int = 64, max_wait_seconds: float = 0.005, **parser_kwargs):
+        """
+        port 0 binds a free port, see server_address. parser_kwargs are passed to the SigParser.
+        """
+        # loads the lazily loaded resources up front rather than on the first request
+        _load_resources()
+        self.metrics = _Metrics()
+        self._async_parser = AsyncSigParser(model_name, max_batch_size, max_wait_seconds,
+                                            on_batch=self.metrics.observe_batch, **parser_kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name='parsigs-batching', daemon=True)
+        self._loop_thread.start()
+        self._http_server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._http_server.daemon_threads = True
+        self._http_server.sig_server = self
+
+    @property
+    def server_address(self):
+        return self._http_server.server_address
+
+    def parse_sigs(self, sigs: list):
+        """
+        Parses the sigs on the batching event loop, from a request thread.
+        Returns the StructuredSig list of every sig, or the exception it failed with.
+        """
+        results = asyncio.run_coroutine_threadsafe(self._parse_sigs(sigs), self._loop).result()
+        self.metrics.count_sig_errors(sum(isinstance(result, Exception) for result in results))
+        return results
+
+    async def _parse_sigs(self, sigs: list):
+        return await asyncio.gather(*(self._async_parser.parse(sig) for sig in sigs), return_exceptions=True)
+
+    def render_metrics(self):
+        return self.metrics.render(self._async_parser.queue_depth)
+
+    def serve_forever(self):
+        logger.info('serving parsigs on http://%s:%d', *self.server_address[:2])
+        self._http_server.serve_forever()
+
+    def shutdown(self):
+        """
+        Stops serve_forever, which must be running on another thread, and releases the parser.
+        """
+        self._http_server.shutdown()
+        self.close()
+
+    def close(self):
+        self._http_server.server_close()
+        if not self._loop_thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self._async_parser.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
@@ -0,0 +1,130 @@
+import re
+from itertools import product
+from typing import NamedTuple
+
+"""
+The fixed sig vocabulary (Latin frequency abbreviations, as needed phrases and dose instructions) compiled into a single
+token trie, matched over the whole sig in one left to right pass.
+
+Every Latin abbreviation is also indexed under the ways it is commonly split into tokens, so "q6h", "q 6 h", "q6 h",
+"q.6.h." and "q. 6. h." all match the q6h entry, and "q.a.m." or "q a m" match qam. Tokens are lower cased and their
+dots and surrounding punctuation are dropped before matching. At every token the longest vocabulary entry starting
+there is matched and the scan continues after it; as entries are at most a few tokens long, the scan is linear in the
+number of tokens.
+"""
+
+latin_frequency = 'latin_frequency'
+as_needed = 'as_needed'
+dose_instruction = 'dose_instruction'
+
+as_needed_phrases = ['as needed', 'prn', 'as required', 'when needed', 'if needed']
+
+_runs_pattern = re.compile(r'[a-z]+|\d+')
+_punctuation = ',;:()'
+
+
+class VocabularyMatch(NamedTuple):
+    kind: str
+    # the latin frequency entry (frequencyType, interval and times), or the matched phrase
+    value: object
+    start: int
+    end: int
+    start_char: int
+    end_char: int
+
+
+def _normalize_token(token: str):
+    return token.lower().replace('.', '').strip(_punctuation)
+
+
+def _splits(abbreviation: str):
+    """
+    The token sequences an abbreviation can be written as: any merge of its consecutive letter and digit runs,
+    and for letters only abbreviations, any merge of its letters (b i d, q am, ...).
+    """
+    runs = _runs_pattern.findall(abbreviation)
+    if len(runs) == 1 and abbreviation.isalpha():
+        runs = list(abbreviation)
+    splits = set()
+    for joins in product((True, False), repeat=len(runs) - 1):
+        tokens = [runs[0]]
+        for run, join in zip(runs[1:], joins):
+            if join:
+                tokens[-1] += run
+            else:
+                tokens.append(run)
+        splits.add(tuple(tokens))
+    return splits
+
+
+def _token_offsets(text: str, tokens):
+    offsets = []
+    position = 0
+    for token in tokens:
+        position = text.index(token, position)
+        offsets.append(position)
+        position += len(token)
+    return offsets
+
+
+class SigVocabulary:
+    def __init__(self, latin_frequencies: dict, dose_instructions, as_needed_vocabulary=as_needed_phrases):
+        self._root = {}
+        self._max_tokens = 0
+        for phrase in dose_instructions:
+            self._add(tuple(phrase.split()), dose_instruction, phrase)
+        for phrase in as_needed_vocabulary:
+            self._add(tuple(phrase.split()), as_needed, phrase)
+        for abbreviation, frequency in latin_frequencies.items():
+            for tokens in _splits(abbreviation):
+                self._add(tokens, latin_frequency, frequency)
+
+    def _add(self, tokens, kind, value):
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        # None is never a token, it marks the end of an entry
+        node.setdefault(None, (kind, value))
+        self._max_tokens = max(self._max_tokens, len(tokens))
+
+    def match_words(self, words):
+        """
+        The vocabulary matches of a list of words, with start_char and end_char left as 0.
+        """
+        return self._match([_normalize_token(word) for word in words])
+
+    def match(self, text: str):
+        """
+        The vocabulary matches of the text, with their character offsets in it.
+        """
+        words = text.split()
+        offsets = _token_offsets(text, words)
+        return [match._replace(start_char=offsets[match.start],
+                               end_char=offsets[match.end - 1] + len(words[match.end - 1]))
+                for match in self.match_words(words)]
+
+    def first(self, text: str, kind: str):
+        for match in self.match_words(text.split()):
+            if match.kind == kind:
+                return match
+        return None
+
+    def _match(self, tokens):
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            longest = None
+            for j in range(i, min(len(tokens), i + self._max_tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if None in node:
+                    longest = j + 1, node[None]
+            if longest is None:
+                i += 1
+                continue
+            end, (kind, value) = longest
+            matches.append(VocabularyMatch(kind, value, i, end, 0, 0))
+            i = end
+        return matches
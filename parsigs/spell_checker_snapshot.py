@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+import sys
+from collections import Counter
+from pathlib import Path
+
+import spellchecker
+from spellchecker import SpellChecker
+
+"""
+Precompiled binary snapshot of the merged spell checker word-frequency table (the English dictionary plus the drug names).
+Building the table from the raw resources takes a noticeable fraction of a second, loading the snapshot takes milliseconds.
+The snapshot is optional, build it once with:
+
+    python -m parsigs.spell_checker_snapshot [path]
+
+and point PARSIGS_SPELL_CHECKER_SNAPSHOT to it when it is not written to the default location.
+A snapshot that does not match the current resources or pyspellchecker version is ignored.
+"""
+
+snapshot_env_var = 'PARSIGS_SPELL_CHECKER_SNAPSHOT'
+default_snapshot_path = Path(__file__).parent / 'resources/spell_checker.snapshot'
+
+# bump when the rules that build the merged table change (e.g. the words removed from it)
+_snapshot_format_version = 1
+
+
+def snapshot_path():
+    return Path(os.environ.get(snapshot_env_var, default_snapshot_path))
+
+
+def snapshot_source_key(*resource_paths):
+    digest = hashlib.sha1(f'{_snapshot_format_version}:{spellchecker.__version__}'.encode())
+    for resource_path in resource_paths:
+        digest.update(Path(resource_path).read_bytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(spell_checker: SpellChecker, path, source_key: str):
+    word_frequency = spell_checker.word_frequency
+    header = {
+        'source_key': source_key,
+        'total_words': word_frequency.total_words,
+        'unique_words': word_frequency.unique_words,
+        'letters': ''.join(sorted(word_frequency.letters)),
+        'longest_word_length': word_frequency.longest_word_length,
+    }
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as snapshot_file:
+        # the header is pickled on its own so a stale snapshot is detected without loading the table
+        pickle.dump(header, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(dict(word_frequency.dictionary), snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+"""
+Returns a SpellChecker backed by the snapshot at path, or None if there is no snapshot or it is stale.
+"""
+
+
+def read_snapshot(path, source_key: str):
+    try:
+        with open(path, 'rb') as snapshot_file:
+            header = pickle.load(snapshot_file)
+            if header.get('source_key') != source_key:
+                return None
+            dictionary = pickle.load(snapshot_file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    spell_checker = SpellChecker(language=None)
+    word_frequency = spell_checker.word_frequency
+    # the derived statistics are restored from the header instead of rescanning the whole table
+    word_frequency._dictionary = Counter(dictionary)
+    word_frequency._total_words = header['total_words']
+    word_frequency._unique_words = header['unique_words']
+    word_frequency._letters = set(header['letters'])
+    word_frequency._longest_word_length = header['longest_word_length']
+    return spell_checker
+
+
+def main(argv=None):
+    from parsigs.parse_sig_api import _build_spell_checker, drug_names_path
+
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0]) if argv else snapshot_path()
+    write_snapshot(_build_spell_checker(), path, snapshot_source_key(drug_names_path))
+    print(f'Wrote spell checker snapshot to {path}')
+
+
+if __name__ == '__main__':
+    main()
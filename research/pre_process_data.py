@@ -1,78 +1,148 @@
+import argparse
 import pathlib
+import zlib
 
 from spacy.tokens import DocBin
 import spacy
 
+"""
+Converts the brat annotated training set (pairs of <name>.txt and <name>.ann files) to spaCy DocBins, streaming:
+the files are paired in a single pass over the directory, tokenized with nlp.pipe (over n_process processes) and
+written to DocBin shards of shard_size docs, so only one shard is held in memory.
+
+Every doc goes to the test set if the hash of its file name falls in the test fraction, so the split is the same on
+every run and does not depend on the order the files are listed in. train_docs.spacy and test_docs.spacy are
+directories of shards, which spacy train reads as a corpus (--paths.train train_docs.spacy).
+"""
+
 # globally picking a subset of labels
 INCL_LABELS = ['Dosage', 'Drug', 'Form', 'Frequency', 'Strength', 'Duration']
+ATTRS = ["ENT_IOB", "ENT_TYPE"]
+# the names of the shards ShardedDocBin writes
+_shard_pattern = '[0-9][0-9][0-9][0-9][0-9].spacy'
+
+
+class ShardedDocBin:
+    """
+    Adds docs to a directory of DocBin files of up to shard_size docs each, named 00000.spacy, 00001.spacy, ...
+    The shards of a previous run in the directory are deleted, so they are not read back with the new ones, the other
+    files are left as they are.
+    """
+
+    def __init__(self, output_path: pathlib.Path, shard_size: int):
+        self.output_path = output_path
+        self.shard_size = shard_size
+        self.n_docs = 0
+        self._n_shards = 0
+        self._doc_bin = DocBin(attrs=ATTRS)
+        if output_path.exists() and not output_path.is_dir():
+            raise ValueError(f'{output_path} is a file, the output is now a directory of shards: remove the file or '
+                             f'pass another output path')
+        output_path.mkdir(parents=True, exist_ok=True)
+        for shard_path in output_path.glob(_shard_pattern):
+            shard_path.unlink()
+
+    def add(self, doc):
+        self._doc_bin.add(doc)
+        self.n_docs += 1
+        if len(self._doc_bin) >= self.shard_size:
+            self._flush()
+
+    def close(self):
+        if len(self._doc_bin) > 0:
+            self._flush()
+
+    def _flush(self):
+        self._doc_bin.to_disk(self.output_path / f'{self._n_shards:05d}.spacy')
+        self._n_shards += 1
+        self._doc_bin = DocBin(attrs=ATTRS)
 
-def main():
 
-    input_path = pathlib.Path("training_20180910")
-    output_path_train = pathlib.Path("train_docs.spacy")
-    output_path_test = pathlib.Path("test_docs.spacy")
+def index_annotated_files(input_path: pathlib.Path):
+    """
+    The (txt, ann) file pairs of the directory, sorted by name, listing the directory once.
+    """
+    text_files = {}
+    annotation_files = {}
+    for path in input_path.iterdir():
+        if path.suffix == '.txt':
+            text_files[path.stem] = path
+        elif path.suffix == '.ann':
+            annotation_files[path.stem] = path
+    pairs = []
+    for stem in sorted(annotation_files):
+        if stem not in text_files:
+            raise ValueError(f'No match for ann file {annotation_files[stem]}')
+        pairs.append((text_files[stem], annotation_files[stem]))
+    return pairs
+
+
+def read_annotations(annotation_file: pathlib.Path):
+    ents = []
+    for l in annotation_file.read_text().split('\n'):
+        ann = l.split('\t')
+        if len(ann) != 3:
+            continue
+        ann_type, label_idx, text = ann
+        # just want text annotations, not relations
+        if ann_type[0] != 'T':
+            continue
+        # cases of line splits indicated by semicolons - just take whole span
+        elif ';' in label_idx:
+            label_idx_filtered = []
+            for el in label_idx.split():
+                if ';' in el:
+                    continue
+                label_idx_filtered.append(el)
+            label, st, end = label_idx_filtered
+        else:
+            label, st, end = label_idx.split()
+        if label in INCL_LABELS:
+            ents.append([st, end, label])
+    return ents
+
+
+def is_test_doc(name: str, test_fraction: float):
+    return zlib.crc32(name.encode()) % 10000 < test_fraction * 10000
+
+
+def convert(input_path: pathlib.Path, output_path_train: pathlib.Path, output_path_test: pathlib.Path,
+            test_fraction=0.1, shard_size=1000, n_process=1, batch_size=256):
+    if output_path_train.resolve() == output_path_test.resolve():
+        raise ValueError('The train and test outputs must be different directories')
     nlp = spacy.blank("en")
-    doc_bin_train = DocBin(attrs=["ENT_IOB", "ENT_TYPE"])
-    doc_bin_test = DocBin(attrs=["ENT_IOB", "ENT_TYPE"])
-    doc_list = []
-    # get all ann
-    # match ann and txt
-    ann_txt = {}
-    for annotation_file in input_path.glob('*.ann'):
-        matched_text = list(input_path.glob(f'{annotation_file.stem}.txt'))
-        if len(matched_text) > 1:
-            raise ValueError(f'Multiple matches for ann file {annotation_file}')
-        elif len(matched_text) == 0:
-            raise ValueError(f'No match for ann file {annotation_file}')
-        ann_txt[annotation_file] = matched_text[0]
-    for text_file in ann_txt:
-        txt = ann_txt[text_file].read_text()
-        doc = nlp(txt)
-        ents = []
-        for l in text_file.read_text().split('\n'):
-            ann = l.split('\t')
-            if len(ann) != 3:
-                continue
-            ann_type, label_idx, text = ann
-            # just want text annotations, not relations
-            if ann_type[0] != 'T':
-                continue
-            # cases of line splits indicated by semicolons - just take whole span
-            elif ';' in label_idx:
-                label_idx_filtered = []
-                for el in label_idx.split():
-                    if ';' in el:
-                        continue
-                    label_idx_filtered.append(el)
-                label, st, end = label_idx_filtered
-            else:
-                label, st, end = label_idx.split()
-            if label in INCL_LABELS:
-                ents.append([st, end, label])
+    train = ShardedDocBin(output_path_train, shard_size)
+    test = ShardedDocBin(output_path_test, shard_size)
+    # the texts are read lazily, nlp.pipe only holds a batch of them at a time
+    texts = ((text_file.read_text(), annotation_file)
+             for text_file, annotation_file in index_annotated_files(input_path))
+    for doc, annotation_file in nlp.pipe(texts, as_tuples=True, n_process=n_process, batch_size=batch_size):
         # some spans are invalid - don't match spacy's tokenization, for now, drop those entities
         ents_filtered = []
-        for e in ents:
+        for e in read_annotations(annotation_file):
             span = doc.char_span(int(e[0]), int(e[1]), label=e[2])
             if span:
                 ents_filtered.append(span)
         # additionally some overlap, prefers longer spans
-        ents_filtered = spacy.util.filter_spans(ents_filtered)
-        doc.ents = ents_filtered
-        doc_list.append(doc)
-    
-    # split into train and tests
-    train_docs = doc_list[:int(len(doc_list)*0.9)]
-    test_docs = doc_list[int(len(doc_list)*0.9):]
-
-    # add to doc_bin
-    for doc in train_docs:
-        doc_bin_train.add(doc)
-    for doc in test_docs:
-        doc_bin_test.add(doc)
-
-    doc_bin_test.to_disk(output_path_test)
-    doc_bin_train.to_disk(output_path_train)
-    print(f"Processed {len(doc_list)} documents")
+        doc.ents = spacy.util.filter_spans(ents_filtered)
+        (test if is_test_doc(annotation_file.stem, test_fraction) else train).add(doc)
+    train.close()
+    test.close()
+    return train.n_docs, test.n_docs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--input', default="training_20180910")
+    arg_parser.add_argument('--train-output', default="train_docs.spacy")
+    arg_parser.add_argument('--test-output', default="test_docs.spacy")
+    arg_parser.add_argument('--test-fraction', type=float, default=0.1)
+    arg_parser.add_argument('--shard-size', type=int, default=1000)
+    arg_parser.add_argument('--n-process', type=int, default=1)
+    args = arg_parser.parse_args()
+    n_train, n_test = convert(pathlib.Path(args.input), pathlib.Path(args.train_output),
+                              pathlib.Path(args.test_output), args.test_fraction, args.shard_size, args.n_process)
+    print(f"Processed {n_train + n_test} documents ({n_train} train, {n_test} test)")
 
 
 if __name__ == "__main__":
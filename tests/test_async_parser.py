@@ -0,0 +1,48 @@
+import asyncio
+import unittest
+
+from parsigs.async_parser import AsyncSigParser
+from parsigs.parse_sig_api import SigParser
+
+
+# a plain TestCase running every coroutine with asyncio.run, IsolatedAsyncioTestCase needs Python 3.8
+class TestAsyncSigParser(unittest.TestCase):
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+            "1 TAB of BENADRYL BID",
+            "Take 2 tabs of amoxicillin 500mg every 12 days for 10 days"] * 4
+
+    def test_concurrent_parses_are_batched(self):
+        batches = []
+        expected = [SigParser().parse(sig) for sig in self.sigs]
+
+        async def parse_concurrently():
+            async with AsyncSigParser(max_batch_size=8, max_wait_seconds=0.05,
+                                      on_batch=batches.append) as async_parser:
+                return await asyncio.gather(*(async_parser.parse(sig) for sig in self.sigs))
+
+        self.assertEqual(asyncio.run(parse_concurrently()), expected)
+        self.assertEqual([batch.size for batch in batches], [8, 8])
+
+    def test_parse_many(self):
+        expected = SigParser().parse_many(self.sigs)
+
+        async def parse_many():
+            async with AsyncSigParser(max_batch_size=5) as async_parser:
+                return await async_parser.parse_many(self.sigs)
+
+        self.assertEqual(asyncio.run(parse_many()), expected)
+
+    def test_failing_sig_fails_only_its_caller(self):
+        async def parse_concurrently():
+            async with AsyncSigParser(max_wait_seconds=0.05) as async_parser:
+                return await asyncio.gather(async_parser.parse("take 1/0 tablet daily"),
+                                            async_parser.parse("1 TAB of BENADRYL BID"), return_exceptions=True)
+
+        results = asyncio.run(parse_concurrently())
+        self.assertIsInstance(results[0], ZeroDivisionError)
+        self.assertEqual(results[1], SigParser().parse("1 TAB of BENADRYL BID"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import tempfile
+import unittest
+
+from benchmarks.corpus import generate_sigs
+from benchmarks.stub_model import build_stub_model, save_stub_model
+from benchmarks.suite import compare
+from parsigs.parse_sig_api import SigParser
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_corpus_is_determined_by_its_seed(self):
+        self.assertEqual(generate_sigs(50, seed=1), generate_sigs(50, seed=1))
+        self.assertNotEqual(generate_sigs(50, seed=1), generate_sigs(50, seed=2))
+        self.assertEqual(len(generate_sigs(50)), 50)
+
+    def test_stub_model_emits_the_model_labels(self):
+        labels = set(build_stub_model().get_pipe('entity_ruler').labels)
+        self.assertEqual(labels, {'Dosage', 'Drug', 'Form', 'Frequency', 'Strength', 'Duration'})
+
+    def test_sig_parser_with_stub_model(self):
+        with tempfile.TemporaryDirectory() as stub_model_path:
+            save_stub_model(stub_model_path)
+            sig_parser = SigParser(stub_model_path)
+        structured_sig = sig_parser.parse("Take 2 tablets of ibuprofen 200mg every 6 hours for 5 days")[0]
+        self.assertEqual((structured_sig.drug, structured_sig.form, structured_sig.strength), ('ibuprofen', 'tablet',
+                                                                                               '200mg'))
+        self.assertEqual((structured_sig.frequencyType, structured_sig.interval), ('Hour', 6))
+        self.assertEqual((structured_sig.periodType, structured_sig.periodAmount), ('Day', 5))
+        self.assertGreaterEqual(len(sig_parser.parse_many(generate_sigs(100))), 100)
+
+    def test_compare(self):
+        baseline = {'stages': {'parse': {'sigs_per_second': 100.0}, 'ner': {'sigs_per_second': 50.0}}}
+        current = {'stages': {'parse': {'sigs_per_second': 80.0}}}
+        self.assertEqual(compare(baseline, current), {'parse': 0.8})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from parsigs import cli
+from parsigs.parse_sig_api import SigParser
+
+
+class TestCli(unittest.TestCase):
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+            "1 TAB of BENADRYL BID"]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_detect_format(self):
+        self.assertEqual(cli._detect_format('sigs.csv', cli._input_formats), 'csv')
+        self.assertEqual(cli._detect_format('data.v2/sigs.JSONL.gz', cli._input_formats), 'jsonl')
+        with self.assertRaises(ValueError):
+            cli._detect_format('sigs.parquet', cli._input_formats)
+
+    def test_read_sigs(self):
+        self.assertEqual(list(cli._read_sigs(io.StringIO('id,sig\n7,take 1 tab\n'), 'csv', 'sig', 'id')),
+                         [('7', 'take 1 tab')])
+        self.assertEqual(list(cli._read_sigs(io.StringIO('text\ttake 1 tab\n'), 'tsv', 'text')), [])
+        self.assertEqual(list(cli._read_sigs(io.StringIO('text\nx\n'), 'tsv', 'text')), [(None, 'x')])
+        self.assertEqual(list(cli._read_sigs(io.StringIO('{"sig": "take 1 tab"}\n\n'), 'jsonl', 'sig')),
+                         [(None, 'take 1 tab')])
+        self.assertEqual(list(cli._read_sigs(io.StringIO('take 1 tab\r\nbid\n'), 'txt', 'sig')),
+                         [(None, 'take 1 tab'), (None, 'bid')])
+        with self.assertRaises(ValueError):
+            list(cli._read_sigs(io.StringIO('{"text": "take 1 tab"}\n'), 'jsonl', 'sig'))
+        self.assertEqual(list(cli._read_sigs(io.StringIO('{"sig": null}\n'), 'jsonl', 'sig')), [(None, '')])
+        for line in ['5', '"take 1 tab"', '{"sig": 5}', '{"sig": {"text": "bid"}}', '{"sig": ']:
+            with self.assertRaisesRegex(ValueError, 'line 2'):
+                list(cli._read_sigs(io.StringIO('{"sig": "take 1 tab"}\n' + line + '\n'), 'jsonl', 'sig'))
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            list(cli._read_sigs(io.StringIO('{"sig": "bid"}\n\n{"text": "bid"}\n'), 'jsonl', 'sig'))
+
+    def test_parse_jsonl_gz_to_csv(self):
+        input_path = self.path / 'sigs.jsonl.gz'
+        with gzip.open(input_path, 'wt') as input_file:
+            for i, sig in enumerate(self.sigs):
+                input_file.write(json.dumps({'id': i, 'sig': sig}) + '\n')
+        output_path = self.path / 'structured.csv'
+
+        cli.main(['parse', str(input_path), '-o', str(output_path), '--id-column', 'id', '--batch-size', '2', '-q'])
+
+        with open(output_path, newline='') as output_file:
+            rows = list(csv.DictReader(output_file))
+        expected = [(str(index), str(instruction), structured_sig.drug or '')
+                    for index, sig in enumerate(self.sigs)
+                    for instruction, structured_sig in enumerate(SigParser().parse(sig))]
+        self.assertEqual([(row['index'], row['instruction'], row['drug']) for row in rows], expected)
+        self.assertEqual([row['id'] for row in rows], [row['index'] for row in rows])
+
+    def test_parse_to_stdout_keeps_stdout_open(self):
+        input_path = self.path / 'sigs.txt'
+        input_path.write_text('\n'.join(self.sigs) + '\n')
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with mock.patch('sys.stdout', stdout):
+            cli.main(['parse', str(input_path), '-o', '-', '-q'])
+            print('done')
+        self.assertFalse(stdout.closed)
+        stdout.flush()
+        lines = stdout.buffer.getvalue().decode().splitlines()
+        self.assertEqual(lines[-1], 'done')
+        self.assertEqual(len(lines) - 1, sum(len(SigParser().parse(sig)) for sig in self.sigs))
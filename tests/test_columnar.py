@@ -0,0 +1,63 @@
+import importlib.util
+import unittest
+
+from parsigs.columnar import StructuredSigColumns
+from parsigs.parse_sig_api import SigParser, StructuredSig
+
+
+class TestStructuredSigColumns(unittest.TestCase):
+    structured_sigs_per_sig = [
+        [StructuredSig('ibuprofen', 'tablet', '200mg', 'Day', 1.0, 'Week', 3, 3)],
+        [],
+        [StructuredSig(None, 'tablet', None, 'Day', 1.0, None, None, None, takeAsNeeded=True),
+         StructuredSig(None, 'tablets', None, 'Week', 2.0, None, None, 1)],
+        [StructuredSig('ibuprofen', None, None, None, None, None, None, None, interval=None)],
+    ]
+
+    def test_round_trip(self):
+        columns = StructuredSigColumns.from_structured_sigs(self.structured_sigs_per_sig)
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(list(columns.sig_index), [0, 2, 2, 3])
+        self.assertEqual(columns.to_structured_sigs(), [structured_sig for structured_sigs in
+                                                        self.structured_sigs_per_sig
+                                                        for structured_sig in structured_sigs])
+
+    def test_large_integers(self):
+        structured_sigs = [StructuredSig(None, 'tablet', None, 'Day', 1.0, 'Day', 2 ** 40, 2 ** 31, interval=-2 ** 35)]
+        columns = StructuredSigColumns.from_structured_sigs([structured_sigs])
+        self.assertEqual(columns.to_structured_sigs(), structured_sigs)
+
+    def test_strings_are_dictionary_encoded(self):
+        columns = StructuredSigColumns.from_structured_sigs(self.structured_sigs_per_sig)
+        self.assertEqual(columns.categories['drug'], ['ibuprofen'])
+        self.assertEqual(list(columns.codes['drug']), [0, -1, -1, 0])
+        self.assertEqual(columns.categories['frequencyType'], ['Day', 'Week'])
+
+    def test_structured_sig_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.structured_sigs_per_sig[0][0], '__dict__'))
+
+    def test_parse_many_columnar(self):
+        sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+                "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+                "1 TAB of BENADRYL BID"]
+        sig_parser = SigParser()
+        columns = sig_parser.parse_many_columnar(sigs, batch_size=2)
+        self.assertEqual(columns.to_structured_sigs(), sig_parser.parse_many(sigs))
+        self.assertEqual(list(columns.sig_index), [0, 1, 1, 2])
+
+    @unittest.skipUnless(importlib.util.find_spec('pandas'), 'pandas is not installed')
+    def test_to_pandas(self):
+        data_frame = StructuredSigColumns.from_structured_sigs(self.structured_sigs_per_sig).to_pandas()
+        self.assertEqual(list(data_frame['drug'].astype(object).where(data_frame['drug'].notna(), None)),
+                         ['ibuprofen', None, None, 'ibuprofen'])
+        self.assertEqual(data_frame['times'].isna().tolist(), [False, True, False, True])
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_to_arrow(self):
+        table = StructuredSigColumns.from_structured_sigs(self.structured_sigs_per_sig).to_arrow()
+        self.assertEqual(table.column('drug').to_pylist(), ['ibuprofen', None, None, 'ibuprofen'])
+        self.assertEqual(table.column('times').to_pylist(), [3, None, 1, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
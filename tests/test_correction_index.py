@@ -0,0 +1,33 @@
+import unittest
+
+from parsigs.correction_index import CorrectionIndex, _damerau_levenshtein
+from parsigs.parse_sig_api import _autocorrect, _get_spell_checker
+
+
+class TestCorrectionIndex(unittest.TestCase):
+    spell_checker = _get_spell_checker()
+    correction_index = CorrectionIndex(spell_checker)
+
+    def test_same_corrections_as_spell_checker(self):
+        for word in ["tkae", "talbet", "tabet", "tiems", "wekes", "atke", "tmies", "takr", "dya", "hten", "bendaryl",
+                     "aftehrocks", "amoxicilin", "ibuprofin", "zzzzqqqq"]:
+            self.assertEqual(self.correction_index.correction(word), self.spell_checker.correction(word), word)
+
+    def test_damerau_levenshtein(self):
+        self.assertEqual(_damerau_levenshtein("tkae", "take", 2), 1)
+        self.assertEqual(_damerau_levenshtein("aftehrocks", "aftershocks", 2), 2)
+        self.assertEqual(_damerau_levenshtein("tablet", "tablets", 2), 1)
+        self.assertGreater(_damerau_levenshtein("tablet", "capsule", 2), 2)
+
+    def test_memo_is_bounded(self):
+        correction_index = CorrectionIndex(self.spell_checker, memo_size=2)
+        for word in ["tkae", "talbet", "wekes", "tkae"]:
+            correction_index.correction(word)
+        info = correction_index.memo_info()
+        self.assertEqual(info.currsize, 2)
+        self.assertEqual(info.evictions, 2)
+        self.assertEqual(info.misses, 4)
+
+    def test_domain_words_are_not_corrected(self):
+        self.assertEqual(_autocorrect("1 po tid prn 5 ml qod"), "1 po tid prn 5 ml qod")
+        self.assertEqual(_autocorrect("Tkae 1 talbet QID"), "take 1 tablet qid")
@@ -0,0 +1,63 @@
+import importlib.util
+import unittest
+
+from parsigs.parse_sig_api import SigParser, StructuredSig, _pre_process
+
+sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+        "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+        None,
+        "1 TAB of BENADRYL BID",
+        "",
+        "take 1/2 tab by mouth once nightly (with food)",
+        "Take 1 TABLET 3 times a  day for 2 weeks",
+        "one tab twice daily"]
+
+
+@unittest.skipUnless(importlib.util.find_spec('pandas'), 'pandas is not installed')
+class TestDataFrame(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import pandas as pd
+
+        cls.sig_parser = SigParser()
+        cls.sigs = pd.Series(sigs, index=[f'row{i}' for i in range(len(sigs))], dtype=object)
+
+    def test_pre_process_column(self):
+        from parsigs.dataframe import pre_process_column
+
+        self.assertEqual(pre_process_column(self.sigs).tolist(),
+                         [None if sig is None else _pre_process(sig) for sig in sigs])
+        self.assertEqual(self.sigs.parsigs.pre_process().index.tolist(), self.sigs.index.tolist())
+
+    def test_parse_column(self):
+        import pandas as pd
+
+        frame = self.sig_parser.parse_column(self.sigs, batch_size=2)
+        expected = [(label, structured_sig) for label, sig in self.sigs.items() if sig is not None
+                    for structured_sig in self.sig_parser.parse(sig)]
+        self.assertEqual(frame.index.tolist(), [label for label, _ in expected])
+        self.assertEqual(frame['sig_index'].tolist(), [self.sigs.index.get_loc(label) for label, _ in expected])
+        rows = frame.drop(columns='sig_index').astype(object).to_dict('records')
+        self.assertEqual([StructuredSig(**{field: None if pd.isna(value) else value for field, value in row.items()})
+                          for row in rows], [structured_sig for _, structured_sig in expected])
+        self.assertEqual(str(frame['periodAmount'].dtype), 'Int64')
+        self.assertEqual(str(frame['drug'].dtype), 'category')
+
+    def test_accessor(self):
+        import pandas as pd
+
+        frame = self.sig_parser.parse_column(self.sigs)
+        pd.testing.assert_frame_equal(self.sigs.parsigs.parse(self.sig_parser), frame)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_arrow_array(self):
+        import pandas as pd
+        import pyarrow as pa
+
+        frame = self.sig_parser.parse_column(pa.chunked_array([sigs[:3], sigs[3:]]))
+        expected = self.sig_parser.parse_column(self.sigs.reset_index(drop=True))
+        pd.testing.assert_frame_equal(frame, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from parsigs.document import segment_document
+from parsigs.parse_sig_api import SigParser
+
+document = """Discharge medications:
+1. Atorvastatin: take 1 tablet by mouth every day
+2) Amoxicillin 500mg   take 2 tabs every 12 hours for 10 days  \r
+  - 0.5 tablet daily; then 1 tablet daily
+• Benadryl 1 TAB BID
+
+"""
+
+
+class TestDocument(unittest.TestCase):
+    def test_segments(self):
+        segments = [document[start:end] for start, end in segment_document(document)]
+        self.assertEqual(segments, ["Discharge medications:",
+                                    "Atorvastatin: take 1 tablet by mouth every day",
+                                    "Amoxicillin 500mg   take 2 tabs every 12 hours for 10 days",
+                                    "0.5 tablet daily; then 1 tablet daily",
+                                    "Benadryl 1 TAB BID"])
+        self.assertEqual(segment_document("  \n\n "), [])
+
+    def test_parse_document(self):
+        sig_parser = SigParser()
+        results = sig_parser.parse_document(document, batch_size=2)
+        # the header has no entities
+        self.assertEqual(len(results), 4)
+        self.assertNotIn("Discharge medications:", [result.text for result in results])
+        for result in results:
+            self.assertEqual(document[result.start:result.end], result.text)
+            self.assertEqual(result.structured_sigs, sig_parser.parse(result.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
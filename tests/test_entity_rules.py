@@ -0,0 +1,39 @@
+import unittest
+
+from parsigs.entity_rules import EntityRules, interval_keyword, time_units, times_keyword
+
+
+class TestEntityRules(unittest.TestCase):
+    def setUp(self):
+        self.rules = EntityRules()
+
+    def test_time_unit(self):
+        self.assertEqual(self.rules.scan("every 2 hours at night").time_unit, "Hour")
+        self.assertEqual(self.rules.scan("weekly").time_unit, "Week")
+        self.assertEqual(self.rules.scan("at bedtime").time_unit, "Day")
+        self.assertIsNone(self.rules.scan("as needed").time_unit)
+
+    def test_amounts(self):
+        scan = self.rules.scan("every 6 hours")
+        self.assertEqual(scan.amount_after(interval_keyword), 6)
+        self.assertIsNone(scan.amount_before(times_keyword))
+        scan = self.rules.scan("3 times every other day")
+        self.assertEqual(scan.amount_before(times_keyword), 3)
+        self.assertEqual(scan.amount_after(interval_keyword), 2)
+        # only whole word numbers
+        self.assertIsNone(self.rules.scan("q6h").amount())
+        self.assertEqual(self.rules.scan("for 10 days").amount(), 10)
+
+    def test_overlapping_words(self):
+        # "bedtime" and "times" overlap, both are found
+        scan = self.rules.scan("2 bedtimes")
+        self.assertEqual((scan.time_unit, scan.amount_before(times_keyword)), ("Day", 2))
+
+    def test_new_time_unit(self):
+        rules = EntityRules(time_units=(('Minute', ('minute',)),) + time_units)
+        scan = rules.scan("every 30 minutes")
+        self.assertEqual((scan.time_unit, scan.amount_after(interval_keyword)), ("Minute", 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+import spacy
+
+from parsigs.entity_store import EntityStore, EntityStoreInfo, StoreBackedModel, model_version
+from parsigs.parse_sig_api import SigParser
+
+sigs = ["take 1 tablet by mouth every day", "Amoxicillin 500mg take 2 tabs every 12 hours for 10 days",
+        "take 1 tablet by mouth every day", "Benadryl 1 TAB BID at bedtime as needed"]
+
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'entities.sqlite'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replay(self):
+        expected = SigParser().parse_many(sigs)
+        with EntityStore(self.path) as store:
+            sig_parser = SigParser(entity_store=store)
+            self.assertEqual(sig_parser.parse_many(sigs), expected)
+            self.assertEqual(sig_parser.entity_store_info().hits, 0)
+            self.assertEqual(sig_parser.entity_store_info().size, 3)
+
+        # a new parser over the same file replays the stored entities
+        sig_parser = SigParser(entity_store=self.path)
+        self.assertEqual(sig_parser.parse_many(sigs), expected)
+        self.assertEqual(sig_parser.parse(sigs[1]), SigParser().parse(sigs[1]))
+        self.assertEqual(sig_parser.entity_store_info(), EntityStoreInfo(hits=4, misses=0, size=3))
+
+    def test_with_rule_fast_path(self):
+        expected = SigParser().parse_many(sigs)
+        for _ in range(2):
+            sig_parser = SigParser(entity_store=self.path, rule_fast_path=True)
+            self.assertEqual(sig_parser.parse_many(sigs), expected)
+            self.assertEqual([result.structured_sigs for result in sig_parser.parse_stream(iter(sigs))],
+                             [SigParser().parse(sig) for sig in sigs])
+
+    @unittest.skipUnless(importlib.util.find_spec('pandas'), 'pandas is not installed')
+    def test_parse_column_with_rule_fast_path(self):
+        import pandas as pd
+
+        expected = SigParser().parse_column(pd.Series(sigs))
+        for _ in range(2):
+            sig_parser = SigParser(entity_store=self.path, rule_fast_path=True)
+            pd.testing.assert_frame_equal(sig_parser.parse_column(pd.Series(sigs)), expected)
+
+    def test_no_store(self):
+        self.assertIsNone(SigParser().entity_store_info())
+
+    def test_stored_doc(self):
+        language = spacy.load("en_parsigs")
+        with EntityStore(self.path) as store:
+            model = StoreBackedModel(language, store)
+            text = "take 2 tabs every 12 hours for 10 days"
+            model_output = model(text)
+            stored = model(text)
+            self.assertIsNot(stored, model_output)
+            self.assertEqual(stored.text, text)
+            self.assertEqual(len(stored), len(model_output))
+            self.assertEqual([(entity.text, entity.label_, entity.start_char, entity.end_char)
+                              for entity in stored.ents],
+                             [(entity.text, entity.label_, entity.start_char, entity.end_char)
+                              for entity in model_output.ents])
+
+    def test_model_version_key(self):
+        language = spacy.load("en_parsigs")
+        text = "take 1 tablet daily"
+        with EntityStore(self.path) as store:
+            store.put_many(model_version(language), [language(text)])
+            self.assertIsNotNone(store.get_many(model_version(language), [text])[0])
+            self.assertEqual(store.get_many(model_version(language) + '.1', [text, "take 1 tablet"]), [None, None])
+            self.assertEqual(store.info(), EntityStoreInfo(hits=1, misses=2, size=1))
+            # storing the same sig again does not add a row
+            store.put_many(model_version(language), [language(text), language("take 1 tablet")])
+            self.assertEqual(store.info().size, 2)
+        with EntityStore(self.path) as store:
+            self.assertEqual(store.info(), EntityStoreInfo(hits=0, misses=0, size=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
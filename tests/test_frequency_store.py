@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from spellchecker import SpellChecker
+
+from parsigs import frequency_store
+from parsigs.correction_index import CorrectionIndex
+
+
+class TestFrequencyStore(unittest.TestCase):
+    words = ["take", "take", "tablet", "tablets", "week", "weeks", "amoxicillin", "daily", "by", "mouth", "café"]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'word_frequency.store'
+        self.spell_checker = SpellChecker(language=None)
+        self.spell_checker.word_frequency.load_words(self.words)
+        frequency_store.write_store(self.spell_checker, self.path, 'key')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_store_round_trip(self):
+        store = frequency_store.open_store(self.path, 'key')
+        self.assertEqual(dict(store), dict(self.spell_checker.word_frequency.dictionary))
+        self.assertIn("café", store)
+        self.assertNotIn("tabelt", store)
+        self.assertIsNone(store.get("tabelt"))
+        with self.assertRaises(KeyError):
+            store["tabelt"]
+        loaded = store.spell_checker()
+        self.assertEqual(loaded.word_frequency.total_words, self.spell_checker.word_frequency.total_words)
+        self.assertEqual(loaded.word_frequency.longest_word_length,
+                         self.spell_checker.word_frequency.longest_word_length)
+
+    def test_corrections_match(self):
+        store = frequency_store.open_store(self.path, 'key')
+        expected = CorrectionIndex(self.spell_checker)
+        stored = CorrectionIndex(store.spell_checker(), deletes_index=store.deletes_index)
+        for word in ["tkae", "talbet", "wekes", "amoxicilin", "dialy", "xyz"]:
+            self.assertEqual(stored.correction(word), expected.correction(word))
+
+    def test_stale_store_is_ignored(self):
+        self.assertIsNone(frequency_store.open_store(self.path, 'another-key'))
+
+    def test_missing_or_invalid_store_is_ignored(self):
+        self.assertIsNone(frequency_store.open_store(Path(self.tmp_dir.name) / 'missing.store', 'key'))
+        self.path.write_bytes(b'not a store')
+        self.assertIsNone(frequency_store.open_store(self.path, 'key'))
+
+
+if __name__ == '__main__':
+    unittest.main()
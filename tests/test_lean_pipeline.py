@@ -0,0 +1,55 @@
+import unittest
+
+from spacy.language import Language
+
+from parsigs.lean_pipeline import LeanPipelineWarning, components_to_exclude
+from parsigs.parse_sig_api import SigParser
+
+
+@Language.factory('test_pos_based_entities', assigns=['doc.ents'], requires=['token.pos'])
+def _create_pos_based_entities(nlp, name):
+    return lambda doc: doc
+
+
+def _config(components):
+    return {'nlp': {'pipeline': [name for name, _ in components]},
+            'components': {name: component for name, component in components}}
+
+
+_listener = {'@architectures': 'spacy.Tok2VecListener.v1', 'width': 96, 'upstream': '*'}
+
+
+class TestLeanPipeline(unittest.TestCase):
+    def test_keeps_ner_and_the_tok2vec_it_listens_to(self):
+        config = _config([('tok2vec', {'factory': 'tok2vec'}),
+                          ('tagger', {'factory': 'tagger', 'model': {'tok2vec': _listener}}),
+                          ('parser', {'factory': 'parser', 'model': {'tok2vec': _listener}}),
+                          ('ner', {'factory': 'ner', 'model': {'tok2vec': _listener}})])
+        self.assertEqual(components_to_exclude(config), ['tagger', 'parser'])
+
+    def test_excludes_tok2vec_when_ner_embeds_itself(self):
+        config = _config([('tok2vec', {'factory': 'tok2vec'}),
+                          ('ner', {'factory': 'ner', 'model': {'tok2vec': {'@architectures': 'spacy.HashEmbedCNN.v2'}}}),
+                          ('lemmatizer', {'factory': 'lemmatizer'})])
+        self.assertEqual(components_to_exclude(config), ['tok2vec', 'lemmatizer'])
+
+    def test_warns_and_keeps_a_needed_component(self):
+        config = _config([('tok2vec', {'factory': 'tok2vec'}),
+                          ('morphologizer', {'factory': 'morphologizer', 'model': {'tok2vec': _listener}}),
+                          ('parser', {'factory': 'parser'}),
+                          ('entities', {'factory': 'test_pos_based_entities'})])
+        with self.assertWarns(LeanPipelineWarning):
+            self.assertEqual(components_to_exclude(config), ['parser'])
+
+    def test_no_entity_component_loads_everything(self):
+        with self.assertWarns(LeanPipelineWarning):
+            self.assertEqual(components_to_exclude(_config([('tagger', {'factory': 'tagger'})])), [])
+
+    def test_lean_parser_matches_full_parser(self):
+        sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+                "take 1 tablet of atorvastatin every day and then 2 tablets every week"]
+        self.assertEqual(SigParser(lean_pipeline=True).parse_many(sigs), SigParser().parse_many(sigs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from parsigs.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertEqual(cache.info(), (1, 0, 1, 2, 2))
+
+    def test_miss_returns_default(self):
+        cache = LRUCache(1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 0), 0)
+        self.assertEqual(cache.info().misses, 2)
+
+    def test_single_thread_cache(self):
+        cache = LRUCache(1, thread_safe=False)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.info(), (1, 0, 1, 1, 1))
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
@@ -0,0 +1,39 @@
+import unittest
+
+from parsigs.parallel import ParallelSigParser
+from parsigs.parse_sig_api import SigParser
+
+
+class TestParallelSigParser(unittest.TestCase):
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+            "1 TAB of BENADRYL BID",
+            "Take 2 tabs of amoxicillin 500mg every 12 days for 10 days",
+            "take 1/2 tab by mouth once nightly"] * 3
+
+    def test_parse_many_matches_sig_parser(self):
+        expected = SigParser().parse_many(self.sigs)
+        with ParallelSigParser(n_process=2, chunk_size=2) as parallel_parser:
+            self.assertEqual(parallel_parser.parse_many(self.sigs), expected)
+
+    def test_parse_stream_keeps_input_order(self):
+        expected = [SigParser().parse(sig) for sig in self.sigs]
+        with ParallelSigParser(n_process=2, chunk_size=4, batch_size=2) as parallel_parser:
+            results = list(parallel_parser.parse_stream(iter(self.sigs)))
+        self.assertEqual([result.index for result in results], list(range(len(self.sigs))))
+        self.assertEqual([result.structured_sigs for result in results], expected)
+
+    def test_repeated_sigs_in_chunk(self):
+        expected = SigParser().parse_many(self.sigs)
+        with ParallelSigParser(n_process=2, chunk_size=len(self.sigs)) as parallel_parser:
+            results = parallel_parser.parse_many(self.sigs)
+        self.assertEqual(results, expected)
+        self.assertEqual(len({id(structured_sig) for structured_sig in results}), len(results))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            ParallelSigParser(n_process=1, chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import importlib.util
+import unittest
+
+from parsigs.parse_sig_api import ParseOptions, SigParser, _pre_process, parse_option_presets
+
+
+class TestParseOptions(unittest.TestCase):
+    sig_parser = SigParser()
+
+    def test_pre_process_stages(self):
+        sig = "tkae one tabs 1/2 hour befre bedtime"
+        self.assertEqual(_pre_process(sig), _pre_process(sig, ParseOptions()))
+        self.assertEqual(_pre_process(sig, ParseOptions(autocorrect=False)), "tkae 1 tablet 0.5 hour befre bedtime")
+        self.assertEqual(_pre_process(sig, ParseOptions(number_words=False, fractions=False)),
+                         "take one tablet 1/2 hour before bedtime")
+
+    def test_presets(self):
+        self.assertEqual(parse_option_presets['noisy-accurate'], ParseOptions())
+        self.assertFalse(parse_option_presets['trusted-fast'].autocorrect)
+        sig = "Take 1 tablet 3 times a day for 2 weeks"
+        self.assertEqual(self.sig_parser.parse(sig, 'trusted-fast'), self.sig_parser.parse(sig))
+        with self.assertRaises(ValueError):
+            self.sig_parser.parse(sig, 'fast')
+
+    def test_latin_frequencies(self):
+        structured_sig, = self.sig_parser.parse("take 1 tablet by mouth bid", ParseOptions(latin_frequencies=False))
+        self.assertEqual((structured_sig.frequencyType, structured_sig.times), (None, None))
+        structured_sig, = self.sig_parser.parse("take 1 tablet by mouth bid")
+        self.assertEqual((structured_sig.frequencyType, structured_sig.times), ('Day', 2))
+
+    def test_singularize(self):
+        sig = "Take 2 capsules 3 times a day"
+        self.assertEqual(self.sig_parser.parse(sig)[0].form, 'capsule')
+        self.assertEqual(self.sig_parser.parse(sig, ParseOptions(singularize=False))[0].form, 'capsules')
+
+    def test_none_is_the_default(self):
+        sig = "tkae 1 tablet 3 times a day"
+        self.assertEqual(SigParser(options=None).parse(sig), self.sig_parser.parse(sig))
+
+    def test_parser_options(self):
+        sig = "tkae 1 tablet 3 times a day"
+        sig_parser = SigParser(options='trusted-fast', cache_size=10)
+        self.assertEqual(sig_parser.parse_many([sig]), sig_parser.parse(sig))
+        self.assertEqual(sig_parser.parse_many([sig], options=ParseOptions()), self.sig_parser.parse(sig))
+        self.assertEqual([result.structured_sigs
+                          for result in sig_parser.parse_stream([sig], options='noisy-accurate')],
+                         [self.sig_parser.parse(sig)])
+        # results parsed with other options are cached apart
+        self.assertEqual(sig_parser.cache_info().currsize, 2)
+
+    def test_other_entry_points(self):
+        sig = "take 1 tablet by mouth bid"
+        sig_parser = SigParser(options=ParseOptions(latin_frequencies=False))
+        expected = self.sig_parser.parse(sig)
+        self.assertNotEqual(sig_parser.parse(sig), expected)
+        self.assertEqual(sig_parser.parse_many_columnar([sig], options=ParseOptions()).to_structured_sigs(), expected)
+        self.assertEqual(sig_parser.parse_document(sig, options=ParseOptions())[0].structured_sigs, expected)
+
+    @unittest.skipUnless(importlib.util.find_spec('pandas'), 'pandas is not installed')
+    def test_parse_column(self):
+        import pandas as pd
+
+        sigs = pd.Series(["take 1 tablet by mouth bid"])
+        sig_parser = SigParser(options=ParseOptions(latin_frequencies=False))
+        expected = self.sig_parser.parse_column(sigs)
+        self.assertFalse(sig_parser.parse_column(sigs).equals(expected))
+        pd.testing.assert_frame_equal(sig_parser.parse_column(sigs, options=ParseOptions()), expected)
+        pd.testing.assert_frame_equal(sigs.parsigs.parse(sig_parser, options=ParseOptions()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from itertools import islice
 
 from parsigs.parse_sig_api import StructuredSig, SigParser
 
@@ -241,3 +242,64 @@ class TestParseSigApi(unittest.TestCase):
         result = self.sig_parser.parse(sig)
         expected = [first_expected, second_expected, third_expected]
         self.assertEqual(result, expected)
+
+    def test_parse_many_matches_parse(self):
+        sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+                "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+                "1 TAB of BENADRYL BID"]
+        expected = [structured_sig for sig in sigs for structured_sig in self.sig_parser.parse(sig)]
+        self.assertEqual(self.sig_parser.parse_many(sigs, batch_size=2), expected)
+
+    def test_parse_many_reports_batches(self):
+        batches = []
+        self.sig_parser.parse_many(["take 1 tablet daily"] * 5, batch_size=2, on_batch=batches.append)
+        self.assertEqual([batch.size for batch in batches], [2, 2, 1])
+        self.assertEqual([batch.batch_index for batch in batches], [0, 1, 2])
+        self.assertEqual([batch.duplicates for batch in batches], [1, 1, 0])
+
+    def test_parse_many_deduplicates_batch(self):
+        sigs = ["Take 1 tablet 3 times a day for 2 weeks", "1 TAB of BENADRYL BID",
+                "take 1 tablet 3 times a day  for 2 WEEKS", "1 TAB of BENADRYL BID"]
+        batches = []
+        results = list(self.sig_parser.parse_stream(sigs, on_batch=batches.append))
+        self.assertEqual([result.structured_sigs for result in results], [self.sig_parser.parse(sig) for sig in sigs])
+        self.assertEqual(batches[0].duplicates, 2)
+        # every position gets its own StructuredSig objects
+        self.assertIsNot(results[0].structured_sigs[0], results[2].structured_sigs[0])
+
+    def test_parse_with_cache(self):
+        sig_parser = SigParser(cache_size=2)
+        first = sig_parser.parse("Take 1 tablet 3 times a day for 2 weeks")
+        second = sig_parser.parse("  take 1 TABLET 3 times a day   for 2 weeks")
+        self.assertEqual(first, second)
+        self.assertIsNot(first[0], second[0])
+        first[0].drug = "changed"
+        self.assertEqual(sig_parser.parse("take 1 tablet 3 times a day for 2 weeks"), second)
+        sig_parser.parse_many(["take 1 tablet daily", "take 2 tablets daily"])
+        info = sig_parser.cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (2, 3, 1, 2))
+
+    def test_parse_with_rule_fast_path(self):
+        sig_parser = SigParser(rule_fast_path=True)
+        sigs = ["1 TAB of BENADRYL BID", "Take 1 tablet 3 times a day for 2 weeks", "take 1 codeine 3 times a day"]
+        self.assertEqual([sig_parser.parse(sig) for sig in sigs], [self.sig_parser.parse(sig) for sig in sigs])
+        self.assertEqual(sig_parser.parse_many(sigs), self.sig_parser.parse_many(sigs))
+        self.assertEqual(sig_parser.fast_path_info(), (4, 2))
+
+    def test_parse_stream(self):
+        sigs = ["take 1 tablet of atorvastatin every day and then 2 tablets every week", "1 TAB of BENADRYL BID"]
+        results = list(self.sig_parser.parse_stream(iter(sigs), batch_size=1))
+        self.assertEqual([result.index for result in results], [0, 1])
+        self.assertEqual([result.structured_sigs for result in results], [self.sig_parser.parse(sig) for sig in sigs])
+
+    def test_parse_stream_reads_lazily(self):
+        read = []
+
+        def endless_sigs():
+            while True:
+                read.append(1)
+                yield "take 1 tablet daily"
+
+        first = list(islice(self.sig_parser.parse_stream(endless_sigs(), batch_size=4), 6))
+        self.assertEqual([result.index for result in first], list(range(6)))
+        self.assertEqual(len(read), 8)
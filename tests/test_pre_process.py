@@ -0,0 +1,36 @@
+import unittest
+
+from parsigs.parse_sig_api import _pre_process, _pre_process_reference
+
+
+class TestPreProcess(unittest.TestCase):
+    sigs = [
+        "Take 1 tablet 3 times a day for 2 weeks",
+        "Take 2 tabs of amoxicillin 500mg every 12 days for 10 days",
+        "Take two tablets of ibuprofen 3 times every week",
+        "TAKE 1 TABLET BY MOUTH EVERY 6 HOURS AS NEEDED FOR PAIN",
+        "take 4 TABS q.4.d for 4 weeks",
+        "Take 1 capsule by mouth twice daily (every 12 hours)",
+        "Tkae 1 talbet of ibuprofen 200mg 3 tiems every day for 10 wekes",
+        "Take 1 TableT of (Bendaryl) 3 times a day",
+        "take 1/2 tab(s) by mouth once nightly",
+        "  take one\ttab\n(x)y) a(b)c ((d)) ",
+        "twiceonce nightlynightly concert",
+        "20 mg, Intravenous, at 100 mL/hr, Administer over 30 Minutes, 2 times daily, First dose on Thu 2/19/15",
+        "1 po tid prn",
+        "",
+    ]
+
+    def test_same_as_reference(self):
+        for sig in self.sigs:
+            self.assertEqual(_pre_process(sig), _pre_process_reference(sig), sig)
+
+    def test_pre_process(self):
+        self.assertEqual(_pre_process("Take 1 capsule by mouth twice daily (every 12 hours)"),
+                         "take 1 capsule by mouth 2 times daily (every 12 hours)")
+        self.assertEqual(_pre_process("take 1/2 TAB(S) once nightly"), "take 0.5 tablet (s) 1 time every night")
+        self.assertEqual(_pre_process("take three tabs"), "take 3 tablet")
+
+    def test_zero_denominator_fraction(self):
+        with self.assertRaises(ZeroDivisionError):
+            _pre_process("take 1/0 tablet")
@@ -0,0 +1,80 @@
+import pathlib
+import tempfile
+import unittest
+
+import spacy
+from spacy.tokens import DocBin
+
+from research.pre_process_data import convert, index_annotated_files
+
+
+def _write_pair(directory: pathlib.Path, name: str, text: str, annotations):
+    (directory / f'{name}.txt').write_text(text)
+    (directory / f'{name}.ann').write_text('\n'.join(annotations) + '\n')
+
+
+def _read_docs(path: pathlib.Path):
+    nlp = spacy.blank("en")
+    return [doc for shard in sorted(path.glob('*.spacy')) for doc in DocBin().from_disk(shard).get_docs(nlp.vocab)]
+
+
+class TestPreProcessData(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name)
+        self.input_path = self.path / 'input'
+        self.input_path.mkdir()
+        for i in range(25):
+            _write_pair(self.input_path, f'record_{i}', 'take 2 tablets of aspirin daily',
+                        ['T1\tDosage 5 14\t2 tablets', 'T2\tDrug 18 25\taspirin', 'T3\tFrequency 26 31\tdaily',
+                         'R1\tReason-Drug Arg1:T1 Arg2:T2\t'])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_index(self):
+        pairs = index_annotated_files(self.input_path)
+        self.assertEqual([text_file.stem for text_file, _ in pairs], sorted(f'record_{i}' for i in range(25)))
+        (self.input_path / 'unmatched.ann').write_text('')
+        with self.assertRaises(ValueError):
+            index_annotated_files(self.input_path)
+
+    def test_convert(self):
+        train_path, test_path = self.path / 'train_docs.spacy', self.path / 'test_docs.spacy'
+        n_train, n_test = convert(self.input_path, train_path, test_path, test_fraction=0.2, shard_size=4)
+        self.assertEqual(n_train + n_test, 25)
+        self.assertGreater(n_test, 0)
+        train_docs = _read_docs(train_path)
+        self.assertEqual(len(train_docs), n_train)
+        self.assertEqual(len(list(train_path.glob('*.spacy'))), (n_train + 3) // 4)
+        self.assertEqual([(ent.text, ent.label_) for ent in train_docs[0].ents],
+                         [('2 tablets', 'Dosage'), ('aspirin', 'Drug'), ('daily', 'Frequency')])
+
+        # the split does not change between runs
+        convert(self.input_path, self.path / 'train_2', self.path / 'test_2', test_fraction=0.2, shard_size=4)
+        self.assertEqual(len(_read_docs(self.path / 'test_2')), n_test)
+
+    def test_convert_over_previous_run(self):
+        train_path, test_path = self.path / 'train_docs.spacy', self.path / 'test_docs.spacy'
+        convert(self.input_path, train_path, test_path, test_fraction=0.2, shard_size=1)
+        n_train, n_test = convert(self.input_path, train_path, test_path, test_fraction=0.2, shard_size=4)
+        self.assertEqual(len(_read_docs(train_path)), n_train)
+        self.assertEqual(len(_read_docs(test_path)), n_test)
+
+    def test_convert_keeps_other_files(self):
+        train_path = self.path / 'train_docs.spacy'
+        train_path.mkdir()
+        (train_path / 'notes.spacy').write_text('not a shard')
+        convert(self.input_path, train_path, self.path / 'test_docs.spacy', test_fraction=0.2, shard_size=4)
+        self.assertEqual((train_path / 'notes.spacy').read_text(), 'not a shard')
+
+    def test_convert_invalid_outputs(self):
+        with self.assertRaises(ValueError):
+            convert(self.input_path, self.path / 'docs', self.path / 'docs', test_fraction=0.2)
+        (self.path / 'train_docs.spacy').write_text('an old single file output')
+        with self.assertRaisesRegex(ValueError, 'is a file'):
+            convert(self.input_path, self.path / 'train_docs.spacy', self.path / 'test_docs.spacy')
+
+
+if __name__ == '__main__':
+    unittest.main()
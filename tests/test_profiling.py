@@ -0,0 +1,53 @@
+import unittest
+
+from parsigs.parse_sig_api import SigParser
+from parsigs.profiling import Histogram, ParseProfiler
+
+
+class TestProfiling(unittest.TestCase):
+    sig_parser = SigParser()
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "Tkae 1 talbet of ibuprofen 200mg 3 tiems every day for 10 wekes",
+            "1 TAB of BENADRYL BID"]
+
+    def test_histogram(self):
+        histogram = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+        self.assertEqual(histogram.to_dict(), {'buckets': [1, 10], 'counts': [2, 1, 1], 'sum': 56.5, 'count': 4})
+        self.assertIn('x_bucket{le="10"} 3', histogram.render('x'))
+
+    def test_profiled_results_are_unchanged(self):
+        expected_many = self.sig_parser.parse_many(self.sigs)
+        expected = [self.sig_parser.parse(sig) for sig in self.sigs]
+        with self.sig_parser.profile():
+            self.assertEqual(self.sig_parser.parse_many(self.sigs), expected_many)
+            self.assertEqual([self.sig_parser.parse(sig) for sig in self.sigs], expected)
+
+    def test_records_every_sig(self):
+        profiles = []
+        with self.sig_parser.profile(ParseProfiler(on_sig=profiles.append)) as profiler:
+            self.sig_parser.parse_many(self.sigs, batch_size=2)
+            self.sig_parser.parse(self.sigs[0])
+        self.sig_parser.parse(self.sigs[0])
+
+        self.assertEqual([profile.sig for profile in profiles], self.sigs + self.sigs[:1])
+        self.assertEqual([profile.corrections for profile in profiles], [0, 4, 0, 0])
+        self.assertTrue(all(profile.tokens > 0 and profile.model_seconds > 0 and profile.fast_path_seconds is None
+                            for profile in profiles))
+        summary = profiler.to_dict()
+        self.assertEqual(summary['sigs'], {'model': 4, 'fast_path': 0, 'cache': 0, 'duplicate': 0})
+        self.assertEqual(summary['stage_seconds']['autocorrect']['count'], 4)
+        self.assertEqual(summary['stage_seconds']['fast_path']['count'], 0)
+        self.assertIn('parsigs_stage_duration_seconds_count{stage="model"} 4', profiler.to_prometheus())
+
+    def test_fast_path_and_cache(self):
+        sig_parser = SigParser(cache_size=10, rule_fast_path=True)
+        with sig_parser.profile() as profiler:
+            sig_parser.parse_many(["1 tab po bid", "Take 1 tablet 3 times a day for 2 weeks for pain"])
+            sig_parser.parse("1 tab  PO bid")
+        self.assertEqual(profiler.to_dict()['sigs'], {'model': 1, 'fast_path': 1, 'cache': 1, 'duplicate': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
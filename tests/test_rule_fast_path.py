@@ -0,0 +1,59 @@
+import unittest
+
+from parsigs.parse_sig_api import _get_sig_vocabulary, _structure_entities, _pre_process, StructuredSig
+from parsigs.rule_fast_path import RuleFastPath
+
+
+class TestRuleFastPath(unittest.TestCase):
+    def setUp(self):
+        self.fast_path = RuleFastPath(_get_sig_vocabulary())
+
+    def entities(self, sig):
+        entities = self.fast_path.match(_pre_process(sig))
+        return entities and [(entity.text, entity.label_) for entity in entities]
+
+    def test_entities(self):
+        self.assertEqual(self.entities("1 tab po bid"), [("1 tablet", "Dosage"), ("bid", "Frequency")])
+        self.assertEqual(self.entities("take 2 tablets every 6 hours for 5 days"),
+                         [("2 tablets", "Dosage"), ("every 6 hours", "Frequency"), ("for 5 days", "Duration")])
+        self.assertEqual(self.entities("Take 2 capsules of amoxicillin 500mg 3 times a day as needed"),
+                         [("2 capsules", "Dosage"), ("amoxicillin", "Drug"), ("500mg", "Strength"),
+                          ("3 times a day as needed", "Frequency")])
+
+    def test_adjacent_frequencies(self):
+        self.assertEqual(self.entities("take 1 tablet daily at bedtime"),
+                         [("1 tablet", "Dosage"), ("daily at bedtime", "Frequency")])
+        self.assertEqual(self.entities("take 1 tablet every day at bedtime"),
+                         [("1 tablet", "Dosage"), ("every day at bedtime", "Frequency")])
+        for sig in ["take 1 tablet daily at bedtime", "take 1 tablet every day at bedtime",
+                    "take 1 tablet daily daily"]:
+            structured_sigs = _structure_entities(self.fast_path.match(_pre_process(sig)))
+            self.assertEqual(len(structured_sigs), 1)
+            self.assertEqual(structured_sigs[0].singleDosageAmount, 1.0)
+            self.assertEqual(structured_sigs[0].frequencyType, "Day")
+
+    def test_repeated_label_without_dosage_falls_back_to_model(self):
+        self.assertIsNone(self.entities("take 1 tablet daily for 5 days for 2 weeks"))
+        self.assertIsNone(self.entities("take 1 tablet daily for 5 days and then daily"))
+
+    def test_entity_offsets(self):
+        sig = _pre_process("take 1 tablet by mouth q.o.d")
+        for entity in self.fast_path.match(sig):
+            self.assertEqual(sig[entity.start_char:entity.end_char], entity.text)
+
+    def test_unrecognised_words_fall_back_to_model(self):
+        self.assertIsNone(self.entities("take 1 tablet by mouth every 6 hours as needed for pain"))
+        self.assertIsNone(self.entities("take 1 codeine 3 times a day"))
+        self.assertIsNone(self.entities("take"))
+        self.assertEqual(self.fast_path.info(), (0, 3))
+
+    def test_structured_sigs(self):
+        entities = self.fast_path.match(_pre_process("take 1 tab of benadryl every day and then 2 tablets every week"))
+        expected = [StructuredSig(drug="benadryl", form="tablet", strength=None, frequencyType="Day", interval=1,
+                                  singleDosageAmount=1.0, times=None, periodType=None, periodAmount=None,
+                                  takeAsNeeded=False),
+                    StructuredSig(drug="benadryl", form="tablet", strength=None, frequencyType="Week", interval=1,
+                                  singleDosageAmount=2.0, times=None, periodType=None, periodAmount=None,
+                                  takeAsNeeded=False)]
+        self.assertEqual(_structure_entities(entities), expected)
+        self.assertEqual(self.fast_path.info(), (1, 0))
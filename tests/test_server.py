@@ -0,0 +1,80 @@
+import json
+import socket
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+from parsigs.parse_sig_api import SigParser
+from parsigs.server import SigServer
+
+
+class TestSigServer(unittest.TestCase):
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+            "1 TAB of BENADRYL BID"]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sig_server = SigServer(port=0, max_wait_seconds=0.02)
+        cls.server_thread = threading.Thread(target=cls.sig_server.serve_forever)
+        cls.server_thread.start()
+        cls.url = 'http://%s:%d' % cls.sig_server.server_address[:2]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sig_server.shutdown()
+        cls.server_thread.join()
+
+    def _post(self, path, body):
+        request = urllib.request.Request(self.url + path, json.dumps(body).encode(),
+                                         {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def _raw_post_status(self, headers: bytes):
+        with socket.create_connection(self.sig_server.server_address[:2], timeout=10) as connection:
+            connection.sendall(b'POST /parse HTTP/1.1\r\nHost: localhost\r\n' + headers + b'\r\n')
+            return int(connection.makefile('rb').readline().split()[1])
+
+    def _expected(self, sig):
+        return [asdict(structured_sig) for structured_sig in SigParser().parse(sig)]
+
+    def test_parse(self):
+        self.assertEqual(self._post('/parse', {'sig': self.sigs[1]}),
+                         {'structured_sigs': self._expected(self.sigs[1])})
+
+    def test_parse_many(self):
+        response = self._post('/parse_many', {'sigs': self.sigs + ['take 1/0 tablet daily']})
+        self.assertEqual(response['results'][:3], [{'structured_sigs': self._expected(sig)} for sig in self.sigs])
+        self.assertIn('ZeroDivisionError', response['results'][3]['error'])
+
+    def test_concurrent_requests(self):
+        with ThreadPoolExecutor(8) as executor:
+            responses = list(executor.map(lambda sig: self._post('/parse', {'sig': sig}), self.sigs * 4))
+        self.assertEqual(responses, [{'structured_sigs': self._expected(sig)} for sig in self.sigs * 4])
+
+    def test_bad_request(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self._post('/parse', {'sigs': self.sigs})
+        self.assertEqual(raised.exception.code, 400)
+
+    def test_invalid_content_length(self):
+        for headers in [b'', b'Content-Length: ten\r\n', b'Content-Length: -1\r\n']:
+            self.assertEqual(self._raw_post_status(headers), 400)
+        self.assertEqual(self._raw_post_status(b'Content-Length: %d\r\n' % (1 << 30)), 413)
+
+    def test_metrics(self):
+        self._post('/parse', {'sig': self.sigs[0]})
+        with urllib.request.urlopen(self.url + '/metrics') as response:
+            metrics = response.read().decode()
+        self.assertIn('parsigs_request_duration_seconds_bucket{path="/parse",le="+Inf"}', metrics)
+        self.assertIn('parsigs_batch_size_count', metrics)
+        self.assertIn('parsigs_queue_depth 0', metrics)
+        self.assertIn('parsigs_requests_total{path="/parse",status="200"}', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from parsigs.parse_sig_api import _get_latin_type_dict, _get_latin_frequency, _should_take_as_needed, \
+    _structure_entities, dose_instructions
+from parsigs.rule_fast_path import EntitySpan
+from parsigs.sig_vocabulary import SigVocabulary, as_needed, dose_instruction, latin_frequency
+
+
+def _entity(sig, text, label):
+    start_char = sig.index(text)
+    return EntitySpan(text, label, start_char, start_char + len(text))
+
+
+class TestSigVocabulary(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = SigVocabulary(_get_latin_type_dict(), dose_instructions)
+
+    def test_split_abbreviations(self):
+        q6h = _get_latin_type_dict()['q6h']
+        for text in ["q6h", "q 6 h", "q6 h", "q.6.h.", "q. 6. h.", "Q6H,"]:
+            self.assertEqual(self.vocabulary.first(text, latin_frequency).value, q6h, text)
+        for text in ["q.a.m.", "q a m", "qam"]:
+            self.assertEqual(self.vocabulary.first(text, latin_frequency).value, _get_latin_type_dict()['qam'], text)
+
+    def test_longest_match(self):
+        # multi token abbreviations are matched as a whole, the scan continues after them
+        matches = self.vocabulary.match_words("take 1 q 4 h and q o d".split())
+        self.assertEqual([(match.kind, match.start, match.end) for match in matches],
+                         [(dose_instruction, 0, 1), (latin_frequency, 2, 5), (latin_frequency, 6, 9)])
+        self.assertEqual(matches[2].value, _get_latin_type_dict()['qod'])
+
+    def test_char_offsets(self):
+        sig = "1 po  tid   prn pain"
+        matches = self.vocabulary.match(sig)
+        self.assertEqual([(match.kind, sig[match.start_char:match.end_char]) for match in matches],
+                         [(latin_frequency, "tid"), (as_needed, "prn")])
+
+    def test_frequency_entity(self):
+        self.assertEqual(_get_latin_frequency("every day q 8 h"), _get_latin_type_dict()['q8h'])
+        self.assertIsNone(_get_latin_frequency("every day"))
+        self.assertTrue(_should_take_as_needed("bid prn"))
+        self.assertTrue(_should_take_as_needed("daily as needed"))
+        self.assertFalse(_should_take_as_needed("daily"))
+
+    def test_untagged_vocabulary(self):
+        sig = "1 tablet q 6 h prn pain and then 2 tablets bid"
+        entities = [_entity(sig, "1 tablet", "Dosage"), _entity(sig, "2 tablets", "Dosage"),
+                    _entity(sig, "bid", "Frequency")]
+        first, second = _structure_entities(entities, sig)
+        self.assertEqual((first.frequencyType, first.interval, first.times, first.takeAsNeeded), ("Hour", 6, 1, True))
+        self.assertEqual((second.frequencyType, second.interval, second.times, second.takeAsNeeded),
+                         ("Day", 1, 2, False))
+        # without the sig only the entities are structured
+        self.assertIsNone(_structure_entities(entities)[0].frequencyType)
+
+    def test_tagged_frequency_is_kept(self):
+        sig = "1 tablet every 4 hours q6h"
+        entities = [_entity(sig, "1 tablet", "Dosage"), _entity(sig, "every 4 hours", "Frequency")]
+        structured_sig, = _structure_entities(entities, sig)
+        self.assertEqual((structured_sig.frequencyType, structured_sig.interval), ("Hour", 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from parsigs import spell_checker_snapshot
+from parsigs.parse_sig_api import _build_spell_checker, drug_names_path
+
+
+class TestSpellCheckerSnapshot(unittest.TestCase):
+    spell_checker = _build_spell_checker()
+    source_key = spell_checker_snapshot.snapshot_source_key(drug_names_path)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / 'spell_checker.snapshot'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshot_round_trip(self):
+        spell_checker_snapshot.write_snapshot(self.spell_checker, self.path, self.source_key)
+        loaded = spell_checker_snapshot.read_snapshot(self.path, self.source_key)
+        self.assertEqual(loaded.word_frequency.dictionary, self.spell_checker.word_frequency.dictionary)
+        self.assertEqual(loaded.word_frequency.total_words, self.spell_checker.word_frequency.total_words)
+        self.assertEqual(loaded.word_frequency.letters, self.spell_checker.word_frequency.letters)
+        for word in ["tkae", "talbet", "wekes", "amoxicilin"]:
+            self.assertEqual(loaded.correction(word), self.spell_checker.correction(word))
+
+    def test_stale_snapshot_is_ignored(self):
+        spell_checker_snapshot.write_snapshot(self.spell_checker, self.path, self.source_key)
+        self.assertIsNone(spell_checker_snapshot.read_snapshot(self.path, 'another-key'))
+
+    def test_missing_snapshot_is_ignored(self):
+        self.assertIsNone(spell_checker_snapshot.read_snapshot(self.path, self.source_key))
+
+    def test_import_does_not_load_resources(self):
+        code = ("from parsigs import parse_sig_api as api; "
+                "print(api._get_spell_checker.cache_info().currsize, api._get_latin_type_dict.cache_info().currsize)")
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=Path(__file__).parent.parent, text=True)
+        self.assertEqual(output.split(), ['0', '0'])
@@ -0,0 +1,75 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from parsigs.parse_sig_api import SigParser
+
+
+class TestThreadSafeSigParser(unittest.TestCase):
+    sigs = ["Take 1 tablet 3 times a day for 2 weeks",
+            "take 1 tablet of atorvastatin every day and then 2 tablets every week",
+            "1 TAB of BENADRYL BID",
+            "Take 2 tabs of amoxicillin 500mg every 12 days for 10 days",
+            "take 1/2 tab by mouth once nightly",
+            "1 tab po bid"] * 20
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = [SigParser(rule_fast_path=True).parse(sig) for sig in cls.sigs]
+
+    def test_shared_parser_matches_sequential(self):
+        sig_parser = SigParser(cache_size=4, rule_fast_path=True, thread_safe=True)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(sig_parser.parse, self.sigs))
+            chunks = list(executor.map(sig_parser.parse_many,
+                                       [self.sigs[i:i + 7] for i in range(0, len(self.sigs), 7)]))
+        self.assertEqual(results, self.expected)
+        self.assertEqual([structured_sig for chunk in chunks for structured_sig in chunk],
+                         [structured_sig for structured_sigs in self.expected for structured_sig in structured_sigs])
+
+    def test_state_per_thread(self):
+        sig_parser = SigParser(cache_size=10, rule_fast_path=True, thread_safe=True)
+        barrier = threading.Barrier(4)
+
+        def parse_twice(sig):
+            # every thread parses the sig before any of them parses it again, so every thread misses once
+            sig_parser.parse(sig)
+            barrier.wait()
+            sig_parser.parse(sig)
+
+        threads = [threading.Thread(target=parse_twice, args=(self.sigs[0],)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # the states of the exited threads are dropped, their counters are kept
+        cache_info = sig_parser.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses, cache_info.currsize), (4, 4, 0))
+        self.assertEqual(sum(sig_parser.fast_path_info()), 4)
+
+        sig_parser.clear_cache()
+        self.assertEqual(sig_parser.cache_info().currsize, 0)
+        sig_parser.parse(self.sigs[0])
+        self.assertEqual(sig_parser.cache_info().misses, 1)
+
+    def test_exited_threads_release_their_state(self):
+        sig_parser = SigParser(cache_size=10, rule_fast_path=True, thread_safe=True)
+        sig_parser.parse(self.sigs[0])
+        for sig in self.sigs[:30]:
+            thread = threading.Thread(target=sig_parser.parse, args=(sig,))
+            thread.start()
+            thread.join()
+        # only the state of this thread is left
+        cache_info = sig_parser.cache_info()
+        self.assertEqual((cache_info.hits + cache_info.misses, cache_info.maxsize, cache_info.currsize), (31, 10, 1))
+        self.assertEqual(sum(sig_parser.fast_path_info()), 31)
+
+    def test_info_without_cache(self):
+        sig_parser = SigParser(thread_safe=True)
+        sig_parser.parse(self.sigs[0])
+        self.assertEqual(sig_parser.cache_info(), (0, 0, 0, 0, 0))
+        self.assertEqual(sig_parser.fast_path_info(), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()